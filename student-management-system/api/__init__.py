@@ -14,11 +14,18 @@ api = Api(api_bp)
 
 # 导入所有API资源
 from .students import StudentListAPI, StudentAPI
-from .courses import CourseListAPI, CourseAPI
-from .books import BookListAPI, BookAPI
+from .courses import CourseListAPI, CourseAPI, CourseRosterAPI, CoursePrerequisitesAPI
+from .grades import CourseGradesAPI
+from .books import BookListAPI, BookAPI, BookBorrowHistoryAPI
 from .enrollments import EnrollmentListAPI, EnrollmentAPI
 from .borrows import BorrowListAPI, BorrowAPI
+from .transcripts import StudentTranscriptAPI, TranscriptListAPI
+from .rankings import RankingListAPI, StudentRankingAPI
+from .analytics import GradeDistributionAPI
+from .timetable import TimetableSolveAPI, TimetableConflictsAPI
 from .dashboard import DashboardAPI
+from .system import PoolStatsAPI, HealthAPI, SlowQueryAPI, RequestStatsAPI
+from .batch import BatchAPI
 
 # 注册API路由
 # 学生相关API
@@ -28,10 +35,14 @@ api.add_resource(StudentAPI, '/students/<int:student_id>')
 # 课程相关API
 api.add_resource(CourseListAPI, '/courses')
 api.add_resource(CourseAPI, '/courses/<int:course_id>')
+api.add_resource(CourseRosterAPI, '/courses/<int:course_id>/students')
+api.add_resource(CoursePrerequisitesAPI, '/courses/<int:course_id>/prerequisites')
+api.add_resource(CourseGradesAPI, '/courses/<int:course_id>/grades')
 
 # 图书相关API
 api.add_resource(BookListAPI, '/books')
 api.add_resource(BookAPI, '/books/<int:book_id>')
+api.add_resource(BookBorrowHistoryAPI, '/books/<int:book_id>/borrows')
 
 # 选课相关API
 api.add_resource(EnrollmentListAPI, '/enrollments')
@@ -41,9 +52,29 @@ api.add_resource(EnrollmentAPI, '/enrollments/<int:enrollment_id>')
 api.add_resource(BorrowListAPI, '/borrows')
 api.add_resource(BorrowAPI, '/borrows/<int:borrow_id>')
 
+# 成绩单API
+api.add_resource(StudentTranscriptAPI, '/students/<int:student_id>/transcript')
+api.add_resource(TranscriptListAPI, '/transcripts')
+api.add_resource(RankingListAPI, '/rankings')
+api.add_resource(StudentRankingAPI, '/students/<int:student_id>/ranking')
+api.add_resource(GradeDistributionAPI, '/analytics/grades')
+
+# 排课API
+api.add_resource(TimetableSolveAPI, '/timetable/solve')
+api.add_resource(TimetableConflictsAPI, '/timetable/conflicts')
+
 # 仪表板API
 api.add_resource(DashboardAPI, '/dashboard')
 
+# 系统状态API
+api.add_resource(PoolStatsAPI, '/system/pool')
+api.add_resource(HealthAPI, '/system/health')
+api.add_resource(SlowQueryAPI, '/system/slow-queries')
+api.add_resource(RequestStatsAPI, '/system/requests')
+
+# 批量请求API
+api.add_resource(BatchAPI, '/batch')
+
 __all__ = ['api_bp']
 
 
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+成绩分析API接口
+Grade Analytics API Resources
+"""
+
+from flask import request
+from flask_restful import Resource
+from models.grade_stats import get_grade_stats
+
+class GradeDistributionAPI(Resource):
+    """成绩分布API"""
+    
+    def get(self):
+        """获取各课程、各学期和总体的成绩分布（?semester= 限定学期，?course_id= 只返回指定课程）"""
+        try:
+            semester = request.args.get('semester', '')
+            course_id = request.args.get('course_id', type=int)
+            
+            result = get_grade_stats().distribution(semester)
+            if course_id is not None:
+                result = dict(result, courses=[
+                    course for course in result['courses'] if course['course_id'] == course_id
+                ])
+            
+            return {
+                'success': True,
+                'data': result,
+                'message': '获取成绩分布成功'
+            }, 200
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'获取成绩分布失败: {str(e)}'
+            }, 500
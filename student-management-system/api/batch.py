@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量请求API接口
+Batch Request API Resource
+
+POST /api/batch 在一次HTTP往返中依次执行多个 /api 子请求：
+    {"requests": [{"method": "GET", "path": "/api/dashboard"},
+                  {"method": "POST", "path": "/api/students", "body": {...}}]}
+子请求在同一应用上下文中分发，共享数据库会话（已加载的对象经身份映射复用）
+和 g.batch_cache 请求级缓存；写请求后清空缓存。结果按请求顺序返回。
+各写请求各自提交，批量请求整体不是一个事务。
+"""
+
+from flask import current_app, g, request
+from flask_restful import Resource
+from werkzeug.exceptions import HTTPException
+from werkzeug.test import EnvironBuilder
+from models import db
+
+API_PREFIX = '/api/'
+
+
+def _error(status, message):
+    return {'status': status, 'body': {'success': False, 'message': message}}
+
+
+def run_sub_request(item):
+    """在当前应用上下文中分发一个子请求，返回 {'status', 'body'}"""
+    if not isinstance(item, dict):
+        return _error(400, '子请求格式错误')
+
+    method = str(item.get('method', 'GET')).upper()
+    path = item.get('path') or ''
+    if not path.startswith(API_PREFIX):
+        return _error(400, f'只支持 {API_PREFIX} 下的接口')
+
+    builder = EnvironBuilder(path=path, method=method, json=item.get('body'),
+                             headers=item.get('headers'))
+    try:
+        environ = builder.get_environ()
+    finally:
+        builder.close()
+
+    # 应用上下文已存在，子请求只推入请求上下文，数据库会话和 g 与外层请求共享
+    with current_app.request_context(environ):
+        try:
+            if request.routing_exception is not None:
+                raise request.routing_exception
+            view = current_app.view_functions[request.endpoint]
+            if request.blueprint != 'api' or getattr(view, 'view_class', None) is BatchAPI:
+                return _error(400, '不支持的子请求')
+            response = current_app.make_response(current_app.dispatch_request())
+        except HTTPException as e:
+            return _error(e.code, e.description)
+
+    if method not in ('GET', 'HEAD'):
+        g.batch_cache.clear()
+
+    return {'status': response.status_code, 'body': response.get_json(silent=True)}
+
+
+class BatchAPI(Resource):
+    """批量请求API"""
+
+    def post(self):
+        """依次执行多个子请求"""
+        try:
+            data = request.get_json(silent=True) or {}
+            sub_requests = data.get('requests')
+
+            if not isinstance(sub_requests, list) or not sub_requests:
+                return {
+                    'success': False,
+                    'message': '缺少子请求列表'
+                }, 400
+
+            max_requests = current_app.config.get('BATCH_MAX_REQUESTS', 20)
+            if len(sub_requests) > max_requests:
+                return {
+                    'success': False,
+                    'message': f'一次最多执行 {max_requests} 个子请求'
+                }, 400
+
+            g.batch_cache = {}
+            try:
+                results = [run_sub_request(item) for item in sub_requests]
+            finally:
+                g.pop('batch_cache', None)
+
+            return {
+                'success': True,
+                'data': {'results': results},
+                'message': f'批量执行 {len(results)} 个请求成功'
+            }, 200
+
+        except Exception as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': f'批量请求失败: {str(e)}'
+            }, 500
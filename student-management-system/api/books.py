@@ -7,46 +7,59 @@ Book API Resources
 
 from flask import request
 from flask_restful import Resource
-from models import db, Book
+from sqlalchemy.orm import contains_eager
+from models import db, Book, Student, BorrowRecord
 from sqlalchemy.exc import IntegrityError
+from .conditional import conditional_get
+from .multi_get import parse_ids, fetch_by_ids
 
 class BookListAPI(Resource):
     """图书列表API"""
     
+    @staticmethod
+    def build_query(args):
+        """根据查询参数构建图书列表查询（未分页）"""
+        search = args.get('search', '')
+        category = args.get('category', '')
+        status = args.get('status', '')
+        available_only = args.get('available_only', False, type=bool)
+        
+        query = Book.query
+        
+        if search:
+            query = query.filter(
+                db.or_(
+                    Book.isbn.contains(search),
+                    Book.title.contains(search),
+                    Book.author.contains(search),
+                    Book.publisher.contains(search)
+                )
+            )
+        
+        if category:
+            query = query.filter(Book.category == category)
+        
+        if status:
+            query = query.filter(Book.status == status)
+        
+        if available_only:
+            query = query.filter(Book.status == 'available')
+        
+        return query.options(Book.with_borrowed_copies())
+    
+    @conditional_get(Book, BorrowRecord, batch_models=(Student,))
     def get(self):
-        """获取图书列表"""
+        """获取图书列表（带 ids 参数时按ID批量获取）"""
         try:
+            if 'ids' in request.args:
+                return self.get_many(request.args['ids'])
+            
             # 获取查询参数
             page = request.args.get('page', 1, type=int)
             per_page = request.args.get('per_page', 10, type=int)
-            search = request.args.get('search', '')
-            category = request.args.get('category', '')
-            status = request.args.get('status', '')
-            available_only = request.args.get('available_only', False, type=bool)
             
             # 构建查询
-            query = Book.query
-            
-            if search:
-                query = query.filter(
-                    db.or_(
-                        Book.isbn.contains(search),
-                        Book.title.contains(search),
-                        Book.author.contains(search),
-                        Book.publisher.contains(search)
-                    )
-                )
-            
-            if category:
-                query = query.filter(Book.category == category)
-            
-            if status:
-                query = query.filter(Book.status == status)
-            
-            if available_only:
-                query = query.filter(Book.status == 'available')
-            
-            pagination = query.paginate(
+            pagination = self.build_query(request.args).paginate(
                 page=page, per_page=per_page, error_out=False
             )
             
@@ -75,6 +88,34 @@ class BookListAPI(Resource):
                 'message': f'获取图书列表失败: {str(e)}'
             }, 500
     
+    def get_many(self, raw_ids):
+        """按ID批量获取图书详情（含当前借阅者），查询数与ID个数无关"""
+        try:
+            ids = parse_ids(raw_ids)
+        except ValueError as e:
+            return {
+                'success': False,
+                'message': str(e)
+            }, 400
+        
+        books, missing_ids = fetch_by_ids(Book, ids, Book.with_borrowed_copies())
+        current_borrowers = Book.current_borrowers_by_book([book.id for book in books])
+        
+        books_data = []
+        for book in books:
+            book_data = book.to_dict()
+            book_data['current_borrowers'] = [borrower.to_dict() for borrower in current_borrowers[book.id]]
+            books_data.append(book_data)
+        
+        return {
+            'success': True,
+            'data': {
+                'books': books_data,
+                'missing_ids': missing_ids
+            },
+            'message': '批量获取图书成功'
+        }, 200
+    
     def post(self):
         """创建新图书"""
         try:
@@ -115,14 +156,31 @@ class BookListAPI(Resource):
 class BookAPI(Resource):
     """单个图书API"""
     
+    @conditional_get(Book, BorrowRecord, Student)
     def get(self, book_id):
         """获取图书详情"""
         try:
-            book = Book.query.get_or_404(book_id)
+            detail = Book.load_detail(book_id)
+            if detail is None:
+                return {
+                    'success': False,
+                    'message': '图书不存在'
+                }, 404
             
-            # 获取详细信息
-            book_data = book.to_dict()
-            book_data['current_borrowers'] = [borrower.to_dict() for borrower in book.current_borrowers]
+            # 获取详细信息：册数统计和当前借阅者，完整历史见 /books/<id>/borrows
+            book_data = detail['book'].to_dict()
+            book_data['overdue_copies'] = detail['copies']['overdue']
+            book_data['borrow_count'] = detail['copies']['borrow_count']
+            book_data['current_borrowers'] = [{
+                'id': record.student.id,
+                'student_id': record.student.student_id,
+                'name': record.student.name,
+                'major': record.student.major,
+                'grade': record.student.grade,
+                'borrow_record_id': record.id,
+                'borrow_date': record.borrow_date.isoformat() if record.borrow_date else None,
+                'due_date': record.due_date.isoformat() if record.due_date else None
+            } for record in detail['current_records']]
             
             return {
                 'success': True,
@@ -191,3 +249,64 @@ class BookAPI(Resource):
                 'success': False,
                 'message': f'删除图书失败: {str(e)}'
             }, 500
+
+class BookBorrowHistoryAPI(Resource):
+    """图书借阅历史API"""
+    
+    @staticmethod
+    def build_query(book_id, args):
+        """根据查询参数构建图书借阅记录查询（未分页）"""
+        status = args.get('status', '')
+        
+        # (book_id, borrow_date) 索引同时用于过滤和排序；索引隐含 rowid，
+        # 同一借阅时间按 id 与借阅时间同向排序，不需要额外的临时排序
+        if args.get('order') == 'asc':
+            order = (BorrowRecord.borrow_date.asc(), BorrowRecord.id.asc())
+        else:
+            order = (BorrowRecord.borrow_date.desc(), BorrowRecord.id.desc())
+        query = BorrowRecord.query.join(BorrowRecord.student).options(
+            contains_eager(BorrowRecord.student)
+        ).filter(BorrowRecord.book_id == book_id)
+        if status:
+            query = query.filter(BorrowRecord.status == status)
+        return query.order_by(*order)
+    
+    @conditional_get(Book, BorrowRecord, Student)
+    def get(self, book_id):
+        """分页获取图书的借阅记录（默认按借阅时间倒序，?order=asc 正序）"""
+        try:
+            book = db.session.get(Book, book_id)
+            if book is None:
+                return {
+                    'success': False,
+                    'message': '图书不存在'
+                }, 404
+            
+            page = request.args.get('page', 1, type=int)
+            per_page = request.args.get('per_page', 10, type=int)
+            
+            pagination = self.build_query(book_id, request.args).paginate(
+                page=page, per_page=per_page, error_out=False
+            )
+            
+            return {
+                'success': True,
+                'data': {
+                    'borrow_records': [record.to_dict() for record in pagination.items],
+                    'pagination': {
+                        'page': pagination.page,
+                        'per_page': pagination.per_page,
+                        'total': pagination.total,
+                        'pages': pagination.pages,
+                        'has_prev': pagination.has_prev,
+                        'has_next': pagination.has_next
+                    }
+                },
+                'message': '获取借阅历史成功'
+            }, 200
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'获取借阅历史失败: {str(e)}'
+            }, 500
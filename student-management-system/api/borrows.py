@@ -8,41 +8,50 @@ Borrow API Resources
 from flask import request
 from flask_restful import Resource
 from models import db, Student, Book, BorrowRecord
+from sqlalchemy.orm import joinedload
 from datetime import datetime, timedelta
 
 class BorrowListAPI(Resource):
     """借书列表API"""
     
+    @staticmethod
+    def build_query(args):
+        """根据查询参数构建借书列表查询（未分页）"""
+        student_id = args.get('student_id', type=int)
+        book_id = args.get('book_id', type=int)
+        status = args.get('status', '')
+        overdue_only = args.get('overdue_only', False, type=bool)
+        
+        query = BorrowRecord.query
+        
+        if student_id:
+            query = query.filter(BorrowRecord.student_id == student_id)
+        
+        if book_id:
+            query = query.filter(BorrowRecord.book_id == book_id)
+        
+        if status:
+            query = query.filter(BorrowRecord.status == status)
+        
+        if overdue_only:
+            query = query.filter(
+                BorrowRecord.status == 'borrowed',
+                BorrowRecord.due_date < datetime.utcnow()
+            )
+        
+        return query.options(
+            joinedload(BorrowRecord.student), joinedload(BorrowRecord.book)
+        ).order_by(BorrowRecord.borrow_date.desc())
+    
     def get(self):
         """获取借书列表"""
         try:
             # 获取查询参数
             page = request.args.get('page', 1, type=int)
             per_page = request.args.get('per_page', 10, type=int)
-            student_id = request.args.get('student_id', type=int)
-            book_id = request.args.get('book_id', type=int)
-            status = request.args.get('status', '')
-            overdue_only = request.args.get('overdue_only', False, type=bool)
             
             # 构建查询
-            query = BorrowRecord.query
-            
-            if student_id:
-                query = query.filter(BorrowRecord.student_id == student_id)
-            
-            if book_id:
-                query = query.filter(BorrowRecord.book_id == book_id)
-            
-            if status:
-                query = query.filter(BorrowRecord.status == status)
-            
-            if overdue_only:
-                query = query.filter(
-                    BorrowRecord.status == 'borrowed',
-                    BorrowRecord.due_date < datetime.utcnow()
-                )
-            
-            pagination = query.order_by(BorrowRecord.borrow_date.desc()).paginate(
+            pagination = self.build_query(request.args).paginate(
                 page=page, per_page=per_page, error_out=False
             )
             
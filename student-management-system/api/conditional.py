@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+条件请求支持（ETag / Last-Modified）
+Conditional GET Support
+
+读接口根据相关数据表的版本号（见 models/table_versions.py）生成 ETag，
+客户端携带 If-None-Match 且版本未变化时直接返回 304，
+跳过查询与序列化。
+"""
+
+import hashlib
+from functools import wraps
+from email.utils import format_datetime
+from datetime import timezone
+
+from flask import g, request, Response
+from models.table_versions import read_versions
+
+
+def table_fingerprint(*models):
+    """
+    一次主键查询获取多张表的指纹
+
+    返回 (指纹字符串, 最近写入时间)。指纹由各表的版本号组成，
+    新增、修改和删除提交时版本号都会推进。
+    在 /api/batch 批量请求中结果缓存在 g.batch_cache，写请求后失效。
+    """
+    cache = g.get('batch_cache')
+    tables = tuple(model.__tablename__ for model in models)
+    key = ('fingerprint',) + tables
+    if cache is not None and key in cache:
+        return cache[key]
+
+    parts = []
+    last_modified = None
+    for table, (version, updated_at) in zip(tables, read_versions(*tables)):
+        parts.append(f'{table}:{version}')
+        if updated_at and (last_modified is None or updated_at > last_modified):
+            last_modified = updated_at
+
+    result = '|'.join(parts), last_modified
+    if cache is not None:
+        cache[key] = result
+    return result
+
+
+def make_etag(fingerprint):
+    """根据指纹和请求地址生成ETag摘要（不含引号）"""
+    return hashlib.sha1(f'{request.full_path}#{fingerprint}'.encode('utf-8')).hexdigest()
+
+
+def conditional_get(*models, batch_models=()):
+    """
+    条件GET装饰器
+
+    用法: 在 Resource.get 上声明响应所依赖的模型，
+    例如 @conditional_get(Book, BorrowRecord)。
+    batch_models 为带 ids 参数批量获取时响应额外展开的模型，
+    普通列表请求不计入指纹，避免无关表的写入使列表的304失效。
+    只依据 If-None-Match 判断 304；Last-Modified 为相关表最近一次提交写入的时间，仅作参考。
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            depends_on = models + tuple(batch_models) if 'ids' in request.args else models
+            fingerprint, last_modified = table_fingerprint(*depends_on)
+            etag = make_etag(fingerprint)
+
+            headers = {
+                'ETag': f'W/"{etag}"',
+                'Cache-Control': 'no-cache'
+            }
+            if last_modified:
+                headers['Last-Modified'] = format_datetime(
+                    last_modified.replace(tzinfo=timezone.utc), usegmt=True
+                )
+
+            if request.if_none_match.contains_weak(etag):
+                return Response(status=304, headers=headers)
+
+            result = f(*args, **kwargs)
+            data, status = result[0], result[1]
+            if status != 200:
+                return result
+            return data, status, headers
+
+        return decorated_function
+    return decorator
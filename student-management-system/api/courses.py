@@ -7,41 +7,55 @@ Course API Resources
 
 from flask import request
 from flask_restful import Resource
-from models import db, Course
+from models import db, Course, Student, Enrollment
+from models.prerequisite import get_prerequisite_graph
 from sqlalchemy.exc import IntegrityError
+from .conditional import conditional_get
+from .multi_get import parse_ids, fetch_by_ids
+from .roster import parse_fields, roster_page, roster_pages
 
 class CourseListAPI(Resource):
     """课程列表API"""
     
+    @staticmethod
+    def build_query(args):
+        """根据查询参数构建课程列表查询（未分页）"""
+        search = args.get('search', '')
+        semester = args.get('semester', '')
+        status = args.get('status', '')
+        
+        query = Course.query
+        
+        if search:
+            query = query.filter(
+                db.or_(
+                    Course.code.contains(search),
+                    Course.name.contains(search),
+                    Course.teacher.contains(search)
+                )
+            )
+        
+        if semester:
+            query = query.filter(Course.semester == semester)
+        
+        if status:
+            query = query.filter(Course.status == status)
+        
+        return query.options(Course.with_students_count())
+    
+    @conditional_get(Course, Enrollment, batch_models=(Student,))
     def get(self):
-        """获取课程列表"""
+        """获取课程列表（带 ids 参数时按ID批量获取）"""
         try:
+            if 'ids' in request.args:
+                return self.get_many(request.args['ids'])
+            
             # 获取查询参数
             page = request.args.get('page', 1, type=int)
             per_page = request.args.get('per_page', 10, type=int)
-            search = request.args.get('search', '')
-            semester = request.args.get('semester', '')
-            status = request.args.get('status', '')
             
             # 构建查询
-            query = Course.query
-            
-            if search:
-                query = query.filter(
-                    db.or_(
-                        Course.code.contains(search),
-                        Course.name.contains(search),
-                        Course.teacher.contains(search)
-                    )
-                )
-            
-            if semester:
-                query = query.filter(Course.semester == semester)
-            
-            if status:
-                query = query.filter(Course.status == status)
-            
-            pagination = query.paginate(
+            pagination = self.build_query(request.args).paginate(
                 page=page, per_page=per_page, error_out=False
             )
             
@@ -70,6 +84,36 @@ class CourseListAPI(Resource):
                 'message': f'获取课程列表失败: {str(e)}'
             }, 500
     
+    def get_many(self, raw_ids):
+        """按ID批量获取课程详情（含花名册第一页），查询数与ID个数无关"""
+        try:
+            ids = parse_ids(raw_ids)
+        except ValueError as e:
+            return {
+                'success': False,
+                'message': str(e)
+            }, 400
+        
+        courses, missing_ids = fetch_by_ids(Course, ids, Course.with_students_count())
+        # 与课程详情一致：选课人数和花名册第一页，完整名单见 /courses/<id>/students
+        rosters = roster_pages({course.id: course.current_students_count for course in courses})
+        
+        courses_data = []
+        for course in courses:
+            course_data = course.to_dict()
+            course_data['enrolled_students'] = rosters[course.id]['students']
+            course_data['roster_pagination'] = rosters[course.id]['pagination']
+            courses_data.append(course_data)
+        
+        return {
+            'success': True,
+            'data': {
+                'courses': courses_data,
+                'missing_ids': missing_ids
+            },
+            'message': '批量获取课程成功'
+        }, 200
+    
     def post(self):
         """创建新课程"""
         try:
@@ -100,6 +144,14 @@ class CourseListAPI(Resource):
                 'message': '课程代码已存在'
             }, 400
             
+        except ValueError as e:
+            # 上课时间无法解析
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': str(e)
+            }, 400
+            
         except Exception as e:
             db.session.rollback()
             return {
@@ -110,14 +162,22 @@ class CourseListAPI(Resource):
 class CourseAPI(Resource):
     """单个课程API"""
     
+    @conditional_get(Course, Enrollment, Student)
     def get(self, course_id):
         """获取课程详情"""
         try:
-            course = Course.query.get_or_404(course_id)
+            course = Course.query.options(Course.with_students_count()).filter_by(id=course_id).first()
+            if course is None:
+                return {
+                    'success': False,
+                    'message': '课程不存在'
+                }, 404
             
-            # 获取详细信息
+            # 获取详细信息：选课人数和花名册第一页，完整名单见 /courses/<id>/students
             course_data = course.to_dict()
-            course_data['enrolled_students'] = [student.to_dict() for student in course.enrolled_students]
+            roster = roster_page(course.id, total=course.current_students_count)
+            course_data['enrolled_students'] = roster['students']
+            course_data['roster_pagination'] = roster['pagination']
             
             return {
                 'success': True,
@@ -153,6 +213,14 @@ class CourseAPI(Resource):
                 'message': '课程代码已存在'
             }, 400
             
+        except ValueError as e:
+            # 上课时间无法解析
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': str(e)
+            }, 400
+            
         except Exception as e:
             db.session.rollback()
             return {
@@ -186,3 +254,82 @@ class CourseAPI(Resource):
                 'success': False,
                 'message': f'删除课程失败: {str(e)}'
             }, 500
+
+class CourseRosterAPI(Resource):
+    """课程花名册API"""
+    
+    @conditional_get(Course, Enrollment, Student)
+    def get(self, course_id):
+        """分页获取课程的在读学生（按学号排序，?fields= 指定返回字段）"""
+        try:
+            if db.session.get(Course, course_id) is None:
+                return {
+                    'success': False,
+                    'message': '课程不存在'
+                }, 404
+            
+            try:
+                fields = parse_fields(request.args.get('fields', ''))
+            except ValueError as e:
+                return {
+                    'success': False,
+                    'message': str(e)
+                }, 400
+            
+            roster = roster_page(
+                course_id,
+                page=request.args.get('page', 1, type=int),
+                per_page=request.args.get('per_page', 20, type=int),
+                fields=fields,
+                descending=request.args.get('order', 'asc') == 'desc'
+            )
+            
+            return {
+                'success': True,
+                'data': roster,
+                'message': '获取课程花名册成功'
+            }, 200
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'获取课程花名册失败: {str(e)}'
+            }, 500
+
+class CoursePrerequisitesAPI(Resource):
+    """课程先修关系API"""
+    
+    def get(self, course_id):
+        """获取课程的直接先修、全部（含间接）先修课程，以及以本课程为先修的课程"""
+        try:
+            course = db.session.get(Course, course_id)
+            if course is None:
+                return {
+                    'success': False,
+                    'message': '课程不存在'
+                }, 404
+            
+            graph = get_prerequisite_graph()
+            direct = graph.direct(course_id)
+            required = graph.closure(course_id)
+            courses = Course.query.filter(Course.id.in_(required)).order_by(Course.code).all() if required else []
+            
+            def brief(item):
+                return {'id': item.id, 'code': item.code, 'name': item.name}
+            
+            return {
+                'success': True,
+                'data': {
+                    'course': brief(course),
+                    'direct': [brief(item) for item in courses if item.id in direct],
+                    'all': [brief(item) for item in courses],
+                    'required_by': [brief(item) for item in course.required_by]
+                },
+                'message': '获取先修课程成功'
+            }, 200
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'获取先修课程失败: {str(e)}'
+            }, 500
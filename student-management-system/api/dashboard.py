@@ -9,7 +9,159 @@ from flask import request
 from flask_restful import Resource
 from models import db, Student, Course, Book, Enrollment, BorrowRecord
 from datetime import datetime, timedelta
-from sqlalchemy import func, and_
+from sqlalchemy import func, select
+
+def dashboard_statements(now=None):
+    """
+    仪表板所需的全部查询，互相独立，可顺序或并发执行
+    
+    返回 {名称: (语句, 是否为标量)}。
+    """
+    now = now or datetime.utcnow()
+    week_ago = now - timedelta(days=7)
+    
+    def count(model, *criteria):
+        return select(func.count(model.id)).where(*criteria), True
+    
+    return {
+        # 基础统计
+        'total_students': count(Student),
+        'total_courses': count(Course),
+        'total_books': count(Book),
+        
+        # 学生统计
+        'active_students': count(Student, Student.status == 'active'),
+        
+        # 课程统计
+        'active_courses': count(Course, Course.status == 'active'),
+        'total_enrollments': count(Enrollment, Enrollment.status == 'enrolled'),
+        
+        # 图书统计
+        'available_books': count(Book, Book.status == 'available'),
+        'total_book_copies': (select(func.sum(Book.total_copies)), True),
+        'borrowed_books': count(BorrowRecord, BorrowRecord.status == 'borrowed'),
+        
+        # 借阅统计
+        'overdue_books': count(BorrowRecord, BorrowRecord.status == 'borrowed', BorrowRecord.due_date < now),
+        
+        # 最近7天的统计
+        'new_students_this_week': count(Student, Student.created_at >= week_ago),
+        'new_enrollments_this_week': count(Enrollment, Enrollment.created_at >= week_ago),
+        'new_borrows_this_week': count(BorrowRecord, BorrowRecord.borrow_date >= week_ago),
+        
+        # 专业分布统计
+        'major_stats': (select(
+            Student.major,
+            func.count(Student.id).label('count')
+        ).group_by(Student.major), False),
+        
+        # 年级分布统计
+        'grade_stats': (select(
+            Student.grade,
+            func.count(Student.id).label('count')
+        ).group_by(Student.grade), False),
+        
+        # 热门课程（按选课人数）
+        'popular_courses': (select(
+            Course.name,
+            Course.code,
+            func.count(Enrollment.id).label('enrollment_count')
+        ).join(Enrollment).where(
+            Enrollment.status == 'enrolled'
+        ).group_by(Course.id).order_by(
+            func.count(Enrollment.id).desc()
+        ).limit(5), False),
+        
+        # 热门图书（按借阅次数）
+        'popular_books': (select(
+            Book.title,
+            Book.author,
+            func.count(BorrowRecord.id).label('borrow_count')
+        ).join(BorrowRecord).group_by(Book.id).order_by(
+            func.count(BorrowRecord.id).desc()
+        ).limit(5), False),
+        
+        # 最近活动
+        'recent_enrollments': (select(
+            Student.name, Course.name, Enrollment.created_at
+        ).select_from(Enrollment).join(Student).join(Course).where(
+            Enrollment.status == 'enrolled'
+        ).order_by(Enrollment.created_at.desc()).limit(10), False),
+        
+        'recent_borrows': (select(
+            Student.name, Book.title, BorrowRecord.borrow_date
+        ).select_from(BorrowRecord).join(Student).join(Book).where(
+            BorrowRecord.status == 'borrowed'
+        ).order_by(BorrowRecord.borrow_date.desc()).limit(10), False)
+    }
+
+def build_dashboard_data(results):
+    """由 dashboard_statements() 各查询的结果组装仪表板数据"""
+    total_book_copies = results['total_book_copies'] or 0
+    
+    return {
+        # 基础统计
+        'overview': {
+            'total_students': results['total_students'],
+            'active_students': results['active_students'],
+            'total_courses': results['total_courses'],
+            'active_courses': results['active_courses'],
+            'total_books': results['total_books'],
+            'available_books': results['available_books'],
+            'total_book_copies': total_book_copies,
+            'available_copies': total_book_copies - results['borrowed_books'],
+            'borrowed_books': results['borrowed_books'],
+            'overdue_books': results['overdue_books'],
+            'total_enrollments': results['total_enrollments']
+        },
+        
+        # 本周统计
+        'this_week': {
+            'new_students': results['new_students_this_week'],
+            'new_enrollments': results['new_enrollments_this_week'],
+            'new_borrows': results['new_borrows_this_week']
+        },
+        
+        # 分布统计
+        'distributions': {
+            'majors': [{
+                'major': major,
+                'count': count
+            } for major, count in results['major_stats']],
+            'grades': [{
+                'grade': grade,
+                'count': count
+            } for grade, count in results['grade_stats']]
+        },
+        
+        # 热门数据
+        'popular': {
+            'courses': [{
+                'name': name,
+                'code': code,
+                'enrollment_count': count
+            } for name, code, count in results['popular_courses']],
+            'books': [{
+                'title': title,
+                'author': author,
+                'borrow_count': count
+            } for title, author, count in results['popular_books']]
+        },
+        
+        # 最近活动
+        'recent_activities': {
+            'enrollments': [{
+                'student_name': student_name,
+                'course_name': course_name,
+                'date': created_at.isoformat()
+            } for student_name, course_name, created_at in results['recent_enrollments']],
+            'borrows': [{
+                'student_name': student_name,
+                'book_title': book_title,
+                'date': borrow_date.isoformat()
+            } for student_name, book_title, borrow_date in results['recent_borrows']]
+        }
+    }
 
 class DashboardAPI(Resource):
     """仪表板API"""
@@ -17,145 +169,12 @@ class DashboardAPI(Resource):
     def get(self):
         """获取仪表板统计数据"""
         try:
-            # 基础统计
-            total_students = Student.query.count()
-            total_courses = Course.query.count()
-            total_books = Book.query.count()
-            
-            # 学生统计
-            active_students = Student.query.filter(Student.status == 'active').count()
-            
-            # 课程统计
-            active_courses = Course.query.filter(Course.status == 'active').count()
-            total_enrollments = Enrollment.query.filter(Enrollment.status == 'enrolled').count()
-            
-            # 图书统计
-            available_books = Book.query.filter(Book.status == 'available').count()
-            total_book_copies = db.session.query(func.sum(Book.total_copies)).scalar() or 0
-            borrowed_books = BorrowRecord.query.filter(BorrowRecord.status == 'borrowed').count()
-            available_copies = total_book_copies - borrowed_books
-            
-            # 借阅统计
-            overdue_books = BorrowRecord.query.filter(
-                BorrowRecord.status == 'borrowed',
-                BorrowRecord.due_date < datetime.utcnow()
-            ).count()
-            
-            # 最近7天的统计
-            week_ago = datetime.utcnow() - timedelta(days=7)
-            new_students_this_week = Student.query.filter(Student.created_at >= week_ago).count()
-            new_enrollments_this_week = Enrollment.query.filter(Enrollment.created_at >= week_ago).count()
-            new_borrows_this_week = BorrowRecord.query.filter(BorrowRecord.borrow_date >= week_ago).count()
-            
-            # 专业分布统计
-            major_stats = db.session.query(
-                Student.major, 
-                func.count(Student.id).label('count')
-            ).group_by(Student.major).all()
-            
-            # 年级分布统计
-            grade_stats = db.session.query(
-                Student.grade, 
-                func.count(Student.id).label('count')
-            ).group_by(Student.grade).all()
-            
-            # 热门课程（按选课人数）
-            popular_courses = db.session.query(
-                Course.name,
-                Course.code,
-                func.count(Enrollment.id).label('enrollment_count')
-            ).join(Enrollment).filter(
-                Enrollment.status == 'enrolled'
-            ).group_by(Course.id).order_by(
-                func.count(Enrollment.id).desc()
-            ).limit(5).all()
-            
-            # 热门图书（按借阅次数）
-            popular_books = db.session.query(
-                Book.title,
-                Book.author,
-                func.count(BorrowRecord.id).label('borrow_count')
-            ).join(BorrowRecord).group_by(Book.id).order_by(
-                func.count(BorrowRecord.id).desc()
-            ).limit(5).all()
-            
-            # 最近活动
-            recent_enrollments = db.session.query(Enrollment).join(
-                Student
-            ).join(Course).filter(
-                Enrollment.status == 'enrolled'
-            ).order_by(Enrollment.created_at.desc()).limit(10).all()
-            
-            recent_borrows = db.session.query(BorrowRecord).join(
-                Student
-            ).join(Book).filter(
-                BorrowRecord.status == 'borrowed'
-            ).order_by(BorrowRecord.borrow_date.desc()).limit(10).all()
+            results = {}
+            for name, (statement, scalar) in dashboard_statements().items():
+                result = db.session.execute(statement)
+                results[name] = result.scalar() if scalar else result.all()
             
-            # 构建响应数据
-            dashboard_data = {
-                # 基础统计
-                'overview': {
-                    'total_students': total_students,
-                    'active_students': active_students,
-                    'total_courses': total_courses,
-                    'active_courses': active_courses,
-                    'total_books': total_books,
-                    'available_books': available_books,
-                    'total_book_copies': total_book_copies,
-                    'available_copies': available_copies,
-                    'borrowed_books': borrowed_books,
-                    'overdue_books': overdue_books,
-                    'total_enrollments': total_enrollments
-                },
-                
-                # 本周统计
-                'this_week': {
-                    'new_students': new_students_this_week,
-                    'new_enrollments': new_enrollments_this_week,
-                    'new_borrows': new_borrows_this_week
-                },
-                
-                # 分布统计
-                'distributions': {
-                    'majors': [{
-                        'major': major,
-                        'count': count
-                    } for major, count in major_stats],
-                    'grades': [{
-                        'grade': grade,
-                        'count': count
-                    } for grade, count in grade_stats]
-                },
-                
-                # 热门数据
-                'popular': {
-                    'courses': [{
-                        'name': name,
-                        'code': code,
-                        'enrollment_count': count
-                    } for name, code, count in popular_courses],
-                    'books': [{
-                        'title': title,
-                        'author': author,
-                        'borrow_count': count
-                    } for title, author, count in popular_books]
-                },
-                
-                # 最近活动
-                'recent_activities': {
-                    'enrollments': [{
-                        'student_name': enrollment.student.name,
-                        'course_name': enrollment.course.name,
-                        'date': enrollment.created_at.isoformat()
-                    } for enrollment in recent_enrollments],
-                    'borrows': [{
-                        'student_name': borrow.student.name,
-                        'book_title': borrow.book.title,
-                        'date': borrow.borrow_date.isoformat()
-                    } for borrow in recent_borrows]
-                }
-            }
+            dashboard_data = build_dashboard_data(results)
             
             return {
                 'success': True,
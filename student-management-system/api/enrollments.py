@@ -8,34 +8,43 @@ Enrollment API Resources
 from flask import request
 from flask_restful import Resource
 from models import db, Student, Course, Enrollment
+from models.schedule import find_schedule_conflicts
+from models.prerequisite import missing_prerequisites
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 
 class EnrollmentListAPI(Resource):
     """选课列表API"""
     
+    @staticmethod
+    def build_query(args):
+        """根据查询参数构建选课列表查询（未分页）"""
+        student_id = args.get('student_id', type=int)
+        course_id = args.get('course_id', type=int)
+        status = args.get('status', '')
+        
+        query = Enrollment.query
+        
+        if student_id:
+            query = query.filter(Enrollment.student_id == student_id)
+        
+        if course_id:
+            query = query.filter(Enrollment.course_id == course_id)
+        
+        if status:
+            query = query.filter(Enrollment.status == status)
+        
+        return query.options(joinedload(Enrollment.student), joinedload(Enrollment.course))
+    
     def get(self):
         """获取选课列表"""
         try:
             # 获取查询参数
             page = request.args.get('page', 1, type=int)
             per_page = request.args.get('per_page', 10, type=int)
-            student_id = request.args.get('student_id', type=int)
-            course_id = request.args.get('course_id', type=int)
-            status = request.args.get('status', '')
             
             # 构建查询
-            query = Enrollment.query
-            
-            if student_id:
-                query = query.filter(Enrollment.student_id == student_id)
-            
-            if course_id:
-                query = query.filter(Enrollment.course_id == course_id)
-            
-            if status:
-                query = query.filter(Enrollment.status == status)
-            
-            pagination = query.paginate(
+            pagination = self.build_query(request.args).paginate(
                 page=page, per_page=per_page, error_out=False
             )
             
@@ -98,6 +107,33 @@ class EnrollmentListAPI(Resource):
                     'message': '课程不可选择（已满员或已关闭）'
                 }, 400
             
+            # 检查先修课程（含间接先修）是否均已完成
+            missing = missing_prerequisites(student_id, course_id)
+            if missing:
+                return {
+                    'success': False,
+                    'data': {'missing_prerequisites': [{
+                        'id': prerequisite.id,
+                        'code': prerequisite.code,
+                        'name': prerequisite.name
+                    } for prerequisite in missing]},
+                    'message': '尚未完成先修课程: ' + '、'.join(prerequisite.name for prerequisite in missing)
+                }, 400
+            
+            # 检查与本学期在读课程的上课时间冲突
+            conflicts = find_schedule_conflicts(student_id, course)
+            if conflicts:
+                return {
+                    'success': False,
+                    'data': {'conflicts': [{
+                        'id': other.id,
+                        'code': other.code,
+                        'name': other.name,
+                        'schedule': other.schedule
+                    } for other in conflicts]},
+                    'message': '上课时间与已选课程冲突: ' + '、'.join(other.name for other in conflicts)
+                }, 400
+            
             # 创建或重新激活选课记录
             if existing_enrollment:
                 existing_enrollment.status = 'enrolled'
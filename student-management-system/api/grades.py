@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+课程成绩批量录入API
+Bulk Grade Submission API
+
+POST /api/courses/<id>/grades 一次提交整门课程的成绩：
+- JSON: {"grades": [{"student_id": "2023001", "grade": 95}, ...]}
+- CSV: 上传文件字段 file，或 Content-Type: text/csv 的请求体，表头 student_id,grade（或 学号,成绩）
+成绩按 Enrollment.grade_points 的阈值整批换算为等级和绩点，全部行在一个事务中写入。
+默认存在无效行时不写入任何成绩并返回错误列表；?partial=1 时只写入有效行。
+"""
+
+import csv
+import io
+from datetime import datetime
+
+from flask import current_app, request
+from flask_restful import Resource
+from sqlalchemy import update
+from models import db, Student, Course, Enrollment
+
+CSV_COLUMNS = {
+    'student_id': 'student_id',
+    '学号': 'student_id',
+    'grade': 'grade',
+    '成绩': 'grade'
+}
+
+
+def read_grade_rows():
+    """从JSON或CSV请求中读取成绩行，返回 [{'student_id', 'grade'}]；格式错误时抛出 ValueError"""
+    if request.is_json:
+        data = request.get_json(silent=True)
+        rows = data.get('grades') if isinstance(data, dict) else None
+        if not isinstance(rows, list):
+            raise ValueError('请求体缺少成绩列表 grades')
+        return [row if isinstance(row, dict) else {} for row in rows]
+
+    upload = request.files.get('file')
+    if upload is not None:
+        text = upload.read().decode('utf-8-sig')
+    elif request.mimetype == 'text/csv':
+        text = request.get_data().decode('utf-8-sig')
+    else:
+        raise ValueError('请提交JSON或CSV格式的成绩')
+
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or not {'student_id', 'grade'} <= {
+        CSV_COLUMNS.get(name.strip()) for name in reader.fieldnames
+    }:
+        raise ValueError('CSV表头必须包含 student_id 和 grade 列')
+    return [{CSV_COLUMNS[name.strip()]: value for name, value in row.items()
+             if name and name.strip() in CSV_COLUMNS} for row in reader]
+
+
+def validate_grade_rows(rows, enrollments):
+    """
+    校验成绩行
+
+    enrollments 为 {学号: 选课记录}。返回 (有效行 [(选课记录, 成绩)], 错误列表)，
+    行号从1开始，对应提交顺序。
+    """
+    valid = []
+    errors = []
+    seen = set()
+    for number, row in enumerate(rows, start=1):
+        student_number = str(row.get('student_id') or '').strip()
+        raw_grade = row.get('grade')
+
+        def error(message):
+            errors.append({'row': number, 'student_id': student_number or None, 'message': message})
+
+        if not student_number:
+            error('缺少学号')
+            continue
+        if student_number in seen:
+            error('学号重复')
+            continue
+        seen.add(student_number)
+
+        try:
+            grade = float(raw_grade)
+        except (TypeError, ValueError):
+            error(f'成绩格式不正确: {raw_grade}')
+            continue
+        if not 0 <= grade <= 100:
+            error('成绩必须在0-100之间')
+            continue
+
+        enrollment = enrollments.get(student_number)
+        if enrollment is None:
+            error('该学生未选修本课程')
+            continue
+        valid.append((enrollment, grade))
+    return valid, errors
+
+
+class CourseGradesAPI(Resource):
+    """课程成绩批量录入API"""
+
+    def post(self, course_id):
+        """批量提交课程成绩"""
+        try:
+            course = db.session.get(Course, course_id)
+            if course is None:
+                return {
+                    'success': False,
+                    'message': '课程不存在'
+                }, 404
+
+            try:
+                rows = read_grade_rows()
+            except (ValueError, UnicodeDecodeError) as e:
+                return {
+                    'success': False,
+                    'message': str(e)
+                }, 400
+
+            max_rows = current_app.config.get('GRADE_UPLOAD_MAX_ROWS', 1000)
+            if not rows or len(rows) > max_rows:
+                return {
+                    'success': False,
+                    'message': f'成绩行数必须在1-{max_rows}之间'
+                }, 400
+
+            # 一次查询取回本课程中涉及的全部选课记录（已退课的不能录入成绩）
+            student_numbers = {str(row.get('student_id') or '').strip() for row in rows}
+            enrollments = dict(db.session.query(Student.student_id, Enrollment).join(
+                Student, Enrollment.student_id == Student.id
+            ).filter(
+                Enrollment.course_id == course_id,
+                Enrollment.status.in_(('enrolled', 'completed')),
+                Student.student_id.in_(student_numbers)
+            ).all())
+
+            valid, errors = validate_grade_rows(rows, enrollments)
+            partial = request.args.get('partial', '') in ('1', 'true')
+            if errors and not partial:
+                return {
+                    'success': False,
+                    'data': {'updated': 0, 'errors': errors},
+                    'message': f'有 {len(errors)} 行成绩无效，未写入任何成绩'
+                }, 400
+
+            # 整批换算等级和绩点，一条批量UPDATE写入，一次提交
+            now = datetime.utcnow()
+            scale = Enrollment.grade_points([grade for _, grade in valid])
+            params = [{
+                'id': enrollment.id,
+                'status': 'completed',
+                'grade': grade,
+                'grade_letter': letter,
+                'gpa_points': points,
+                'updated_at': now
+            } for (enrollment, grade), (letter, points) in zip(valid, scale)]
+            if params:
+                db.session.execute(update(Enrollment), params)
+            db.session.commit()
+
+            distribution = {}
+            for letter, _ in scale:
+                distribution[letter] = distribution.get(letter, 0) + 1
+
+            return {
+                'success': True,
+                'data': {
+                    'updated': len(params),
+                    'errors': errors,
+                    'distribution': distribution
+                },
+                'message': f'成功录入 {len(params)} 条成绩'
+            }, 200
+
+        except Exception as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': f'录入成绩失败: {str(e)}'
+            }, 500
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量按ID获取
+Multi-Get by ID List
+
+列表接口接受 ?ids=1,2,3：一次 IN 查询取回对象，按请求顺序返回，
+并报告不存在的ID。关联数据由各模型的 *_by_* 批量方法一次加载。
+"""
+
+from flask import current_app
+
+
+def parse_ids(raw):
+    """解析逗号分隔的ID列表，去重并保持顺序；格式错误或超过上限时抛出 ValueError"""
+    ids = []
+    seen = set()
+    for part in raw.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.isdigit():
+            raise ValueError(f'无效的ID: {part}')
+        value = int(part)
+        if value not in seen:
+            seen.add(value)
+            ids.append(value)
+
+    if not ids:
+        raise ValueError('ID列表不能为空')
+
+    max_ids = current_app.config.get('MULTI_GET_MAX_IDS', 100)
+    if len(ids) > max_ids:
+        raise ValueError(f'一次最多获取 {max_ids} 个ID')
+
+    return ids
+
+
+def fetch_by_ids(model, ids, *options):
+    """一次 IN 查询获取对象，返回 (按 ids 顺序排列的对象列表, 不存在的ID列表)"""
+    query = model.query.filter(model.id.in_(ids))
+    if options:
+        query = query.options(*options)
+    found = {obj.id: obj for obj in query}
+    return [found[i] for i in ids if i in found], [i for i in ids if i not in found]
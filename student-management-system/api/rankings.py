@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+GPA排名API接口
+GPA Ranking API Resources
+"""
+
+from flask import request
+from flask_restful import Resource
+from models import db, Student
+from models.ranking import get_ranking_service
+
+class RankingListAPI(Resource):
+    """群体排名API"""
+    
+    def get(self):
+        """获取某专业和/或年级内的GPA排名"""
+        try:
+            major = request.args.get('major', '')
+            grade = request.args.get('grade', '')
+            
+            if not major and not grade:
+                return {
+                    'success': False,
+                    'message': '必须指定专业或年级'
+                }, 400
+            
+            ranking = get_ranking_service().rank_cohort(major, grade)
+            
+            return {
+                'success': True,
+                'data': {
+                    'major': major or None,
+                    'grade': grade or None,
+                    'students': ranking,
+                    'total': len(ranking)
+                },
+                'message': '获取排名成功'
+            }, 200
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'获取排名失败: {str(e)}'
+            }, 500
+
+class StudentRankingAPI(Resource):
+    """学生排名API"""
+    
+    def get(self, student_id):
+        """获取学生在本专业本年级中的排名和百分位"""
+        try:
+            student = db.session.get(Student, student_id)
+            if student is None:
+                return {
+                    'success': False,
+                    'message': '学生不存在'
+                }, 404
+            
+            return {
+                'success': True,
+                'data': {
+                    'major': student.major,
+                    'grade': student.grade,
+                    'ranking': get_ranking_service().student_rank(student)
+                },
+                'message': '获取学生排名成功'
+            }, 200
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'获取学生排名失败: {str(e)}'
+            }, 500
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+课程花名册
+Course Roster
+
+按学号排序分页返回课程的在读选课学生，只查询 ?fields= 指定的列。
+可选字段不含身份证号、地址等敏感信息。
+"""
+
+import math
+
+from flask import current_app
+from sqlalchemy import func
+from models import db, Student, Enrollment
+from models.ranking import window_functions_supported
+
+# 可投影字段: 名称 -> 列
+ROSTER_FIELDS = {
+    'id': Student.id,
+    'student_id': Student.student_id,
+    'name': Student.name,
+    'gender': Student.gender,
+    'major': Student.major,
+    'grade': Student.grade,
+    'class_name': Student.class_name,
+    'email': Student.email,
+    'phone': Student.phone,
+    'status': Student.status,
+    'enrollment_id': Enrollment.id,
+    'enrollment_date': Enrollment.enrollment_date
+}
+
+DEFAULT_ROSTER_FIELDS = ['id', 'student_id', 'name', 'major', 'grade', 'class_name']
+
+
+def parse_fields(raw):
+    """解析逗号分隔的字段列表，未指定时使用默认字段；包含未知字段时抛出 ValueError"""
+    if not raw:
+        return list(DEFAULT_ROSTER_FIELDS)
+
+    fields = []
+    for part in raw.split(','):
+        part = part.strip()
+        if not part or part in fields:
+            continue
+        if part not in ROSTER_FIELDS:
+            raise ValueError(f'不支持的字段: {part}')
+        fields.append(part)
+
+    if not fields:
+        raise ValueError('字段列表不能为空')
+    return fields
+
+
+def roster_page(course_id, page=1, per_page=20, fields=None, descending=False, total=None):
+    """
+    查询一页花名册，返回 {'students': [...], 'pagination': {...}}
+
+    已知选课人数时传入 total（如课程已加载的 current_students_count），省去计数查询。
+    """
+    fields = fields or DEFAULT_ROSTER_FIELDS
+    order = Student.student_id.desc() if descending else Student.student_id.asc()
+    query = db.session.query(*(ROSTER_FIELDS[field].label(field) for field in fields)).select_from(
+        Enrollment
+    ).join(
+        Student, Enrollment.student_id == Student.id
+    ).filter(
+        Enrollment.course_id == course_id,
+        Enrollment.status == 'enrolled'
+    ).order_by(order)
+
+    pagination = query.paginate(
+        page=page, per_page=per_page, error_out=False, count=total is None,
+        max_per_page=current_app.config.get('ROSTER_MAX_PER_PAGE', 100)
+    )
+    if total is not None:
+        pagination.total = total
+
+    return {
+        'students': [_roster_item(row._asdict()) for row in pagination.items],
+        'pagination': {
+            'page': pagination.page,
+            'per_page': pagination.per_page,
+            'total': pagination.total,
+            'pages': pagination.pages,
+            'has_prev': pagination.has_prev,
+            'has_next': pagination.has_next
+        }
+    }
+
+
+def roster_pages(totals, per_page=20, fields=None):
+    """
+    批量查询多门课程的花名册第一页，返回 {课程ID: {'students': [...], 'pagination': {...}}}
+
+    totals 为 {课程ID: 选课人数}。用 ROW_NUMBER() 按课程分区编号后一次取回每门课的前 per_page 人，
+    查询数与课程数无关；数据库不支持窗口函数时逐门课程调用 roster_page。
+    """
+    fields = fields or DEFAULT_ROSTER_FIELDS
+    if not totals:
+        return {}
+    if not window_functions_supported(db.engine):
+        return {
+            course_id: roster_page(course_id, per_page=per_page, fields=fields, total=total)
+            for course_id, total in totals.items()
+        }
+
+    row_number = func.row_number().over(
+        partition_by=Enrollment.course_id, order_by=Student.student_id.asc()
+    ).label('row_number')
+    numbered = db.session.query(
+        Enrollment.course_id.label('course_id'),
+        row_number,
+        *(ROSTER_FIELDS[field].label(field) for field in fields)
+    ).select_from(
+        Enrollment
+    ).join(
+        Student, Enrollment.student_id == Student.id
+    ).filter(
+        Enrollment.course_id.in_(list(totals)),
+        Enrollment.status == 'enrolled'
+    ).subquery()
+
+    rows = db.session.query(
+        numbered.c.course_id, *(numbered.c[field] for field in fields)
+    ).filter(
+        numbered.c.row_number <= per_page
+    ).order_by(numbered.c.course_id, numbered.c.row_number).all()
+
+    students = {course_id: [] for course_id in totals}
+    for row in rows:
+        item = row._asdict()
+        students[item.pop('course_id')].append(_roster_item(item))
+
+    return {
+        course_id: {
+            'students': students[course_id],
+            'pagination': {
+                'page': 1,
+                'per_page': per_page,
+                'total': total,
+                'pages': math.ceil(total / per_page) if total else 0,
+                'has_prev': False,
+                'has_next': total > per_page
+            }
+        }
+        for course_id, total in totals.items()
+    }
+
+
+def _roster_item(item):
+    """花名册行转为可序列化的字典"""
+    if item.get('enrollment_date') is not None:
+        item['enrollment_date'] = item['enrollment_date'].isoformat()
+    return item
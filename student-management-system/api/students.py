@@ -7,27 +7,37 @@ Student API Resources
 
 from flask import request
 from flask_restful import Resource
-from models import db, Student
+from models import db, Student, Course, Book, Enrollment, BorrowRecord
 from sqlalchemy.exc import IntegrityError
+from .conditional import conditional_get
+from .multi_get import parse_ids, fetch_by_ids
 
 class StudentListAPI(Resource):
     """学生列表API"""
     
+    @staticmethod
+    def build_query(args):
+        """根据查询参数构建学生列表查询（未分页）"""
+        search = args.get('search', '')
+        if search:
+            return Student.search_query(search)
+        return Student.query
+    
+    @conditional_get(Student, batch_models=(Enrollment, Course, BorrowRecord, Book))
     def get(self):
-        """获取学生列表"""
+        """获取学生列表（带 ids 参数时按ID批量获取）"""
         try:
+            if 'ids' in request.args:
+                return self.get_many(request.args['ids'])
+            
             # 获取查询参数
             page = request.args.get('page', 1, type=int)
             per_page = request.args.get('per_page', 10, type=int)
-            search = request.args.get('search', '')
             
             # 构建查询
-            if search:
-                pagination = Student.search(search, page=page, per_page=per_page)
-            else:
-                pagination = Student.query.paginate(
-                    page=page, per_page=per_page, error_out=False
-                )
+            pagination = self.build_query(request.args).paginate(
+                page=page, per_page=per_page, error_out=False
+            )
             
             # 构建响应数据
             students = [student.to_dict() for student in pagination.items]
@@ -54,6 +64,37 @@ class StudentListAPI(Resource):
                 'message': f'获取学生列表失败: {str(e)}'
             }, 500
     
+    def get_many(self, raw_ids):
+        """按ID批量获取学生详情（含已选课程和已借图书），查询数与ID个数无关"""
+        try:
+            ids = parse_ids(raw_ids)
+        except ValueError as e:
+            return {
+                'success': False,
+                'message': str(e)
+            }, 400
+        
+        students, missing_ids = fetch_by_ids(Student, ids)
+        found_ids = [student.id for student in students]
+        enrolled_courses = Student.enrolled_courses_by_student(found_ids)
+        borrowed_books = Student.borrowed_books_by_student(found_ids)
+        
+        students_data = []
+        for student in students:
+            student_data = student.to_dict()
+            student_data['enrolled_courses'] = [course.to_dict() for course in enrolled_courses[student.id]]
+            student_data['borrowed_books'] = [book.to_dict() for book in borrowed_books[student.id]]
+            students_data.append(student_data)
+        
+        return {
+            'success': True,
+            'data': {
+                'students': students_data,
+                'missing_ids': missing_ids
+            },
+            'message': '批量获取学生成功'
+        }, 200
+    
     def post(self):
         """创建新学生"""
         try:
@@ -103,15 +144,21 @@ class StudentListAPI(Resource):
 class StudentAPI(Resource):
     """单个学生API"""
     
+    @conditional_get(Student, Enrollment, Course, BorrowRecord, Book)
     def get(self, student_id):
         """获取学生详情"""
         try:
-            student = Student.query.get_or_404(student_id)
+            detail = Student.load_detail(student_id)
+            if detail is None:
+                return {
+                    'success': False,
+                    'message': '学生不存在'
+                }, 404
             
             # 获取详细信息
-            student_data = student.to_dict()
-            student_data['enrolled_courses'] = [course.to_dict() for course in student.enrolled_courses]
-            student_data['borrowed_books'] = [book.to_dict() for book in student.borrowed_books]
+            student_data = detail['student'].to_dict()
+            student_data['enrolled_courses'] = [e.course.to_dict() for e in detail['enrollments']]
+            student_data['borrowed_books'] = [r.book.to_dict() for r in detail['borrow_records']]
             
             return {
                 'success': True,
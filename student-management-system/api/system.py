@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+系统状态API接口
+System Status API Resources
+"""
+
+from flask import current_app, request
+from flask_restful import Resource
+from models import db
+from models.pool import pool_stats, check_health
+
+class PoolStatsAPI(Resource):
+    """数据库连接池统计API"""
+    
+    def get(self):
+        """获取连接池状态和事件计数"""
+        try:
+            stats = pool_stats(db.engine)
+            monitor = current_app.extensions.get('pool_monitor')
+            if monitor is not None:
+                stats['events'] = monitor.to_dict()
+            
+            stats['config'] = {
+                key: value for key, value in current_app.config['SQLALCHEMY_ENGINE_OPTIONS'].items()
+                if key.startswith('pool') or key == 'max_overflow'
+            }
+            
+            return {
+                'success': True,
+                'data': {'pool': stats},
+                'message': '获取连接池状态成功'
+            }, 200
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'获取连接池状态失败: {str(e)}'
+            }, 500
+
+class HealthAPI(Resource):
+    """数据库健康检查API"""
+    
+    def get(self):
+        """执行数据库探活"""
+        healthy, latency_ms, error = check_health(db.engine)
+        
+        data = {
+            'database': 'ok' if healthy else 'error',
+            'latency_ms': latency_ms
+        }
+        if error:
+            data['error'] = error
+        
+        return {
+            'success': healthy,
+            'data': data,
+            'message': '数据库连接正常' if healthy else '数据库连接异常'
+        }, 200 if healthy else 503
+
+class SlowQueryAPI(Resource):
+    """慢查询采样记录API"""
+    
+    def get(self):
+        """获取慢查询记录（最新的在前）"""
+        profiler = current_app.extensions.get('query_profiler')
+        if profiler is None:
+            return {
+                'success': False,
+                'message': '慢查询采样未启用'
+            }, 404
+        
+        limit = request.args.get('limit', 50, type=int)
+        return {
+            'success': True,
+            'data': {
+                'profiler': profiler.to_dict(),
+                'queries': profiler.records(limit=limit)
+            },
+            'message': '获取慢查询记录成功'
+        }, 200
+    
+    def delete(self):
+        """清空慢查询记录"""
+        profiler = current_app.extensions.get('query_profiler')
+        if profiler is None:
+            return {
+                'success': False,
+                'message': '慢查询采样未启用'
+            }, 404
+        
+        profiler.clear()
+        return {
+            'success': True,
+            'message': '慢查询记录已清空'
+        }, 200
+
+class RequestStatsAPI(Resource):
+    """端点请求统计API"""
+    
+    def get(self):
+        """获取各端点的请求数、耗时和语句数直方图"""
+        stats = current_app.extensions.get('request_stats')
+        if stats is None:
+            return {
+                'success': False,
+                'message': '请求统计未启用'
+            }, 404
+        
+        endpoints = sorted(stats.endpoints(), key=lambda e: e['requests'], reverse=True)
+        return {
+            'success': True,
+            'data': {
+                'n_plus_one_threshold': stats.n_plus_one_threshold,
+                'endpoints': endpoints
+            },
+            'message': '获取请求统计成功'
+        }, 200
+    
+    def delete(self):
+        """清空请求统计"""
+        stats = current_app.extensions.get('request_stats')
+        if stats is None:
+            return {
+                'success': False,
+                'message': '请求统计未启用'
+            }, 404
+        
+        stats.reset()
+        return {
+            'success': True,
+            'message': '请求统计已清空'
+        }, 200
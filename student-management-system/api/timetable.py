@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+排课API接口
+Timetable API Resources
+
+POST /api/timetable/solve 为一个学期的课程自动分配教室和上课时间：
+{"semester": "2024春", "classrooms": [{"name": "A101", "capacity": 60}, ...],
+ "teacher_unavailable": {"王教授": "周一1-4节，周五9-10节"}, "apply": false}
+apply 为 false 时只返回方案；为 true 时写回课程的 classroom 和 schedule。
+GET /api/timetable/conflicts 检查现有排课中同一教室或同一教师的时间冲突。
+"""
+
+from flask import current_app, request
+from flask_restful import Resource
+from models import db
+from models.timetable import solve_semester, find_timetable_conflicts, DEFAULT_WEEKDAYS, DEFAULT_BLOCKS
+
+def read_classrooms(data):
+    """校验教室列表，返回 [{'name', 'capacity'}]；格式错误时抛出 ValueError"""
+    classrooms = data.get('classrooms')
+    if not isinstance(classrooms, list) or not classrooms:
+        raise ValueError('缺少教室列表 classrooms')
+    
+    result = []
+    names = set()
+    for room in classrooms:
+        if not isinstance(room, dict):
+            raise ValueError('教室格式应为 {"name": ..., "capacity": ...}')
+        name = str(room.get('name') or '').strip()
+        capacity = room.get('capacity')
+        if not name:
+            raise ValueError('教室名称不能为空')
+        if name in names:
+            raise ValueError(f'教室重复: {name}')
+        if not isinstance(capacity, int) or isinstance(capacity, bool) or capacity <= 0:
+            raise ValueError(f'教室 {name} 的容量必须为正整数')
+        names.add(name)
+        result.append({'name': name, 'capacity': capacity})
+    return result
+
+class TimetableSolveAPI(Resource):
+    """自动排课API"""
+    
+    def post(self):
+        """为学期课程分配教室和上课时间"""
+        try:
+            data = request.get_json(silent=True)
+            if not isinstance(data, dict) or not data.get('semester'):
+                return {
+                    'success': False,
+                    'message': '缺少开课学期 semester'
+                }, 400
+            
+            teacher_unavailable = data.get('teacher_unavailable') or {}
+            try:
+                classrooms = read_classrooms(data)
+                if not isinstance(teacher_unavailable, dict):
+                    raise ValueError('teacher_unavailable 应为 {教师: 不可用时间} 的对象')
+                result = solve_semester(
+                    data['semester'],
+                    classrooms,
+                    teacher_unavailable,
+                    weekdays=current_app.config.get('TIMETABLE_WEEKDAYS', DEFAULT_WEEKDAYS),
+                    blocks=current_app.config.get('TIMETABLE_BLOCKS', DEFAULT_BLOCKS),
+                    apply=bool(data.get('apply'))
+                )
+            except ValueError as e:
+                db.session.rollback()
+                return {
+                    'success': False,
+                    'message': str(e)
+                }, 400
+            
+            if result['unassigned']:
+                message = f'排课完成，{len(result["unassigned"])} 门课程无法安排'
+            else:
+                message = f'排课完成，共安排 {len(result["assignments"])} 门课程'
+            
+            return {
+                'success': True,
+                'data': result,
+                'message': message
+            }, 200
+            
+        except Exception as e:
+            db.session.rollback()
+            return {
+                'success': False,
+                'message': f'排课失败: {str(e)}'
+            }, 500
+
+class TimetableConflictsAPI(Resource):
+    """排课冲突检查API"""
+    
+    def get(self):
+        """检查同一教室或同一教师的上课时间冲突（?semester= 限定学期）"""
+        try:
+            conflicts = find_timetable_conflicts(request.args.get('semester', ''))
+            total = len(conflicts['classrooms']) + len(conflicts['teachers'])
+            
+            return {
+                'success': True,
+                'data': conflicts,
+                'message': f'发现 {total} 处排课冲突' if total else '没有排课冲突'
+            }, 200
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'检查排课冲突失败: {str(e)}'
+            }, 500
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+成绩单API接口
+Transcript API Resources
+"""
+
+from flask import request
+from flask_restful import Resource
+from models import db, Student, Course, Enrollment
+from models.transcript import student_gpa, transcript_courses, cohort_gpas
+from .conditional import conditional_get
+
+class StudentTranscriptAPI(Resource):
+    """学生成绩单API"""
+    
+    @conditional_get(Student, Enrollment, Course)
+    def get(self, student_id):
+        """获取学生成绩单：已完成课程、各学期GPA和总GPA"""
+        try:
+            student = db.session.get(Student, student_id)
+            if student is None:
+                return {
+                    'success': False,
+                    'message': '学生不存在'
+                }, 404
+            
+            gpa = student_gpa(student_id)
+            
+            return {
+                'success': True,
+                'data': {
+                    'student': {
+                        'id': student.id,
+                        'student_id': student.student_id,
+                        'name': student.name,
+                        'major': student.major,
+                        'grade': student.grade
+                    },
+                    'gpa': gpa['overall'],
+                    'semesters': gpa['semesters'],
+                    'courses': transcript_courses(student_id)
+                },
+                'message': '获取成绩单成功'
+            }, 200
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'获取成绩单失败: {str(e)}'
+            }, 500
+
+class TranscriptListAPI(Resource):
+    """批量GPA API"""
+    
+    @conditional_get(Student, Enrollment, Course)
+    def get(self):
+        """按专业和/或年级批量获取学生GPA（?by_semester=1 附带各学期GPA）"""
+        try:
+            major = request.args.get('major', '')
+            grade = request.args.get('grade', '')
+            by_semester = request.args.get('by_semester', '') in ('1', 'true')
+            
+            if not major and not grade:
+                return {
+                    'success': False,
+                    'message': '必须指定专业或年级'
+                }, 400
+            
+            students = cohort_gpas(major=major, grade=grade, by_semester=by_semester)
+            
+            return {
+                'success': True,
+                'data': {
+                    'students': students,
+                    'total': len(students)
+                },
+                'message': '获取GPA成功'
+            }, 200
+            
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'获取GPA失败: {str(e)}'
+            }, 500
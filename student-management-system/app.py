@@ -14,26 +14,50 @@ from flask import Flask, render_template, redirect, url_for
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_cors import CORS
+from sqlalchemy import inspect, text
 
 # 导入配置
-from config import Config
+from config import Config, engine_options
 from models import db
+from models.pool import init_pool_monitor
+from models.sqlite_tuning import init_sqlite_tuning
+from models.query_profiler import init_query_profiler
+from models.routing import init_read_replica
+from models.table_versions import init_table_versions
+from models.ranking import init_ranking
+from models.grade_stats import init_grade_stats
+from models.prerequisite import init_prerequisites
 from api import api_bp
 from views import main_bp
+from views.cache import init_page_cache
+from async_api import async_api_bp, init_async_api
+from instrumentation import init_instrumentation
 
 def create_app(config_class=Config):
     """应用工厂函数"""
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
     
     # 初始化扩展
     db.init_app(app)
+    init_sqlite_tuning(app)
+    init_pool_monitor(app)
+    init_query_profiler(app)
+    init_table_versions(app)
     Migrate(app, db)
     CORS(app)
+    init_page_cache(app)
+    init_ranking(app)
+    init_grade_stats(app)
+    init_prerequisites(app)
     
     # 注册蓝图
     app.register_blueprint(api_bp, url_prefix='/api')
     app.register_blueprint(main_bp)
+    init_instrumentation(app, [api_bp, main_bp, async_api_bp])
+    init_read_replica(app, [api_bp, main_bp])
+    init_async_api(app)
     
     # 主页路由
     @app.route('/')
@@ -58,6 +82,25 @@ def init_database(app):
         # 创建所有表
         db.create_all()
         
+        # create_all 不会给已存在的表补建新增的列（只补可为空的列）和索引
+        inspector = inspect(db.engine)
+        for table in db.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    with db.engine.begin() as connection:
+                        connection.execute(text(
+                            f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column.type.compile(db.engine.dialect)}'
+                        ))
+            for index in table.indexes:
+                index.create(db.engine, checkfirst=True)
+        
+        # 为已有课程从文本补建结构化上课时段和先修关系
+        from models.schedule import backfill_schedule_slots
+        from models.prerequisite import backfill_prerequisites
+        backfill_schedule_slots()
+        backfill_prerequisites()
+        
         # 创建示例数据
         from models.student import Student
         from models.course import Course
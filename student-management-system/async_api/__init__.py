@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步API模块
+Async API Module
+
+读多写少接口的异步版本，挂载在 /api/async 下：
+仪表板的各项统计和列表接口的计数/数据查询在独立连接上并发执行，
+响应格式与 /api 下的同步接口一致。
+
+依赖 asgiref（Flask异步视图）和对应的异步数据库驱动（如 aiosqlite），
+未安装时不注册该蓝图，同步接口不受影响。
+"""
+
+import importlib.util
+
+from flask import Blueprint
+
+# 创建异步API蓝图
+async_api_bp = Blueprint('async_api', __name__)
+
+# 导入所有视图
+from . import views
+
+
+def init_async_api(app):
+    """创建异步引擎并注册异步API蓝图，依赖缺失时返回None"""
+    if not app.config.get('ASYNC_API_ENABLED', True):
+        return None
+
+    if importlib.util.find_spec('asgiref') is None:
+        app.logger.warning('未安装 asgiref，异步API未启用（pip install "flask[async]"）')
+        return None
+
+    from .engine import create_async_engine_for
+    try:
+        engine = create_async_engine_for(app)
+    except (ImportError, ValueError) as e:
+        app.logger.warning('异步API未启用: %s', e)
+        return None
+
+    app.extensions['async_engine'] = engine
+    app.register_blueprint(async_api_bp, url_prefix='/api/async')
+
+    if 'request_stats' in app.extensions:
+        from instrumentation import instrument_engine
+        instrument_engine(engine.sync_engine)
+
+    return engine
+
+
+__all__ = ['async_api_bp', 'init_async_api']
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步数据库引擎
+Async Database Engine
+
+由同步数据库URL推导异步驱动URL（sqlite→aiosqlite、postgresql→asyncpg、mysql→aiomysql），
+并提供把多条互相独立的查询分发到不同连接上并发执行的工具函数。
+
+Flask 在每个异步视图调用中创建新的事件循环，连接不能跨循环复用，
+因此引擎使用 NullPool：每个并发查询打开自己的连接，用完即关。
+"""
+
+import asyncio
+import math
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from models.sqlite_tuning import DEFAULT_SQLITE_PRAGMAS, install_sqlite_pragmas
+
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'mysql': 'mysql+aiomysql'
+}
+
+
+def async_database_url(url):
+    """将同步数据库URL转换为异步驱动URL"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'不支持的异步数据库: {backend}')
+    if backend == 'sqlite' and url.database in (None, '', ':memory:'):
+        raise ValueError('内存SQLite无法与异步引擎共享数据')
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def create_async_engine_for(app):
+    """根据应用配置创建异步引擎（缺少异步驱动时抛出 ImportError）"""
+    url = app.config.get('ASYNC_DATABASE_URL') or async_database_url(app.config['SQLALCHEMY_DATABASE_URI'])
+    engine = create_async_engine(url, poolclass=NullPool)
+
+    if app.config.get('SQLITE_TUNING_ENABLED', True):
+        pragmas = dict(DEFAULT_SQLITE_PRAGMAS)
+        pragmas.update(app.config.get('SQLITE_PRAGMAS') or {})
+        install_sqlite_pragmas(engine.sync_engine, pragmas)
+
+    return engine
+
+
+async def gather_statements(engine, statements, max_concurrency=8):
+    """
+    并发执行互相独立的查询
+
+    statements 为 {名称: (语句, 是否为标量)}，每条语句使用独立连接，
+    同时进行的查询数不超过 max_concurrency。返回 {名称: 标量值或行列表}。
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def run(statement, scalar):
+        async with semaphore:
+            async with engine.connect() as connection:
+                result = await connection.execute(statement)
+                return result.scalar() if scalar else result.all()
+
+    names = list(statements)
+    values = await asyncio.gather(*(run(*statements[name]) for name in names))
+    return dict(zip(names, values))
+
+
+async def paginate(engine, query, page=1, per_page=10):
+    """
+    并发执行分页的计数查询和数据查询
+
+    query 为同步的 ORM 查询（如 ListAPI.build_query() 的返回值），仅使用其生成的语句。
+    返回 (对象列表, 分页信息字典)，分页信息与 Flask-SQLAlchemy 分页对象的字段一致。
+    """
+    page = max(page, 1)
+    per_page = max(per_page, 1)
+    statement = query.statement
+
+    async def fetch_items():
+        async with AsyncSession(engine, expire_on_commit=False) as session:
+            result = await session.execute(statement.limit(per_page).offset((page - 1) * per_page))
+            return result.unique().scalars().all()
+
+    async def fetch_total():
+        count = select(func.count()).select_from(statement.order_by(None).subquery())
+        async with engine.connect() as connection:
+            return (await connection.execute(count)).scalar()
+
+    items, total = await asyncio.gather(fetch_items(), fetch_total())
+    pages = math.ceil(total / per_page) if total else 0
+    return items, {
+        'page': page,
+        'per_page': per_page,
+        'total': total,
+        'pages': pages,
+        'has_prev': page > 1,
+        'has_next': page < pages
+    }
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步API视图
+Async API Views
+"""
+
+from flask import current_app, request
+from flask.views import MethodView
+
+from . import async_api_bp
+from .engine import gather_statements, paginate
+from api.dashboard import dashboard_statements, build_dashboard_data
+from api.students import StudentListAPI
+from api.courses import CourseListAPI
+from api.books import BookListAPI
+from api.enrollments import EnrollmentListAPI
+from api.borrows import BorrowListAPI
+
+
+class AsyncDashboardAPI(MethodView):
+    """仪表板API（异步）"""
+
+    async def get(self):
+        """获取仪表板统计数据，各项统计并发查询"""
+        try:
+            results = await gather_statements(
+                current_app.extensions['async_engine'],
+                dashboard_statements(),
+                max_concurrency=current_app.config.get('ASYNC_API_MAX_CONCURRENCY', 8)
+            )
+
+            return {
+                'success': True,
+                'data': build_dashboard_data(results),
+                'message': '获取仪表板数据成功'
+            }, 200
+
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'获取仪表板数据失败: {str(e)}'
+            }, 500
+
+
+class AsyncListAPI(MethodView):
+    """列表API（异步），查询条件与对应同步资源的 build_query() 相同"""
+
+    def __init__(self, list_api, key, label):
+        self.list_api = list_api
+        self.key = key
+        self.label = label
+
+    async def get(self):
+        """获取列表，计数和当前页数据并发查询"""
+        try:
+            page = request.args.get('page', 1, type=int)
+            per_page = request.args.get('per_page', 10, type=int)
+
+            items, pagination = await paginate(
+                current_app.extensions['async_engine'],
+                self.list_api.build_query(request.args),
+                page=page, per_page=per_page
+            )
+
+            return {
+                'success': True,
+                'data': {
+                    self.key: [item.to_dict() for item in items],
+                    'pagination': pagination
+                },
+                'message': f'获取{self.label}列表成功'
+            }, 200
+
+        except Exception as e:
+            return {
+                'success': False,
+                'message': f'获取{self.label}列表失败: {str(e)}'
+            }, 500
+
+
+# 注册路由
+async_api_bp.add_url_rule('/dashboard', view_func=AsyncDashboardAPI.as_view('dashboard'))
+
+for list_api, key, label in (
+    (StudentListAPI, 'students', '学生'),
+    (CourseListAPI, 'courses', '课程'),
+    (BookListAPI, 'books', '图书'),
+    (EnrollmentListAPI, 'enrollments', '选课'),
+    (BorrowListAPI, 'borrows', '借书'),
+):
+    async_api_bp.add_url_rule(
+        f'/{key}',
+        view_func=AsyncListAPI.as_view(key, list_api=list_api, key=key, label=label)
+    )
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+选课日与借阅高峰负载测试
+Registration Day and Library Peak Load Test
+
+在进程内对 create_app() 并发施压，模拟三类流量：
+- 选课：多个线程对少量热门课程反复选课/退课
+- 借书：多个线程集中借阅少量热门图书，部分随即归还
+- 仪表板：定时轮询 /api/dashboard
+结束后输出吞吐量、错误率、延迟分位数，并校验数据一致性：
+课程选课人数不超过 max_students，图书可借册数不为负。
+
+用法:
+    python -m benchmarks.load_test --database /tmp/load.db --duration 30
+    python -m benchmarks.load_test --database /tmp/load.db --enroll-workers 16 --output load.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import logging
+import argparse
+import platform
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert
+
+from app import create_app
+from models import db, Student, Course, Book, Enrollment, BorrowRecord
+from benchmarks.run_benchmarks import benchmark_config, percentile, git_commit
+from benchmarks.seed import seed_database
+
+
+class ScenarioStats:
+    """单个场景的请求统计（线程安全）"""
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies_ms = []
+        self.statuses = {}
+        self.exceptions = 0
+        self._lock = threading.Lock()
+
+    def observe(self, status_code, latency_ms):
+        with self._lock:
+            self.latencies_ms.append(latency_ms)
+            self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+
+    def observe_exception(self):
+        with self._lock:
+            self.exceptions += 1
+
+    def to_dict(self, duration):
+        """转换为字典格式；4xx 视为业务拒绝（如满员），5xx 和异常计为错误"""
+        requests = len(self.latencies_ms) + self.exceptions
+        errors = self.exceptions + sum(n for code, n in self.statuses.items() if code >= 500)
+        rejected = sum(n for code, n in self.statuses.items() if 400 <= code < 500)
+        return {
+            'name': self.name,
+            'requests': requests,
+            'throughput_rps': round(requests / duration, 2) if duration else None,
+            'error_rate': round(errors / requests, 4) if requests else 0,
+            'rejected': rejected,
+            'exceptions': self.exceptions,
+            'statuses': {str(code): n for code, n in sorted(self.statuses.items())},
+            'p50_ms': round(percentile(self.latencies_ms, 0.5), 3) if self.latencies_ms else None,
+            'p99_ms': round(percentile(self.latencies_ms, 0.99), 3) if self.latencies_ms else None
+        }
+
+
+def timed(client, stats, method, path, **kwargs):
+    """发送请求并记录耗时，返回响应JSON（失败时返回None）"""
+    start = time.perf_counter()
+    try:
+        response = client.open(path, method=method, **kwargs)
+    except Exception:
+        stats.observe_exception()
+        return None
+    stats.observe(response.status_code, (time.perf_counter() - start) * 1000)
+    try:
+        return response.get_json(silent=True)
+    finally:
+        response.close()
+
+
+def enroll_worker(app, stats, deadline, rng, student_ids, course_ids, drop_rate):
+    """选课/退课循环"""
+    client = app.test_client()
+    while time.monotonic() < deadline:
+        payload = {'student_id': rng.choice(student_ids), 'course_id': rng.choice(course_ids)}
+        data = timed(client, stats, 'POST', '/api/enrollments', json=payload)
+        if data and data.get('success') and rng.random() < drop_rate:
+            enrollment_id = data['data']['enrollment']['id']
+            timed(client, stats, 'DELETE', f'/api/enrollments/{enrollment_id}')
+
+
+def borrow_worker(app, stats, deadline, rng, student_ids, book_ids, return_rate):
+    """借书/还书循环"""
+    client = app.test_client()
+    while time.monotonic() < deadline:
+        payload = {'student_id': rng.choice(student_ids), 'book_id': rng.choice(book_ids)}
+        data = timed(client, stats, 'POST', '/api/borrows', json=payload)
+        if data and data.get('success') and rng.random() < return_rate:
+            borrow_id = data['data']['borrow_record']['id']
+            timed(client, stats, 'PUT', f'/api/borrows/{borrow_id}', json={'action': 'return'})
+
+
+def dashboard_worker(app, stats, deadline, rng, interval):
+    """仪表板轮询"""
+    client = app.test_client()
+    while time.monotonic() < deadline:
+        timed(client, stats, 'GET', '/api/dashboard')
+        time.sleep(interval * (0.5 + rng.random()))
+
+
+def create_hot_items(n_courses, course_capacity, n_books, book_copies):
+    """创建热门课程和热门图书，返回 (课程ID列表, 图书ID列表)"""
+    now = datetime.utcnow()
+    course_codes = [f'HOT{i:03d}' for i in range(n_courses)]
+    book_isbns = [f'979{i:010d}' for i in range(n_books)]
+    db.session.execute(insert(Course), [{
+        'code': code, 'name': f'热门课程{i}', 'credits': 3, 'teacher': '负载测试',
+        'semester': '2025春', 'max_students': course_capacity, 'status': 'active',
+        'created_at': now, 'updated_at': now
+    } for i, code in enumerate(course_codes)])
+    db.session.execute(insert(Book), [{
+        'isbn': isbn, 'title': f'热门图书{i}', 'author': '负载测试', 'publisher': '负载测试',
+        'total_copies': book_copies, 'status': 'available', 'created_at': now, 'updated_at': now
+    } for i, isbn in enumerate(book_isbns)])
+    db.session.commit()
+
+    course_ids = [c.id for c in Course.query.filter(Course.code.in_(course_codes))]
+    book_ids = [b.id for b in Book.query.filter(Book.isbn.in_(book_isbns))]
+    return course_ids, book_ids
+
+
+def check_invariants(course_ids, book_ids):
+    """校验一致性，返回违规列表"""
+    violations = []
+
+    enrolled = dict(db.session.query(Enrollment.course_id, db.func.count(Enrollment.id)).filter(
+        Enrollment.course_id.in_(course_ids), Enrollment.status == 'enrolled'
+    ).group_by(Enrollment.course_id).all())
+    for course in Course.query.filter(Course.id.in_(course_ids)):
+        count = enrolled.get(course.id, 0)
+        if count > course.max_students:
+            violations.append(f'课程 {course.code} 超员: {count}/{course.max_students}')
+
+    borrowed = dict(db.session.query(BorrowRecord.book_id, db.func.count(BorrowRecord.id)).filter(
+        BorrowRecord.book_id.in_(book_ids), BorrowRecord.status == 'borrowed'
+    ).group_by(BorrowRecord.book_id).all())
+    for book in Book.query.filter(Book.id.in_(book_ids)):
+        available = book.total_copies - borrowed.get(book.id, 0)
+        if available < 0:
+            violations.append(f'图书 {book.isbn} 可借册数为负: {available}')
+
+    return violations
+
+
+def run_load_test(app, duration=10, enroll_workers=8, borrow_workers=8, dashboard_workers=2,
+                  hot_courses=3, course_capacity=30, hot_books=3, book_copies=5,
+                  drop_rate=0.2, return_rate=0.3, dashboard_interval=0.5, seed=42):
+    """运行负载测试，返回报告字典"""
+    with app.app_context():
+        course_ids, book_ids = create_hot_items(hot_courses, course_capacity, hot_books, book_copies)
+        student_ids = [student_id for student_id, in db.session.query(Student.id)]
+
+    scenarios = {
+        'enroll': ScenarioStats('enroll'),
+        'borrow': ScenarioStats('borrow'),
+        'dashboard': ScenarioStats('dashboard')
+    }
+    deadline = time.monotonic() + duration
+    threads = []
+    for i in range(enroll_workers):
+        threads.append(threading.Thread(target=enroll_worker, args=(
+            app, scenarios['enroll'], deadline, random.Random(seed + i),
+            student_ids, course_ids, drop_rate)))
+    for i in range(borrow_workers):
+        threads.append(threading.Thread(target=borrow_worker, args=(
+            app, scenarios['borrow'], deadline, random.Random(seed + 1000 + i),
+            student_ids, book_ids, return_rate)))
+    for i in range(dashboard_workers):
+        threads.append(threading.Thread(target=dashboard_worker, args=(
+            app, scenarios['dashboard'], deadline, random.Random(seed + 2000 + i),
+            dashboard_interval)))
+
+    start = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+
+    with app.app_context():
+        violations = check_invariants(course_ids, book_ids)
+
+    results = [stats.to_dict(elapsed) for stats in scenarios.values()]
+    total = sum(r['requests'] for r in results)
+    return {
+        'duration_s': round(elapsed, 3),
+        'throughput_rps': round(total / elapsed, 2) if elapsed else None,
+        'results': results,
+        'invariants': {'ok': not violations, 'violations': violations}
+    }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='选课日与借阅高峰负载测试')
+    parser.add_argument('--database', required=True, help='SQLite数据库文件路径（每次运行重新生成）')
+    parser.add_argument('--students', type=int, default=1000, help='学生数')
+    parser.add_argument('--duration', type=float, default=10, help='持续时间（秒）')
+    parser.add_argument('--enroll-workers', type=int, default=8, help='选课线程数')
+    parser.add_argument('--borrow-workers', type=int, default=8, help='借书线程数')
+    parser.add_argument('--dashboard-workers', type=int, default=2, help='仪表板轮询线程数')
+    parser.add_argument('--hot-courses', type=int, default=3, help='热门课程数')
+    parser.add_argument('--course-capacity', type=int, default=30, help='热门课程容量')
+    parser.add_argument('--hot-books', type=int, default=3, help='热门图书数')
+    parser.add_argument('--book-copies', type=int, default=5, help='热门图书册数')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    parser.add_argument('--output', help='结果JSON输出路径（默认打印到标准输出）')
+    args = parser.parse_args()
+
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(args.database + suffix):
+            os.remove(args.database + suffix)
+
+    app = create_app(benchmark_config(args.database))
+    # 5xx 只计入错误率，不输出堆栈
+    app.logger.setLevel(logging.CRITICAL)
+    with app.app_context():
+        db.create_all()
+        seed_database(args.students, seed=args.seed, verbose=False)
+
+    report = run_load_test(
+        app,
+        duration=args.duration,
+        enroll_workers=args.enroll_workers,
+        borrow_workers=args.borrow_workers,
+        dashboard_workers=args.dashboard_workers,
+        hot_courses=args.hot_courses,
+        course_capacity=args.course_capacity,
+        hot_books=args.hot_books,
+        book_copies=args.book_copies,
+        seed=args.seed
+    )
+    report['meta'] = {
+        'commit': git_commit(),
+        'timestamp': datetime.utcnow().isoformat(),
+        'python': platform.python_version(),
+        'students': args.students,
+        'workers': {
+            'enroll': args.enroll_workers,
+            'borrow': args.borrow_workers,
+            'dashboard': args.dashboard_workers
+        }
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f'结果已写入 {args.output}')
+    else:
+        print(output)
+
+    for violation in report['invariants']['violations']:
+        print(f'❌ {violation}', file=sys.stderr)
+    sys.exit(0 if report['invariants']['ok'] else 1)
+
+
+if __name__ == '__main__':
+    main()
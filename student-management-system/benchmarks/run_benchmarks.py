@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+接口与页面性能基准
+API and Page Benchmarks
+
+在合成数据上逐个请求 api/ 接口和 views/ 页面，统计 p50/p99 延迟和每请求SQL语句数，
+结果输出为JSON，便于在不同提交之间对比。
+
+用法:
+    # 生成数据并运行（数据库文件可复用）
+    python -m benchmarks.run_benchmarks --scale 10k --database /tmp/bench_10k.db --output results.json
+
+    # 与之前的结果对比
+    python -m benchmarks.run_benchmarks --database /tmp/bench_10k.db --compare old.json
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import event
+
+from app import create_app
+from config import ProductionConfig
+from models import db, Student
+
+# (名称, 路径模板)；{student}/{course}/{book}/{enrollment}/{borrow} 替换为样本ID，
+# 专业、年级、学期取 benchmarks/seed.py 生成数据中的值。覆盖全部只读的 GET 接口和页面
+ENDPOINTS = [
+    ('api.students.list', '/api/students?page={page}'),
+    ('api.students.search', '/api/students?search=B0000'),
+    ('api.students.detail', '/api/students/{student}'),
+    ('api.students.transcript', '/api/students/{student}/transcript'),
+    ('api.students.ranking', '/api/students/{student}/ranking'),
+    ('api.courses.list', '/api/courses?page={page}'),
+    ('api.courses.detail', '/api/courses/{course}'),
+    ('api.courses.roster', '/api/courses/{course}/students'),
+    ('api.courses.prerequisites', '/api/courses/{course}/prerequisites'),
+    ('api.books.list', '/api/books?page={page}'),
+    ('api.books.detail', '/api/books/{book}'),
+    ('api.books.borrow_history', '/api/books/{book}/borrows'),
+    ('api.enrollments.list', '/api/enrollments?page={page}'),
+    ('api.enrollments.detail', '/api/enrollments/{enrollment}'),
+    ('api.borrows.list', '/api/borrows?page={page}'),
+    ('api.borrows.detail', '/api/borrows/{borrow}'),
+    ('api.transcripts', '/api/transcripts?major=计算机科学与技术&grade=2023'),
+    ('api.rankings', '/api/rankings?major=计算机科学与技术&grade=2023'),
+    ('api.analytics.grades', '/api/analytics/grades?semester=2024春'),
+    ('api.timetable.conflicts', '/api/timetable/conflicts?semester=2024春'),
+    ('api.dashboard', '/api/dashboard'),
+    ('api.dashboard_stats', '/api/dashboard/stats'),
+    ('views.dashboard', '/dashboard'),
+    ('views.students.list', '/students?page={page}'),
+    ('views.students.add', '/students/add'),
+    ('views.students.detail', '/students/{student}'),
+    ('views.students.edit', '/students/{student}/edit'),
+    ('views.courses.list', '/courses?page={page}'),
+    ('views.courses.add', '/courses/add'),
+    ('views.courses.detail', '/courses/{course}'),
+    ('views.courses.edit', '/courses/{course}/edit'),
+    ('views.books.list', '/books?page={page}'),
+    ('views.books.add', '/books/add'),
+    ('views.books.detail', '/books/{book}'),
+    ('views.books.edit', '/books/{book}/edit'),
+    ('views.enrollments.list', '/enrollments?page={page}'),
+    ('views.enrollments.add', '/enrollments/add'),
+    ('views.enrollments.detail', '/enrollments/{enrollment}'),
+    ('views.borrows.list', '/borrows?page={page}'),
+    ('views.borrows.add', '/borrows/add'),
+    ('views.borrows.detail', '/borrows/{borrow}'),
+    ('views.borrows.overdue', '/borrows/overdue'),
+]
+
+
+def benchmark_config(database):
+    """基准测试配置：生产配置 + 指定数据库，关闭会掩盖真实开销的缓存"""
+    class BenchmarkConfig(ProductionConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{os.path.abspath(database)}'
+        PAGE_CACHE_ENABLED = False
+        QUERY_PROFILER_ENABLED = False
+        INSTRUMENTATION_ENABLED = False
+        METRICS_ENABLED = False
+    return BenchmarkConfig
+
+
+def percentile(values, q):
+    """线性插值分位数"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    pos = (len(ordered) - 1) * q
+    lower = int(pos)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (pos - lower)
+
+
+class QueryCounter:
+    """统计引擎执行的语句数"""
+
+    def __init__(self, engine):
+        self.count = 0
+        event.listen(engine, 'after_cursor_execute', self._increment)
+
+    def _increment(self, *args):
+        self.count += 1
+
+
+def sample_ids(app, iterations):
+    """选取样本ID，均匀分布在各表中"""
+    from models import Course, Book, Enrollment, BorrowRecord
+
+    ids = {}
+    with app.app_context():
+        for key, model in (('student', Student), ('course', Course), ('book', Book),
+                           ('enrollment', Enrollment), ('borrow', BorrowRecord)):
+            total = db.session.query(db.func.max(model.id)).scalar() or 1
+            ids[key] = [max(1, total * (i + 1) // (iterations + 1)) for i in range(iterations)]
+        pages = max(1, (db.session.query(db.func.count(Student.id)).scalar() or 0) // 10)
+    ids['page'] = [1 + (pages * i // max(1, iterations)) % pages for i in range(iterations)]
+    return ids
+
+
+def run_benchmarks(app, iterations=20, warmup=2, endpoints=ENDPOINTS):
+    """逐个端点请求 iterations 次，返回结果列表"""
+    client = app.test_client()
+    with app.app_context():
+        counter = QueryCounter(db.engine)
+    ids = sample_ids(app, iterations + warmup)
+
+    results = []
+    for name, template in endpoints:
+        latencies = []
+        queries = []
+        statuses = {}
+        for i in range(iterations + warmup):
+            path = template.format(**{key: values[i] for key, values in ids.items()})
+            before = counter.count
+            start = time.perf_counter()
+            response = client.get(path)
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            response.close()
+            if i < warmup:
+                continue
+            latencies.append(elapsed_ms)
+            queries.append(counter.count - before)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        results.append({
+            'name': name,
+            'path': template,
+            'statuses': {str(code): n for code, n in sorted(statuses.items())},
+            'p50_ms': round(percentile(latencies, 0.5), 3),
+            'p99_ms': round(percentile(latencies, 0.99), 3),
+            'mean_ms': round(sum(latencies) / len(latencies), 3),
+            'queries_per_request': round(sum(queries) / len(queries), 2),
+            'max_queries': max(queries)
+        })
+    return results
+
+
+def git_commit():
+    """当前提交ID，不在git仓库时返回None"""
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(old, new):
+    """打印两次结果的差异"""
+    previous = {r['name']: r for r in old['results']}
+    print(f"{'端点':<28}{'p50(ms)':>18}{'p99(ms)':>18}{'语句数/请求':>18}")
+    for r in new['results']:
+        o = previous.get(r['name'])
+        if o is None:
+            print(f"{r['name']:<28}{r['p50_ms']:>18}{r['p99_ms']:>18}{r['queries_per_request']:>18}")
+            continue
+        print(f"{r['name']:<28}"
+              f"{o['p50_ms']:>8} → {r['p50_ms']:<7}"
+              f"{o['p99_ms']:>8} → {r['p99_ms']:<7}"
+              f"{o['queries_per_request']:>8} → {r['queries_per_request']:<7}")
+
+
+def main():
+    """主函数"""
+    from benchmarks.seed import SCALES, seed_database
+
+    parser = argparse.ArgumentParser(description='接口与页面性能基准')
+    parser.add_argument('--scale', choices=SCALES.keys(), default='10k', help='数据库为空时生成的数据规模')
+    parser.add_argument('--database', required=True, help='SQLite数据库文件路径（已存在则复用）')
+    parser.add_argument('--iterations', type=int, default=20, help='每个端点的请求次数')
+    parser.add_argument('--output', help='结果JSON输出路径（默认打印到标准输出）')
+    parser.add_argument('--compare', help='与之前的结果JSON对比')
+    args = parser.parse_args()
+
+    app = create_app(benchmark_config(args.database))
+    # 已知的500错误只计入状态码统计，不输出堆栈
+    app.logger.setLevel(logging.CRITICAL)
+    with app.app_context():
+        db.create_all()
+        if Student.query.first() is None:
+            seed_database(SCALES[args.scale])
+        counts = {model.__tablename__: db.session.query(db.func.count(model.id)).scalar()
+                  for model in db.Model.__subclasses__()}
+
+    report = {
+        'meta': {
+            'commit': git_commit(),
+            'timestamp': datetime.utcnow().isoformat(),
+            'python': platform.python_version(),
+            'iterations': args.iterations,
+            'rows': counts
+        },
+        'results': run_benchmarks(app, iterations=args.iterations)
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f'结果已写入 {args.output}')
+    elif not args.compare:
+        print(output)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            compare(json.load(f), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+合成数据生成器
+Synthetic Data Generator
+
+使用 Faker 按规模批量生成学生、课程、图书、选课和借阅数据。
+唯一字段（学号、身份证号、邮箱、课程代码、ISBN）由序号派生，保证不冲突；
+姓名等展示字段从预生成的 Faker 样本池中循环取用，避免百万级数据时逐条调用 Faker。
+
+批量插入不经过模型的属性事件，因此由上课时间文本解析出的时段（course_schedules）、
+先修关系（course_prerequisites）和已完成选课的等级、绩点在这里直接生成，
+使成绩单、排名、成绩分布、课表冲突和先修课程接口在基准中处理真实规模的数据。
+
+用法:
+    python -m benchmarks.seed --scale 10k --database /tmp/bench.db
+"""
+
+import os
+import sys
+import random
+import argparse
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from faker import Faker
+from sqlalchemy import insert
+
+from models import db, Student, Course, Book, Enrollment, BorrowRecord
+from models.schedule import CourseSchedule, WEEKDAY_NAMES, parse_schedule
+from models.prerequisite import course_prerequisites
+
+# 各规模下的数据量（以学生数为基准）
+SCALES = {
+    '1k': 1_000,
+    '10k': 10_000,
+    '100k': 100_000,
+    '1m': 1_000_000
+}
+
+ENROLLMENTS_PER_STUDENT = 4
+BORROWS_PER_STUDENT = 2
+STUDENTS_PER_COURSE = 50
+STUDENTS_PER_BOOK = 10
+
+MAJORS = ['计算机科学与技术', '软件工程', '数据科学', '信息安全', '电子信息工程', '数学与应用数学', '物理学', '金融学']
+GRADES = ['2021', '2022', '2023', '2024']
+SEMESTERS = ['2023秋', '2024春', '2024秋', '2025春']
+CATEGORIES = ['计算机', '数学', '文学', '历史', '经济', '物理']
+
+BATCH_SIZE = 10_000
+
+
+def course_credits(i):
+    """第 i 门课程的学分（1-5）"""
+    return 1 + i % 5
+
+
+def course_schedule(i):
+    """第 i 门课程的上课时间文本：周一至周五、每天5个大节轮换，3学分及以上每周两次"""
+    weekday = 1 + i % 5
+    start = 1 + 2 * (i // 5 % 5)
+    text = f'周{WEEKDAY_NAMES[weekday]}{start}-{start + 1}节'
+    if course_credits(i) >= 3:
+        text += f'，周{WEEKDAY_NAMES[1 + (weekday + 1) % 5]}{start}-{start + 1}节'
+    return text
+
+
+def course_prerequisite(i):
+    """第 i 门课程的先修课程序号：同组相邻学期的前一门课程，每组第一门没有先修课程"""
+    return i - 1 if i % len(SEMESTERS) else None
+
+
+def scale_counts(students):
+    """根据学生数计算各表行数"""
+    return {
+        'students': students,
+        'courses': max(10, students // STUDENTS_PER_COURSE),
+        'books': max(10, students // STUDENTS_PER_BOOK),
+        'enrollments': students * ENROLLMENTS_PER_STUDENT,
+        'borrows': students * BORROWS_PER_STUDENT
+    }
+
+
+def _insert_batches(model, rows):
+    """分批执行 executemany 插入"""
+    batch = []
+    total = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            db.session.execute(insert(model), batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(model), batch)
+        total += len(batch)
+    db.session.commit()
+    return total
+
+
+def seed_database(students, seed=42, verbose=True):
+    """在当前应用上下文的数据库中生成数据，返回各表行数"""
+    counts = scale_counts(students)
+    rng = random.Random(seed)
+    fake = Faker('zh_CN')
+    Faker.seed(seed)
+
+    names = [fake.name() for _ in range(2000)]
+    addresses = [fake.address() for _ in range(500)]
+    words = [fake.word() for _ in range(500)]
+    now = datetime.utcnow()
+
+    def log(message):
+        if verbose:
+            print(message)
+
+    def student_rows():
+        for i in range(counts['students']):
+            yield {
+                'student_id': f'B{i:09d}',
+                'name': names[i % len(names)],
+                'id_card': f'{110101199001010000 + i:018d}',
+                'gender': '男' if i % 2 else '女',
+                'age': 18 + i % 8,
+                'major': MAJORS[i % len(MAJORS)],
+                'grade': GRADES[i % len(GRADES)],
+                'class_name': f'{i % 40 + 1}班',
+                'email': f'student{i}@bench.example.com',
+                'phone': f'138{i:08d}'[:11],
+                'address': addresses[i % len(addresses)],
+                'status': 'active' if i % 20 else 'graduated',
+                'enrollment_date': (now - timedelta(days=365 * (i % 4))).date(),
+                'created_at': now - timedelta(minutes=i % 100000),
+                'updated_at': now - timedelta(minutes=i % 100000)
+            }
+
+    def course_rows():
+        for i in range(counts['courses']):
+            prerequisite = course_prerequisite(i)
+            yield {
+                'code': f'BC{i:06d}',
+                'name': f'{words[i % len(words)]}课程{i}',
+                'credits': course_credits(i),
+                'hours': 16 * (1 + i % 4),
+                'teacher': names[(i * 7) % len(names)],
+                'semester': SEMESTERS[i % len(SEMESTERS)],
+                'classroom': f'{chr(65 + i % 6)}{100 + i % 400}',
+                'schedule': course_schedule(i),
+                'prerequisites': f'BC{prerequisite:06d}' if prerequisite is not None else None,
+                'max_students': 60 + (i % 5) * 60,
+                'status': 'active',
+                'created_at': now,
+                'updated_at': now
+            }
+
+    def schedule_rows():
+        for i in range(counts['courses']):
+            for slot in parse_schedule(course_schedule(i)):
+                yield dict(slot, course_id=i + 1, created_at=now)
+
+    def prerequisite_rows():
+        for i in range(counts['courses']):
+            prerequisite = course_prerequisite(i)
+            if prerequisite is not None:
+                yield {'course_id': i + 1, 'prerequisite_id': prerequisite + 1}
+
+    def book_rows():
+        for i in range(counts['books']):
+            yield {
+                'isbn': f'978{i:010d}',
+                'title': f'{words[i % len(words)]}{words[(i * 3) % len(words)]}{i}',
+                'author': names[(i * 11) % len(names)],
+                'publisher': f'{words[(i * 5) % len(words)]}出版社',
+                'category': CATEGORIES[i % len(CATEGORIES)],
+                'total_copies': 5 + i % 10,
+                'status': 'available',
+                'created_at': now,
+                'updated_at': now
+            }
+
+    def enrollment_rows():
+        n_courses = counts['courses']
+        for student in range(counts['students']):
+            # 每个学生选 ENROLLMENTS_PER_STUDENT 门不同的课程
+            first = rng.randrange(n_courses)
+            step = n_courses // ENROLLMENTS_PER_STUDENT
+            for k in range(ENROLLMENTS_PER_STUDENT):
+                course = (first + k * step) % n_courses
+                completed = k == 0
+                grade = rng.randint(40, 100) if completed else None
+                grade_letter, gpa_points = Enrollment.grade_point(grade) if completed else (None, None)
+                yield {
+                    'student_id': student + 1,
+                    'course_id': course + 1,
+                    'status': 'completed' if completed else 'enrolled',
+                    'grade': grade,
+                    'grade_letter': grade_letter,
+                    'gpa_points': gpa_points,
+                    'enrollment_date': now - timedelta(days=rng.randrange(365)),
+                    'created_at': now - timedelta(days=rng.randrange(30)),
+                    'updated_at': now
+                }
+
+    def borrow_rows():
+        n_books = counts['books']
+        for student in range(counts['students']):
+            for k in range(BORROWS_PER_STUDENT):
+                borrow_date = now - timedelta(days=rng.randrange(60))
+                returned = k == 0
+                yield {
+                    'student_id': student + 1,
+                    'book_id': (student * 13 + k * 101) % n_books + 1,
+                    'borrow_date': borrow_date,
+                    'due_date': borrow_date + timedelta(days=30),
+                    'return_date': borrow_date + timedelta(days=10) if returned else None,
+                    'status': 'returned' if returned else 'borrowed',
+                    'fine_amount': 0.0,
+                    'fine_paid': False,
+                    'created_at': borrow_date,
+                    'updated_at': borrow_date
+                }
+
+    log(f'生成学生 {counts["students"]} 条...')
+    _insert_batches(Student, student_rows())
+    log(f'生成课程 {counts["courses"]} 条...')
+    _insert_batches(Course, course_rows())
+    counts['course_schedules'] = _insert_batches(CourseSchedule, schedule_rows())
+    counts['course_prerequisites'] = _insert_batches(course_prerequisites, prerequisite_rows())
+    log(f'生成上课时段 {counts["course_schedules"]} 条，先修关系 {counts["course_prerequisites"]} 条')
+    log(f'生成图书 {counts["books"]} 条...')
+    _insert_batches(Book, book_rows())
+    log(f'生成选课 {counts["enrollments"]} 条...')
+    _insert_batches(Enrollment, enrollment_rows())
+    log(f'生成借阅 {counts["borrows"]} 条...')
+    _insert_batches(BorrowRecord, borrow_rows())
+
+    return counts
+
+
+def main():
+    """主函数"""
+    from app import create_app
+    from benchmarks.run_benchmarks import benchmark_config
+
+    parser = argparse.ArgumentParser(description='生成基准测试数据')
+    parser.add_argument('--scale', choices=SCALES.keys(), default='10k', help='数据规模（学生数）')
+    parser.add_argument('--database', required=True, help='SQLite数据库文件路径')
+    parser.add_argument('--seed', type=int, default=42, help='随机种子')
+    args = parser.parse_args()
+
+    app = create_app(benchmark_config(args.database))
+    with app.app_context():
+        db.create_all()
+        seed_database(SCALES[args.scale], seed=args.seed)
+
+
+if __name__ == '__main__':
+    main()
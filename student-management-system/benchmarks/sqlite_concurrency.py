@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite并发读写基准
+SQLite Concurrent Read/Write Benchmark
+
+对比默认配置与 models/sqlite_tuning.py 中PRAGMA配置下，
+多线程并发读写同一个SQLite文件数据库的吞吐量和锁冲突次数。
+
+用法:
+    python -m benchmarks.sqlite_concurrency --readers 8 --writers 4 --duration 5
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from models.sqlite_tuning import install_sqlite_pragmas
+
+def run_workload(tuned, readers, writers, duration, seed_rows=2000):
+    """在临时数据库上运行一轮并发读写，返回统计结果"""
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    
+    engine = create_engine(f'sqlite:///{path}', pool_size=readers + writers, max_overflow=0)
+    if tuned:
+        install_sqlite_pragmas(engine)
+    
+    with engine.begin() as conn:
+        conn.execute(text(
+            'CREATE TABLE borrow_records ('
+            'id INTEGER PRIMARY KEY, student_id INTEGER, book_id INTEGER, '
+            'status VARCHAR(20), borrow_date DATETIME)'
+        ))
+        conn.execute(text('CREATE INDEX ix_book ON borrow_records (book_id)'))
+        conn.execute(
+            text('INSERT INTO borrow_records (student_id, book_id, status, borrow_date) '
+                 "VALUES (:s, :b, 'borrowed', CURRENT_TIMESTAMP)"),
+            [{'s': i % 500, 'b': i % 200} for i in range(seed_rows)]
+        )
+    
+    counters = {'reads': 0, 'writes': 0, 'lock_errors': 0}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+    
+    def count(name):
+        with lock:
+            counters[name] += 1
+    
+    def reader(worker_id):
+        while time.perf_counter() < stop_at:
+            try:
+                with engine.connect() as conn:
+                    conn.execute(text(
+                        "SELECT count(*) FROM borrow_records WHERE book_id = :b AND status = 'borrowed'"
+                    ), {'b': worker_id % 200}).scalar()
+                count('reads')
+            except OperationalError:
+                count('lock_errors')
+    
+    def writer(worker_id):
+        n = 0
+        while time.perf_counter() < stop_at:
+            n += 1
+            try:
+                with engine.begin() as conn:
+                    conn.execute(text(
+                        'INSERT INTO borrow_records (student_id, book_id, status, borrow_date) '
+                        "VALUES (:s, :b, 'borrowed', CURRENT_TIMESTAMP)"
+                    ), {'s': worker_id, 'b': n % 200})
+                    conn.execute(text(
+                        "UPDATE borrow_records SET status = 'returned' WHERE id = :id"
+                    ), {'id': n % seed_rows + 1})
+                count('writes')
+            except OperationalError:
+                count('lock_errors')
+    
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    
+    engine.dispose()
+    for suffix in ('', '-wal', '-shm'):
+        if os.path.exists(path + suffix):
+            os.unlink(path + suffix)
+    
+    return {
+        'profile': 'tuned' if tuned else 'default',
+        'reads_per_sec': round(counters['reads'] / elapsed, 1),
+        'writes_per_sec': round(counters['writes'] / elapsed, 1),
+        'lock_errors': counters['lock_errors'],
+        'elapsed_sec': round(elapsed, 2)
+    }
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='SQLite并发读写基准')
+    parser.add_argument('--readers', type=int, default=8, help='读线程数')
+    parser.add_argument('--writers', type=int, default=4, help='写线程数')
+    parser.add_argument('--duration', type=float, default=5.0, help='每轮持续秒数')
+    parser.add_argument('--json', action='store_true', help='以JSON输出结果')
+    args = parser.parse_args()
+    
+    results = [
+        run_workload(False, args.readers, args.writers, args.duration),
+        run_workload(True, args.readers, args.writers, args.duration)
+    ]
+    
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+    
+    print(f"{'配置':<10}{'读/秒':>12}{'写/秒':>12}{'锁冲突':>10}")
+    for r in results:
+        print(f"{r['profile']:<10}{r['reads_per_sec']:>12}{r['writes_per_sec']:>12}{r['lock_errors']:>10}")
+    
+    base, tuned = results
+    if base['reads_per_sec'] and base['writes_per_sec']:
+        print(f"\n读吞吐提升: {tuned['reads_per_sec'] / base['reads_per_sec']:.2f}x, "
+              f"写吞吐提升: {tuned['writes_per_sec'] / base['writes_per_sec']:.2f}x")
+
+if __name__ == '__main__':
+    main()
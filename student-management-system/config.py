@@ -10,6 +10,59 @@ from pathlib import Path
 
 basedir = Path(__file__).parent.absolute()
 
+def pool_size_for(workers, threads, max_connections=None):
+    """
+    根据工作进程数和线程数计算每个进程的连接池大小
+    
+    返回 (pool_size, max_overflow)。每个线程同一时刻最多占用一个连接；
+    指定 max_connections 时按进程数均分连接预算。
+    """
+    pool_size = max(1, int(threads))
+    max_overflow = 2
+    
+    if max_connections:
+        per_worker = max(1, int(max_connections) // max(1, int(workers)))
+        pool_size = min(pool_size, per_worker)
+        max_overflow = per_worker - pool_size
+    
+    return pool_size, max_overflow
+
+def pool_setting(app_config, name):
+    """
+    读取连接池参数：环境变量优先，其次配置类
+    
+    在创建应用时读取而不是在导入 config 时读取：gunicorn.conf.py 导入本模块之后
+    才按进程/线程数设置 DB_POOL_SIZE 等环境变量，预派生的工作进程沿用已导入的模块。
+    """
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return app_config[name]
+    if isinstance(app_config[name], bool):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    return int(value)
+
+def engine_options(app_config):
+    """
+    根据 DB_POOL_* 配置生成 SQLALCHEMY_ENGINE_OPTIONS
+    
+    内存SQLite使用单连接池，不接受连接池参数；
+    显式配置的 SQLALCHEMY_ENGINE_OPTIONS 优先。
+    """
+    options = {}
+    uri = app_config.get('SQLALCHEMY_DATABASE_URI', '')
+    
+    if not (uri.startswith('sqlite') and ':memory:' in uri):
+        options.update({
+            'pool_size': pool_setting(app_config, 'DB_POOL_SIZE'),
+            'max_overflow': pool_setting(app_config, 'DB_MAX_OVERFLOW'),
+            'pool_timeout': pool_setting(app_config, 'DB_POOL_TIMEOUT'),
+            'pool_recycle': pool_setting(app_config, 'DB_POOL_RECYCLE'),
+            'pool_pre_ping': pool_setting(app_config, 'DB_POOL_PRE_PING')
+        })
+    
+    options.update(app_config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    return options
+
 class Config:
     """基础配置类"""
     # 密钥配置
@@ -20,8 +73,49 @@ class Config:
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_RECORD_QUERIES = True
     
+    # 慢查询采样（记录超过阈值的语句、耗时和调用位置）
+    QUERY_PROFILER_ENABLED = True
+    QUERY_PROFILER_SAMPLE_RATE = float(os.environ.get('QUERY_PROFILER_SAMPLE_RATE', 1.0))
+    QUERY_PROFILER_SLOW_MS = float(os.environ.get('QUERY_PROFILER_SLOW_MS', 100))
+    QUERY_PROFILER_CAPACITY = 200
+    
+    # 请求级统计（Server-Timing响应头、N+1警告、端点直方图）
+    INSTRUMENTATION_ENABLED = True
+    SERVER_TIMING_ENABLED = True
+    N_PLUS_ONE_THRESHOLD = 20  # 单个请求超过该语句数时记录警告
+    
+    # Prometheus指标（/metrics）
+    METRICS_ENABLED = True
+    METRICS_PREFIX = 'sms_'
+    
+    # 连接池配置（默认值；创建应用时同名环境变量优先，见 pool_setting。
+    # gunicorn.conf.py 会按工作进程/线程数设置 DB_POOL_SIZE 和 DB_MAX_OVERFLOW）
+    DB_POOL_SIZE = 5
+    DB_MAX_OVERFLOW = 10
+    DB_POOL_TIMEOUT = 30  # 等待空闲连接的秒数
+    DB_POOL_RECYCLE = 3600  # 连接最长存活秒数
+    DB_POOL_PRE_PING = False  # 取出连接前先探活
+    
+    # 只读副本（设置 DATABASE_REPLICA_URL 后，GET请求和统计查询路由到副本）
+    SQLALCHEMY_BINDS = {'replica': os.environ['DATABASE_REPLICA_URL']} if os.environ.get('DATABASE_REPLICA_URL') else {}
+    DB_REPLICA_BIND = 'replica'
+    DB_REPLICA_STICKY_SECONDS = int(os.environ.get('DB_REPLICA_STICKY_SECONDS', 5))  # 写入后该会话读主库的秒数
+    
+    # 异步API（/api/async，需要 asgiref 和异步数据库驱动）
+    ASYNC_API_ENABLED = True
+    ASYNC_DATABASE_URL = os.environ.get('ASYNC_DATABASE_URL')  # 默认由 SQLALCHEMY_DATABASE_URI 推导
+    ASYNC_API_MAX_CONCURRENCY = 8  # 单个请求内同时执行的查询数
+    
+    # SQLite性能配置（WAL、busy_timeout等，见 models/sqlite_tuning.py）
+    SQLITE_TUNING_ENABLED = True
+    SQLITE_PRAGMAS = {}  # 覆盖默认PRAGMA，如 {'busy_timeout': 10000}
+    
     # 分页配置
     ITEMS_PER_PAGE = 10
+    MULTI_GET_MAX_IDS = 100  # ?ids= 批量获取的ID上限
+    BATCH_MAX_REQUESTS = 20  # /api/batch 单次最多子请求数
+    ROSTER_MAX_PER_PAGE = 100  # 课程花名册每页最多学生数
+    GRADE_UPLOAD_MAX_ROWS = 1000  # 单次批量录入成绩的最多行数
     
     # API配置
     JSON_AS_ASCII = False  # 支持中文
@@ -30,10 +124,32 @@ class Config:
     # 上传文件配置
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
     
+    # 页面缓存配置
+    PAGE_CACHE_ENABLED = True
+    PAGE_CACHE_TTL = 60  # 秒
+    PAGE_CACHE_MAX_ENTRIES = 1000
+    
+    # GPA排名缓存（按专业/年级，成绩变更时失效）
+    RANKING_CACHE_TTL = 3600  # 秒
+    RANKING_WINDOW_FUNCTIONS = None  # None 自动检测；False 强制使用 NumPy 回退计算
+    
+    # 成绩分布统计缓存（成绩变更时失效）
+    GRADE_STATS_CACHE_TTL = 3600  # 秒
+    GRADE_STATS_USE_NUMPY = True  # False 强制使用纯Python计算
+    
+    # 自动排课的时间段：每周上课天数和每天的大节（起止节次）
+    TIMETABLE_WEEKDAYS = 5
+    TIMETABLE_BLOCKS = ((1, 2), (3, 4), (5, 6), (7, 8), (9, 10))
+    
+    # 静态文件缓存（Cache-Control: public, max-age）
+    SEND_FILE_MAX_AGE_DEFAULT = 3600  # 秒
+    
 class DevelopmentConfig(Config):
     """开发环境配置"""
     DEBUG = True
     SQLALCHEMY_ECHO = True
+    PAGE_CACHE_ENABLED = False
+    SEND_FILE_MAX_AGE_DEFAULT = None
     
 class TestingConfig(Config):
     """测试环境配置"""
@@ -45,6 +161,15 @@ class ProductionConfig(Config):
     """生产环境配置"""
     DEBUG = False
     SQLALCHEMY_ECHO = False
+    # 生产环境不保留每条语句的记录，改用采样分析器
+    SQLALCHEMY_RECORD_QUERIES = False
+    QUERY_PROFILER_SAMPLE_RATE = float(os.environ.get('QUERY_PROFILER_SAMPLE_RATE', 0.1))
+    PAGE_CACHE_TTL = 300
+    # 生产数据库可能主动断开空闲连接：取出前探活，并早于服务端超时回收
+    DB_POOL_PRE_PING = True
+    DB_POOL_RECYCLE = 1800
+    DB_POOL_TIMEOUT = 10
+    SEND_FILE_MAX_AGE_DEFAULT = 43200  # 12小时
 
 # 配置字典
 config = {
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Gunicorn生产环境配置
+Gunicorn Production Configuration
+
+预派生(pre-fork)多进程模型，每个工作进程内使用线程池处理请求。
+所有参数均可通过环境变量覆盖：
+
+    WEB_BIND                 监听地址（默认 0.0.0.0:5000）
+    WEB_WORKERS              工作进程数（默认 CPU核数*2+1）
+    WEB_THREADS              每个进程的线程数（默认 4，为1时使用sync工作模式）
+    WEB_MAX_REQUESTS         工作进程处理N个请求后自动回收（默认 1000，0为不回收）
+    WEB_MAX_REQUESTS_JITTER  回收阈值的随机抖动，避免所有进程同时重启（默认 50）
+    WEB_TIMEOUT              请求超时秒数（默认 30）
+    DB_MAX_CONNECTIONS       所有进程合计的数据库连接上限（可选）
+
+平滑重载: kill -HUP <master pid>，主进程会启动新工作进程并等待旧进程处理完请求后退出。
+"""
+
+import os
+import multiprocessing
+
+from config import pool_size_for
+
+bind = os.environ.get('WEB_BIND', '0.0.0.0:5000')
+
+workers = int(os.environ.get('WEB_WORKERS') or multiprocessing.cpu_count() * 2 + 1)
+threads = int(os.environ.get('WEB_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# 工作进程回收
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('WEB_MAX_REQUESTS_JITTER', 50))
+
+# 超时与平滑关闭
+timeout = int(os.environ.get('WEB_TIMEOUT', 30))
+graceful_timeout = timeout
+keepalive = 5
+
+# 每个工作进程各自创建数据库引擎，避免fork后共享连接
+preload_app = False
+
+accesslog = '-'
+errorlog = '-'
+
+# 连接池与线程数对齐：每个线程同时最多占用一个连接
+_pool_size, _max_overflow = pool_size_for(
+    workers, threads, os.environ.get('DB_MAX_CONNECTIONS')
+)
+os.environ.setdefault('DB_POOL_SIZE', str(_pool_size))
+os.environ.setdefault('DB_MAX_OVERFLOW', str(_max_overflow))
+
+
+def on_reload(arbiter):
+    arbiter.log.info('收到重载信号，平滑重启工作进程')
+
+
+def worker_exit(server, worker):
+    server.log.info('工作进程 %s 退出', worker.pid)
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+请求级查询与耗时统计
+Per-Request Query and Latency Instrumentation
+
+为指定蓝图的每个请求统计SQL语句数和数据库耗时：
+- 响应头 Server-Timing: db;dur=..;desc="N queries", app;dur=..
+- 单个请求语句数超过 N_PLUS_ONE_THRESHOLD 时记录警告（疑似N+1查询）
+- 按端点聚合耗时和语句数直方图
+直方图和后台任务耗时统计（track_job）位于 models/metrics.py。
+"""
+
+import threading
+import time
+
+from flask import current_app, g, has_request_context, request
+
+from models.metrics import Histogram, JobStats
+from models.statement_timing import add_statement_observer
+
+# 直方图分桶上界（累计分桶，与Prometheus一致）
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+
+class EndpointStats:
+    """单个端点的聚合统计"""
+
+    def __init__(self, endpoint, resource=None):
+        self.endpoint = endpoint
+        self.resource = resource
+        self.requests = 0
+        self.errors = 0
+        self.statuses = {}
+        self.n_plus_one_warnings = 0
+        self.latency_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.db_time_ms = Histogram(LATENCY_BUCKETS_MS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+
+    def snapshot(self):
+        """复制当前统计（调用方需持有 RequestStats 的锁）"""
+        copy = EndpointStats(self.endpoint, self.resource)
+        copy.requests = self.requests
+        copy.errors = self.errors
+        copy.statuses = dict(self.statuses)
+        copy.n_plus_one_warnings = self.n_plus_one_warnings
+        copy.latency_ms = self.latency_ms.snapshot()
+        copy.db_time_ms = self.db_time_ms.snapshot()
+        copy.queries = self.queries.snapshot()
+        return copy
+
+    def to_dict(self):
+        """转换为字典格式"""
+        return {
+            'endpoint': self.endpoint,
+            'resource': self.resource,
+            'requests': self.requests,
+            'errors': self.errors,
+            'statuses': {str(code): n for code, n in self.statuses.items()},
+            'n_plus_one_warnings': self.n_plus_one_warnings,
+            'latency_ms': self.latency_ms.to_dict(),
+            'latency_p50_ms': self.latency_ms.quantile(0.5),
+            'latency_p99_ms': self.latency_ms.quantile(0.99),
+            'db_time_ms': self.db_time_ms.to_dict(),
+            'queries': self.queries.to_dict()
+        }
+
+
+class RequestStats:
+    """按端点聚合的请求统计"""
+
+    def __init__(self, blueprints=(), n_plus_one_threshold=20):
+        self.blueprints = set(blueprints)
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def observe(self, endpoint, resource, status_code, latency_ms, db_time_ms, query_count):
+        """记录一次请求"""
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None:
+                stats = self._endpoints[endpoint] = EndpointStats(endpoint, resource)
+            stats.requests += 1
+            stats.statuses[status_code] = stats.statuses.get(status_code, 0) + 1
+            if status_code >= 500:
+                stats.errors += 1
+            if query_count > self.n_plus_one_threshold:
+                stats.n_plus_one_warnings += 1
+            stats.latency_ms.observe(latency_ms)
+            stats.db_time_ms.observe(db_time_ms)
+            stats.queries.observe(query_count)
+
+    def endpoints(self):
+        """获取所有端点统计的快照"""
+        with self._lock:
+            return [stats.to_dict() for stats in self._endpoints.values()]
+
+    def items(self):
+        """获取 (端点, EndpointStats) 列表，统计在锁内复制，读取时不受并发请求影响"""
+        with self._lock:
+            return [(endpoint, stats.snapshot()) for endpoint, stats in self._endpoints.items()]
+
+    def reset(self):
+        """清空统计"""
+        with self._lock:
+            self._endpoints.clear()
+
+
+def _in_tracked_request():
+    """语句是否在统计的请求中执行"""
+    return has_request_context() and 'query_count' in g
+
+
+def _observe_statement(statement, duration_ms):
+    g.query_count += 1
+    g.db_time_ms += duration_ms
+
+
+def resource_name(endpoint):
+    """flask_restful资源返回类名（如 StudentListAPI），普通视图返回端点名"""
+    view = current_app.view_functions.get(endpoint)
+    view_class = getattr(view, 'view_class', None)
+    return view_class.__name__ if view_class else endpoint
+
+
+def _start_request():
+    if request.blueprint not in current_app.extensions['request_stats'].blueprints:
+        return
+    g.request_start = time.perf_counter()
+    g.query_count = 0
+    g.db_time_ms = 0.0
+
+
+def _finish_request(response):
+    if 'request_start' not in g:
+        return response
+
+    latency_ms = (time.perf_counter() - g.request_start) * 1000
+    query_count = g.query_count
+    db_time_ms = g.db_time_ms
+    endpoint = request.endpoint or 'unknown'
+
+    if current_app.config.get('SERVER_TIMING_ENABLED', True):
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={db_time_ms:.2f};desc="{query_count} queries", app;dur={latency_ms:.2f}'
+        )
+
+    stats = current_app.extensions['request_stats']
+    if query_count > stats.n_plus_one_threshold:
+        current_app.logger.warning(
+            '疑似N+1查询: %s %s 执行了 %d 条SQL（阈值 %d）',
+            request.method, request.full_path, query_count, stats.n_plus_one_threshold
+        )
+
+    stats.observe(endpoint, resource_name(endpoint), response.status_code,
+                  latency_ms, db_time_ms, query_count)
+    return response
+
+
+def instrument_engine(engine):
+    """在引擎上注册语句计数（异步引擎传入其 sync_engine）"""
+    add_statement_observer(engine, _in_tracked_request, _observe_statement)
+
+
+def init_instrumentation(app, blueprints, engine=None):
+    """为指定蓝图的请求注册统计"""
+    if not app.config.get('INSTRUMENTATION_ENABLED', True):
+        return None
+
+    stats = RequestStats(
+        blueprints=[blueprint.name for blueprint in blueprints],
+        n_plus_one_threshold=app.config.get('N_PLUS_ONE_THRESHOLD', 20)
+    )
+    app.extensions['request_stats'] = stats
+    app.extensions['job_stats'] = JobStats()
+
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+    if engine is None:
+        from models import db
+        with app.app_context():
+            engines = list(db.engines.values())
+    else:
+        engines = [engine]
+    for engine in engines:
+        instrument_engine(engine)
+
+    return stats
@@ -6,9 +6,10 @@ Database Models Module
 """
 
 from flask_sqlalchemy import SQLAlchemy
+from .routing import RoutingSession
 
-# 创建数据库实例
-db = SQLAlchemy()
+# 创建数据库实例（会话支持只读副本路由，见 models/routing.py）
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 
 # 导入所有模型
 from .student import Student
@@ -16,5 +17,8 @@ from .course import Course
 from .book import Book
 from .enrollment import Enrollment
 from .borrow_record import BorrowRecord
+from .schedule import CourseSchedule
+from .prerequisite import course_prerequisites
+from .table_versions import table_versions
 
-__all__ = ['db', 'Student', 'Course', 'Book', 'Enrollment', 'BorrowRecord']
+__all__ = ['db', 'Student', 'Course', 'Book', 'Enrollment', 'BorrowRecord', 'CourseSchedule']
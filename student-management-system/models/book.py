@@ -6,6 +6,8 @@ Book Model
 """
 
 from datetime import datetime
+from sqlalchemy.orm import query_expression, with_expression
+from sqlalchemy.orm.attributes import set_committed_value
 from . import db
 
 class Book(db.Model):
@@ -45,6 +47,9 @@ class Book(db.Model):
     # 关系定义
     borrow_records = db.relationship('BorrowRecord', back_populates='book', cascade='all, delete-orphan')
     
+    # 列表查询时通过 with_borrowed_copies() 随同一条SQL加载，未加载时为None
+    loaded_borrowed_copies = query_expression()
+    
     def __init__(self, **kwargs):
         super(Book, self).__init__(**kwargs)
     
@@ -96,9 +101,21 @@ class Book(db.Model):
         db.session.delete(self)
         db.session.commit()
     
+    @classmethod
+    def with_borrowed_copies(cls):
+        """查询选项：以关联子查询加载已借出册数，避免逐条统计"""
+        from .borrow_record import BorrowRecord
+        count = db.select(db.func.count(BorrowRecord.id)).where(
+            BorrowRecord.book_id == cls.id,
+            BorrowRecord.status == 'borrowed'
+        ).correlate_except(BorrowRecord).scalar_subquery()
+        return with_expression(cls.loaded_borrowed_copies, count)
+    
     @property
     def borrowed_copies(self):
         """已借出册数"""
+        if self.loaded_borrowed_copies is not None:
+            return self.loaded_borrowed_copies
         from .borrow_record import BorrowRecord
         return BorrowRecord.query.filter(
             BorrowRecord.book_id == self.id,
@@ -121,11 +138,78 @@ class Book(db.Model):
     def current_borrowers(self):
         """当前借阅者"""
         from .student import Student
+        from .borrow_record import BorrowRecord
         return db.session.query(Student).join(BorrowRecord).filter(
             BorrowRecord.book_id == self.id,
             BorrowRecord.status == 'borrowed'
         ).all()
     
+    @staticmethod
+    def current_borrowers_by_book(book_ids):
+        """批量获取图书的当前借阅者，一次查询，返回 {图书ID: [学生]}"""
+        from .student import Student
+        from .borrow_record import BorrowRecord
+        rows = db.session.query(BorrowRecord.book_id, Student).join(
+            Student, BorrowRecord.student_id == Student.id
+        ).filter(
+            BorrowRecord.book_id.in_(book_ids),
+            BorrowRecord.status == 'borrowed'
+        ).order_by(BorrowRecord.id).all()
+        
+        result = {book_id: [] for book_id in book_ids}
+        for book_id, student in rows:
+            result[book_id].append(student)
+        return result
+    
+    @staticmethod
+    def load_detail(book_id):
+        """
+        组合加载图书详情，固定两条查询，与借阅记录数量无关
+
+        一条聚合查询取图书及册数统计（借出、逾期、历史借阅次数），
+        一条查询取未归还记录及借阅学生。返回 {'book', 'copies', 'current_records'}，
+        图书不存在时返回None。book.available_copies 等属性不再单独统计。
+        """
+        from .student import Student
+        from .borrow_record import BorrowRecord
+        borrowed = BorrowRecord.status == 'borrowed'
+        row = db.session.query(
+            Book,
+            db.func.count(BorrowRecord.id),
+            db.func.sum(db.case((borrowed, 1), else_=0)),
+            db.func.sum(db.case((db.and_(borrowed, BorrowRecord.due_date < datetime.utcnow()), 1), else_=0))
+        ).outerjoin(
+            BorrowRecord, BorrowRecord.book_id == Book.id
+        ).filter(Book.id == book_id).group_by(Book.id).populate_existing().first()
+        if row is None:
+            return None
+        
+        book, borrow_count, borrowed_copies, overdue_copies = row
+        set_committed_value(book, 'loaded_borrowed_copies', borrowed_copies or 0)
+        
+        current_records = []
+        for record, student in db.session.query(BorrowRecord, Student).join(
+            Student, BorrowRecord.student_id == Student.id
+        ).filter(
+            BorrowRecord.book_id == book_id,
+            BorrowRecord.status == 'borrowed'
+        ).order_by(BorrowRecord.borrow_date):
+            set_committed_value(record, 'student', student)
+            set_committed_value(record, 'book', book)
+            current_records.append(record)
+        
+        return {
+            'book': book,
+            'copies': {
+                'total': book.total_copies,
+                'borrowed': book.borrowed_copies,
+                'available': book.available_copies,
+                'overdue': overdue_copies or 0,
+                'borrow_count': borrow_count
+            },
+            'current_records': current_records
+        }
+    
     @staticmethod
     def search(keyword, page=1, per_page=10):
         """搜索图书"""
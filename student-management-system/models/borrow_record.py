@@ -7,6 +7,7 @@ Borrow Record Model
 
 from datetime import datetime, timedelta
 from . import db
+from .metrics import track_job
 
 class BorrowRecord(db.Model):
     """借书记录模型类"""
@@ -42,6 +43,9 @@ class BorrowRecord(db.Model):
     student = db.relationship('Student', back_populates='borrow_records')
     book = db.relationship('Book', back_populates='borrow_records')
     
+    # 复合索引：图书借阅历史按借阅时间分页
+    __table_args__ = (db.Index('ix_borrow_records_book_borrow_date', 'book_id', 'borrow_date'),)
+    
     def __init__(self, **kwargs):
         super(BorrowRecord, self).__init__(**kwargs)
         # 设置默认归还日期（借阅后30天）
@@ -185,10 +189,11 @@ class BorrowRecord(db.Model):
     @classmethod
     def update_overdue_status(cls):
         """更新逾期状态"""
-        overdue_records = cls.get_overdue_records()
-        for record in overdue_records:
-            record.status = 'overdue'
-        db.session.commit()
+        with track_job('update_overdue_status'):
+            overdue_records = cls.get_overdue_records()
+            for record in overdue_records:
+                record.status = 'overdue'
+            db.session.commit()
         return len(overdue_records)
 
     @staticmethod
@@ -6,6 +6,7 @@ Course Model
 """
 
 from datetime import datetime
+from sqlalchemy.orm import query_expression, with_expression
 from . import db
 
 class Course(db.Model):
@@ -41,6 +42,25 @@ class Course(db.Model):
     
     # 关系定义
     enrollments = db.relationship('Enrollment', back_populates='course', cascade='all, delete-orphan')
+    # 由 schedule 文本解析得到的结构化上课时段（见 models/schedule.py）
+    schedule_slots = db.relationship('CourseSchedule', back_populates='course', cascade='all, delete-orphan',
+                                     order_by='(CourseSchedule.weekday, CourseSchedule.start_period)')
+    # 由 prerequisites 文本解析得到的先修课程及其反向关系（见 models/prerequisite.py）
+    prerequisite_courses = db.relationship(
+        'Course', secondary='course_prerequisites',
+        primaryjoin='Course.id == course_prerequisites.c.course_id',
+        secondaryjoin='Course.id == course_prerequisites.c.prerequisite_id',
+        back_populates='required_by', order_by='Course.code'
+    )
+    required_by = db.relationship(
+        'Course', secondary='course_prerequisites',
+        primaryjoin='Course.id == course_prerequisites.c.prerequisite_id',
+        secondaryjoin='Course.id == course_prerequisites.c.course_id',
+        back_populates='prerequisite_courses'
+    )
+    
+    # 列表查询时通过 with_students_count() 随同一条SQL加载，未加载时为None
+    loaded_students_count = query_expression()
     
     def __init__(self, **kwargs):
         super(Course, self).__init__(**kwargs)
@@ -91,9 +111,21 @@ class Course(db.Model):
         db.session.delete(self)
         db.session.commit()
     
+    @classmethod
+    def with_students_count(cls):
+        """查询选项：以关联子查询加载当前选课学生数量，避免逐条统计"""
+        from .enrollment import Enrollment
+        count = db.select(db.func.count(Enrollment.id)).where(
+            Enrollment.course_id == cls.id,
+            Enrollment.status == 'enrolled'
+        ).correlate_except(Enrollment).scalar_subquery()
+        return with_expression(cls.loaded_students_count, count)
+    
     @property
     def current_students_count(self):
         """当前选课学生数量"""
+        if self.loaded_students_count is not None:
+            return self.loaded_students_count
         from .enrollment import Enrollment
         return Enrollment.query.filter(
             Enrollment.course_id == self.id,
@@ -104,6 +136,7 @@ class Course(db.Model):
     def enrolled_students(self):
         """获取已选课学生"""
         from .student import Student
+        from .enrollment import Enrollment
         return db.session.query(Student).join(Enrollment).filter(
             Enrollment.course_id == self.id,
             Enrollment.status == 'enrolled'
@@ -6,8 +6,23 @@ Enrollment Model
 """
 
 from datetime import datetime
+from bisect import bisect_right
+
+import numpy as np
+
 from . import db
 
+# 成绩等级阈值（升序）：(最低分, 等级, 绩点)
+GRADE_THRESHOLDS = [
+    (float('-inf'), 'F', 0.0),
+    (60, 'D', 1.0),
+    (70, 'C', 2.0),
+    (80, 'B', 3.0),
+    (90, 'A', 4.0)
+]
+GRADE_LOWER_BOUNDS = [threshold for threshold, _, _ in GRADE_THRESHOLDS]
+GRADE_SCALE = [(letter, points) for _, letter, points in GRADE_THRESHOLDS]
+
 class Enrollment(db.Model):
     """选课记录模型类"""
     __tablename__ = 'enrollments'
@@ -97,27 +112,28 @@ class Enrollment(db.Model):
         db.session.commit()
         return self
     
+    @staticmethod
+    def grade_point(grade):
+        """将单个百分制成绩换算为 (等级, 绩点)，阈值见 GRADE_THRESHOLDS"""
+        return GRADE_SCALE[bisect_right(GRADE_LOWER_BOUNDS, grade) - 1]
+    
+    @staticmethod
+    def grade_points(grades):
+        """
+        批量将百分制成绩换算为 (等级, 绩点) 列表
+
+        与 grade_point 使用同一组阈值；np.searchsorted 对整批成绩一次向量化二分。
+        """
+        positions = np.searchsorted(GRADE_LOWER_BOUNDS, np.asarray(grades, dtype=np.float64), side='right') - 1
+        return [GRADE_SCALE[position] for position in positions]
+    
     def complete_course(self, grade=None, grade_letter=None):
         """完成课程"""
         self.status = 'completed'
         if grade is not None:
             self.grade = grade
             # 根据成绩计算等级和绩点
-            if grade >= 90:
-                self.grade_letter = 'A'
-                self.gpa_points = 4.0
-            elif grade >= 80:
-                self.grade_letter = 'B'
-                self.gpa_points = 3.0
-            elif grade >= 70:
-                self.grade_letter = 'C'
-                self.gpa_points = 2.0
-            elif grade >= 60:
-                self.grade_letter = 'D'
-                self.gpa_points = 1.0
-            else:
-                self.grade_letter = 'F'
-                self.gpa_points = 0.0
+            self.grade_letter, self.gpa_points = Enrollment.grade_point(grade)
         if grade_letter is not None:
             self.grade_letter = grade_letter
         self.updated_at = datetime.utcnow()
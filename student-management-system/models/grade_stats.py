@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+成绩分布统计
+Grade Distribution Analytics
+
+一条查询取回全部已完成选课的成绩列，
+再对所有课程、所有学期一次性向量化计算：人数、均值、中位数、标准差（总体）、
+最高/最低分、及格率和10分一档的直方图。
+默认用 NumPy 分段归约（reduceat/bincount）计算；GRADE_STATS_USE_NUMPY=False 时纯Python逐组计算，结果一致。
+
+结果按学期筛选条件缓存在进程内，选课、课程表有写入提交时失效；命中前再比较这两张表的版本号
+（models/table_versions.py），其他工作进程的写入同样使缓存失效。
+"""
+
+import time
+import threading
+import statistics
+from itertools import groupby
+
+import numpy as np
+from flask import current_app
+
+from . import db
+from .course import Course
+from .enrollment import Enrollment, GRADE_THRESHOLDS
+from .table_versions import on_commit, version_key
+
+# 成绩统计依赖的数据表
+STATS_TABLES = (Enrollment.__tablename__, Course.__tablename__)
+
+# 及格线取等级阈值中 D 的最低分
+PASS_GRADE = GRADE_THRESHOLDS[1][0]
+
+# 直方图分档：0-9, 10-19, ..., 90-100（满分并入最后一档）
+HISTOGRAM_BINS = [f'{low}-{low + 9}' for low in range(0, 90, 10)] + ['90-100']
+
+
+def fetch_grades(semester=None):
+    """一次查询取回成绩，返回 (课程信息列表, 每个成绩的课程下标, 成绩列表)"""
+    query = db.session.query(
+        Course.id, Course.code, Course.name, Course.semester, Enrollment.grade
+    ).select_from(Enrollment).join(
+        Course, Enrollment.course_id == Course.id
+    ).filter(
+        Enrollment.status == 'completed',
+        Enrollment.grade.isnot(None)
+    )
+    if semester:
+        query = query.filter(Course.semester == semester)
+
+    courses = []
+    course_index = []
+    grades = []
+    for row in query.order_by(Course.id):
+        if not courses or courses[-1]['course_id'] != row.id:
+            courses.append({'course_id': row.id, 'code': row.code, 'name': row.name, 'semester': row.semester})
+        course_index.append(len(courses) - 1)
+        grades.append(row.grade)
+    return courses, course_index, grades
+
+
+def _summary(count, mean, median, stddev, low, high, passed, histogram):
+    return {
+        'count': int(count),
+        'mean': round(float(mean), 2),
+        'median': round(float(median), 2),
+        'stddev': round(float(stddev), 2),
+        'min': float(low),
+        'max': float(high),
+        'pass_rate': round(float(passed) / count, 4),
+        'histogram': [int(n) for n in histogram]
+    }
+
+
+def summarize_groups_numpy(keys, grades):
+    """
+    NumPy分段统计
+
+    keys 为每个成绩所属的组下标（0..n-1，每组至少一个成绩），返回按组下标排列的统计列表。
+    """
+    keys = np.asarray(keys, dtype=np.int64)
+    grades = np.asarray(grades, dtype=np.float64)
+    if grades.size == 0:
+        return []
+    order = np.lexsort((grades, keys))
+    keys = keys[order]
+    grades = grades[order]
+
+    groups, starts, counts = np.unique(keys, return_index=True, return_counts=True)
+    ends = starts + counts - 1
+    means = np.add.reduceat(grades, starts) / counts
+    deviations = grades - np.repeat(means, counts)
+    stddevs = np.sqrt(np.add.reduceat(deviations * deviations, starts) / counts)
+    medians = (grades[starts + (counts - 1) // 2] + grades[starts + counts // 2]) / 2
+    passed = np.add.reduceat((grades >= PASS_GRADE).astype(np.int64), starts)
+
+    bins = np.minimum((grades // 10).astype(np.int64), len(HISTOGRAM_BINS) - 1)
+    group_positions = np.repeat(np.arange(groups.size), counts)
+    histograms = np.bincount(
+        group_positions * len(HISTOGRAM_BINS) + bins, minlength=groups.size * len(HISTOGRAM_BINS)
+    ).reshape(groups.size, len(HISTOGRAM_BINS))
+
+    return [
+        _summary(counts[i], means[i], medians[i], stddevs[i], grades[starts[i]], grades[ends[i]],
+                 passed[i], histograms[i])
+        for i in range(groups.size)
+    ]
+
+
+def summarize_groups_python(keys, grades):
+    """纯Python分段统计，参数与结果同 summarize_groups_numpy"""
+    result = []
+    for _, group in groupby(sorted(zip(keys, grades)), key=lambda item: item[0]):
+        values = [grade for _, grade in group]
+        histogram = [0] * len(HISTOGRAM_BINS)
+        for grade in values:
+            histogram[min(int(grade // 10), len(HISTOGRAM_BINS) - 1)] += 1
+        result.append(_summary(
+            len(values), statistics.fmean(values), statistics.median(values), statistics.pstdev(values),
+            values[0], values[-1], sum(grade >= PASS_GRADE for grade in values), histogram
+        ))
+    return result
+
+
+def grade_distribution(semester=None, use_numpy=True):
+    """
+    全部课程、各学期和总体的成绩分布
+
+    返回 {'bins', 'overall', 'courses': [...], 'semesters': [...]}，没有成绩时统计列表为空、overall为None。
+    """
+    summarize = summarize_groups_numpy if use_numpy else summarize_groups_python
+
+    courses, course_index, grades = fetch_grades(semester)
+
+    # 每门课程所属学期的下标，展开为每个成绩的学期下标
+    semesters = sorted({course['semester'] for course in courses})
+    semester_position = {name: i for i, name in enumerate(semesters)}
+    course_semester = [semester_position[course['semester']] for course in courses]
+    semester_index = [course_semester[index] for index in course_index]
+
+    overall = summarize([0] * len(grades), grades)
+    return {
+        'bins': HISTOGRAM_BINS,
+        'pass_grade': PASS_GRADE,
+        'overall': overall[0] if overall else None,
+        'courses': [dict(course, **stats) for course, stats in zip(courses, summarize(course_index, grades))],
+        'semesters': [dict(semester=name, **stats)
+                      for name, stats in zip(semesters, summarize(semester_index, grades))]
+    }
+
+
+class GradeStats:
+    """按学期缓存的成绩分布统计"""
+
+    def __init__(self, ttl=3600, use_numpy=True):
+        self.ttl = ttl
+        self.use_numpy = use_numpy
+        self._results = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def distribution(self, semester=None):
+        """获取成绩分布（semester 为空时统计全部学期）"""
+        key = semester or None
+        with self._lock:
+            entry = self._results.get(key)
+        version = version_key(*STATS_TABLES)
+
+        with self._lock:
+            if entry is not None and entry[1] >= time.monotonic() and entry[2] == version:
+                return entry[0]
+            generation = self._generation
+
+        result = grade_distribution(key, use_numpy=self.use_numpy)
+
+        with self._lock:
+            # 计算期间发生过失效时不写入，避免缓存旧结果
+            if generation == self._generation:
+                self._results[key] = (result, time.monotonic() + self.ttl, version)
+        return result
+
+    def invalidate(self):
+        """清空缓存"""
+        with self._lock:
+            self._results.clear()
+            self._generation += 1
+
+    def __len__(self):
+        return len(self._results)
+
+
+def get_grade_stats():
+    """获取当前应用的成绩统计服务"""
+    return current_app.extensions.get('grade_stats')
+
+
+def init_grade_stats(app):
+    """为应用创建成绩统计服务"""
+    stats = GradeStats(
+        ttl=app.config.get('GRADE_STATS_CACHE_TTL', 3600),
+        use_numpy=app.config.get('GRADE_STATS_USE_NUMPY', True)
+    )
+    app.extensions['grade_stats'] = stats
+    on_commit(app, lambda tables: stats.invalidate(), STATS_TABLES)
+    return stats
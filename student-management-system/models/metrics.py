@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+进程内指标
+In-Process Metrics
+
+累计分桶直方图和后台任务耗时统计。模型层通过 track_job() 记录任务耗时，
+统计对象由 instrumentation.init_instrumentation 注册到 app.extensions['job_stats']，
+/metrics 视图读取的是在锁内复制的快照。
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import current_app
+
+JOB_BUCKETS_MS = (10, 100, 1000, 5000, 30000, 60000, 300000)
+
+
+class Histogram:
+    """累计分桶直方图"""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # 最后一个为 +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        """记录一个观测值"""
+        for i, upper in enumerate(self.buckets):
+            if value <= upper:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        """复制当前分桶计数（调用方需持有所属统计对象的锁）"""
+        copy = Histogram(self.buckets)
+        copy.counts = list(self.counts)
+        copy.count = self.count
+        copy.sum = self.sum
+        return copy
+
+    def cumulative(self):
+        """返回 [(上界, 累计数量)]，最后一项上界为 '+Inf'"""
+        result = []
+        running = 0
+        for upper, n in zip(self.buckets + ('+Inf',), self.counts):
+            running += n
+            result.append((upper, running))
+        return result
+
+    def quantile(self, q):
+        """按分桶估算分位数（返回所在桶的上界）"""
+        if not self.count:
+            return None
+        target = q * self.count
+        for upper, running in self.cumulative():
+            if running >= target:
+                return upper
+        return '+Inf'
+
+    def to_dict(self):
+        """转换为字典格式"""
+        return {
+            'count': self.count,
+            'sum': round(self.sum, 3),
+            'buckets': {str(upper): n for upper, n in self.cumulative()}
+        }
+
+
+class JobStats:
+    """后台任务耗时统计"""
+
+    def __init__(self):
+        self.durations_ms = {}
+        self.failures = {}
+        self._lock = threading.Lock()
+
+    def observe(self, name, duration_ms, failed=False):
+        """记录一次任务执行"""
+        with self._lock:
+            histogram = self.durations_ms.get(name)
+            if histogram is None:
+                histogram = self.durations_ms[name] = Histogram(JOB_BUCKETS_MS)
+                self.failures[name] = 0
+            histogram.observe(duration_ms)
+            if failed:
+                self.failures[name] += 1
+
+    def items(self):
+        """获取 (任务名, 耗时直方图, 失败次数) 列表，直方图在锁内复制"""
+        with self._lock:
+            return [(name, histogram.snapshot(), self.failures[name])
+                    for name, histogram in self.durations_ms.items()]
+
+
+@contextmanager
+def track_job(name):
+    """
+    记录后台任务耗时
+
+    用法: with track_job('update_overdue_status'): ...
+    不在应用上下文或未启用统计时不做任何记录。
+    """
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield
+    except Exception:
+        failed = True
+        raise
+    finally:
+        try:
+            job_stats = current_app.extensions.get('job_stats')
+        except RuntimeError:
+            job_stats = None
+        if job_stats is not None:
+            job_stats.observe(name, (time.perf_counter() - start) * 1000, failed=failed)
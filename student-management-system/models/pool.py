@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据库连接池监控
+Connection Pool Monitoring
+
+统计连接的创建、取出、归还和失效次数，并提供连接池当前状态。
+"""
+
+import threading
+import time
+
+from sqlalchemy import event, text
+from . import db
+
+
+class PoolMonitor:
+    """连接池事件计数器"""
+
+    def __init__(self):
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def _incr(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def install(self, engine):
+        """在引擎上注册连接池事件"""
+        event.listen(engine, 'connect', lambda *args: self._incr('connects'))
+        event.listen(engine, 'checkout', lambda *args: self._incr('checkouts'))
+        event.listen(engine, 'checkin', lambda *args: self._incr('checkins'))
+        event.listen(engine, 'invalidate', lambda *args: self._incr('invalidations'))
+
+    def to_dict(self):
+        """转换为字典格式"""
+        return {
+            'connects': self.connects,
+            'checkouts': self.checkouts,
+            'checkins': self.checkins,
+            'invalidations': self.invalidations
+        }
+
+
+def pool_stats(engine):
+    """获取连接池当前状态"""
+    pool = engine.pool
+    stats = {
+        'pool_class': type(pool).__name__,
+        'status': pool.status()
+    }
+    # 只有 QueuePool 等队列型连接池提供这些计数
+    for name in ('size', 'checkedin', 'checkedout', 'overflow'):
+        method = getattr(pool, name, None)
+        if callable(method):
+            stats[name] = method()
+    return stats
+
+
+def check_health(engine):
+    """执行探活查询，返回 (是否健康, 耗时毫秒, 错误信息)"""
+    start = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+        return True, round((time.perf_counter() - start) * 1000, 3), None
+    except Exception as e:
+        return False, round((time.perf_counter() - start) * 1000, 3), str(e)
+
+
+def init_pool_monitor(app):
+    """为应用的数据库引擎注册连接池监控"""
+    monitor = PoolMonitor()
+    with app.app_context():
+        monitor.install(db.engine)
+    app.extensions['pool_monitor'] = monitor
+    return monitor
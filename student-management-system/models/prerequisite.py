@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+先修课程图
+Course Prerequisite Graph
+
+Course.prerequisites 仍保存原始文本（课程代码或名称，如 “CS101, CS102”），
+赋值时解析为 course_prerequisites 表中的有向边（课程 -> 先修课程），并检查不会形成循环。
+
+全部先修关系一次查询取回，计算传递闭包（每门课程的全部直接和间接先修课程）缓存在进程内，
+本进程写入先修关系表并提交时失效，命中前再比较该表的版本号（见 models/table_versions.py），
+其他工作进程写入后同样重新计算。选课时只需查询学生已完成的课程，
+再与闭包做一次集合差，不必逐层递归查询。
+循环依赖检查不使用缓存，在当前事务中重新读取先修关系。
+"""
+
+import re
+import threading
+from collections import deque
+
+from flask import current_app
+from sqlalchemy import event, select
+
+from . import db
+from .course import Course
+from .enrollment import Enrollment
+from .table_versions import on_commit, version_key
+
+# 先修关系表：course_id 的先修课程为 prerequisite_id
+course_prerequisites = db.Table(
+    'course_prerequisites',
+    db.Column('course_id', db.Integer, db.ForeignKey('courses.id'), primary_key=True),
+    db.Column('prerequisite_id', db.Integer, db.ForeignKey('courses.id'), primary_key=True, index=True)
+)
+
+# 先修课程图依赖的数据表；删除课程时其先修关系随之删除，同样推进该表的版本号
+GRAPH_TABLES = (course_prerequisites.name,)
+
+# 只按标点分隔，课程名称中可以有空格（如 “Data Structures”）
+PREREQUISITE_SEPARATOR = re.compile(r'[，,；;、/\n]+')
+
+# 表示没有先修课程的文本
+NO_PREREQUISITES = frozenset({'', '无'})
+
+
+def parse_prerequisites(text):
+    """拆分先修课程文本为课程代码或名称列表（保持顺序、去重），空文本或 “无” 返回空列表"""
+    if (text or '').strip() in NO_PREREQUISITES:
+        return []
+    tokens = []
+    for token in PREREQUISITE_SEPARATOR.split(text):
+        token = token.strip()
+        if token and token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def transitive_closure(edges):
+    """
+    计算传递闭包
+
+    edges 为 {课程ID: 直接先修课程ID集合}，返回 {课程ID: 全部先修课程ID的frozenset}。
+    按后序遍历（迭代实现）自底向上合并；遇到环时跳过回边，不会死循环。
+    """
+    closure = {}
+    for root in edges:
+        if root in closure:
+            continue
+        visiting = {root}
+        stack = [(root, iter(edges[root]))]
+        while stack:
+            node, children = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                visiting.discard(node)
+                result = set()
+                for prerequisite in edges.get(node, ()):
+                    result.add(prerequisite)
+                    result |= closure.get(prerequisite, frozenset())
+                closure[node] = frozenset(result)
+            elif child not in closure and child not in visiting:
+                visiting.add(child)
+                stack.append((child, iter(edges.get(child, ()))))
+    return closure
+
+
+def find_path(edges, start, target):
+    """沿先修关系从 start 到 target 的一条路径（课程ID列表），不可达时返回 None"""
+    previous = {start: None}
+    queue = deque([start])
+    while queue:
+        node = queue.popleft()
+        if node == target:
+            path = []
+            while node is not None:
+                path.append(node)
+                node = previous[node]
+            return path[::-1]
+        for prerequisite in edges.get(node, ()):
+            if prerequisite not in previous:
+                previous[prerequisite] = node
+                queue.append(prerequisite)
+    return None
+
+
+def load_edges():
+    """一次查询取回全部先修关系，返回 {课程ID: 直接先修课程ID集合}"""
+    edges = {}
+    for course_id, prerequisite_id in db.session.execute(
+        select(course_prerequisites.c.course_id, course_prerequisites.c.prerequisite_id)
+    ):
+        edges.setdefault(course_id, set()).add(prerequisite_id)
+    return edges
+
+
+class PrerequisiteGraph:
+    """缓存的先修课程图及其传递闭包"""
+
+    def __init__(self):
+        self._graph = None
+        self._version = None
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def _load(self):
+        """返回 (边, 闭包)；缓存的版本与数据库一致时直接返回，否则一次查询取回全部先修关系"""
+        version = version_key(*GRAPH_TABLES)
+        with self._lock:
+            if self._graph is not None and self._version == version:
+                return self._graph
+            generation = self._generation
+
+        edges = load_edges()
+        graph = (edges, transitive_closure(edges))
+
+        with self._lock:
+            # 计算期间发生过失效时不写入，避免缓存旧结果
+            if generation == self._generation:
+                self._graph = graph
+                self._version = version
+        return graph
+
+    def direct(self, course_id):
+        """课程的直接先修课程ID集合"""
+        return frozenset(self._load()[0].get(course_id, ()))
+
+    def closure(self, course_id):
+        """课程的全部（直接和间接）先修课程ID集合"""
+        return self._load()[1].get(course_id, frozenset())
+
+    def cycle_path(self, course_id, prerequisite_ids):
+        """
+        以 prerequisite_ids 作为课程的直接先修课程时形成的环（课程ID列表，首尾相同），不成环时返回 None
+
+        先修关系在当前事务中重新读取而不使用缓存，其他工作进程刚提交的关系同样参与检查。
+        """
+        edges = load_edges()
+        for prerequisite_id in prerequisite_ids:
+            if prerequisite_id == course_id:
+                return [course_id, course_id]
+            path = find_path(edges, prerequisite_id, course_id)
+            if path:
+                return [course_id] + path
+        return None
+
+    def invalidate(self):
+        """清空缓存"""
+        with self._lock:
+            self._graph = None
+            self._version = None
+            self._generation += 1
+
+
+def get_prerequisite_graph():
+    """获取当前应用的先修课程图"""
+    return current_app.extensions.get('prerequisites')
+
+
+def init_prerequisites(app):
+    """为应用创建先修课程图"""
+    graph = PrerequisiteGraph()
+    app.extensions['prerequisites'] = graph
+    on_commit(app, lambda tables: graph.invalidate(), GRAPH_TABLES)
+    return graph
+
+
+def resolve_prerequisites(course, text):
+    """
+    解析先修课程文本并校验
+
+    按课程代码或名称匹配已有课程，不存在、以自身为先修或形成循环依赖时抛出 ValueError。
+    """
+    tokens = parse_prerequisites(text)
+    if not tokens:
+        return []
+
+    with db.session.no_autoflush:
+        matches = Course.query.filter(db.or_(Course.code.in_(tokens), Course.name.in_(tokens))).all()
+    by_token = {}
+    for match in matches:
+        by_token.setdefault(match.code, match)
+        by_token.setdefault(match.name, match)
+
+    missing = [token for token in tokens if token not in by_token]
+    if missing:
+        raise ValueError(f'先修课程不存在: {"、".join(missing)}')
+
+    prerequisites = []
+    for token in tokens:
+        if by_token[token] not in prerequisites:
+            prerequisites.append(by_token[token])
+
+    if any(prerequisite is course for prerequisite in prerequisites):
+        raise ValueError('课程不能以自身为先修课程')
+
+    graph = get_prerequisite_graph()
+    if course.id is not None and graph is not None:
+        cycle = graph.cycle_path(course.id, [prerequisite.id for prerequisite in prerequisites])
+        if cycle:
+            with db.session.no_autoflush:
+                codes = dict(db.session.query(Course.id, Course.code).filter(Course.id.in_(cycle)))
+            raise ValueError(f'先修课程存在循环依赖: {" → ".join(codes[course_id] for course_id in cycle)}')
+    return prerequisites
+
+
+@event.listens_for(Course.prerequisites, 'set')
+def _sync_prerequisites(course, value, oldvalue, initiator):
+    """课程先修课程文本变更时重建先修关系"""
+    if value == oldvalue:
+        return
+    course.prerequisite_courses = resolve_prerequisites(course, value)
+
+
+def missing_prerequisites(student_id, course_id):
+    """
+    学生尚未完成的先修课程（含间接先修），按课程代码排序
+
+    已完成课程一次查询取回，与缓存的传递闭包做集合差。
+    """
+    required = get_prerequisite_graph().closure(course_id)
+    if not required:
+        return []
+
+    completed = {completed_id for completed_id, in db.session.query(Enrollment.course_id).filter(
+        Enrollment.student_id == student_id,
+        Enrollment.status == 'completed',
+        Enrollment.course_id.in_(required)
+    )}
+    missing = required - completed
+    if not missing:
+        return []
+    return Course.query.filter(Course.id.in_(missing)).order_by(Course.code).all()
+
+
+def backfill_prerequisites():
+    """为已有先修课程文本但没有先修关系的课程补建关系，无法解析的跳过并记录日志"""
+    courses = Course.query.filter(
+        Course.prerequisites.isnot(None),
+        Course.prerequisites != '',
+        ~Course.prerequisite_courses.any()
+    ).all()
+
+    created = 0
+    for course in courses:
+        try:
+            prerequisites = resolve_prerequisites(course, course.prerequisites)
+        except ValueError as e:
+            current_app.logger.warning(f'课程 {course.code} 先修课程无法解析，跳过: {e}')
+            continue
+        course.prerequisite_courses = prerequisites
+        created += len(prerequisites)
+        # 逐门提交，后续课程的循环检查基于已补建的关系
+        db.session.commit()
+    db.session.commit()
+    return created
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+采样慢查询分析器
+Sampled Slow Query Profiler
+
+替代 SQLALCHEMY_RECORD_QUERIES 的轻量方案：语句执行前按采样率决定是否计时，
+只有命中采样的语句才计时（与请求统计共用 models/statement_timing.py 的计时），
+其中耗时超过阈值的语句提取SQL和调用位置，写入固定容量的环形缓冲区。
+"""
+
+import os
+import random
+import threading
+import traceback
+from collections import deque
+from datetime import datetime
+
+from flask import has_request_context, request
+from . import db, statement_timing
+
+# 项目根目录，用于从调用栈中定位业务代码
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def find_call_site(skip_files=(__file__, statement_timing.__file__)):
+    """返回调用栈中最内层的项目代码位置，如 'api/students.py:42 in get'"""
+    for frame in reversed(traceback.extract_stack()):
+        filename = os.path.abspath(frame.filename)
+        if not filename.startswith(PROJECT_ROOT) or filename in skip_files:
+            continue
+        if 'site-packages' in filename:
+            continue
+        return f'{os.path.relpath(filename, PROJECT_ROOT)}:{frame.lineno} in {frame.name}'
+    return None
+
+
+class QueryProfiler:
+    """慢查询采样器"""
+
+    def __init__(self, sample_rate=1.0, slow_threshold_ms=100, capacity=200):
+        self.sample_rate = sample_rate
+        self.slow_threshold_ms = slow_threshold_ms
+        self.total_queries = 0
+        self.sampled_queries = 0
+        self.slow_queries = 0
+        self._records = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+
+    def install(self, engine):
+        """在引擎上注册语句计时观察者"""
+        statement_timing.add_statement_observer(engine, self.sample, self.observe)
+
+    def sample(self):
+        """语句执行前调用：计数并决定本条语句是否采样计时"""
+        sampled = random.random() < self.sample_rate
+        with self._lock:
+            self.total_queries += 1
+            if sampled:
+                self.sampled_queries += 1
+        return sampled
+
+    def observe(self, statement, duration_ms):
+        """采样语句执行完成，超过阈值时记录"""
+        if duration_ms < self.slow_threshold_ms:
+            return
+        with self._lock:
+            self.slow_queries += 1
+        self.record(statement, duration_ms)
+
+    def record(self, statement, duration_ms):
+        """写入一条慢查询记录"""
+        entry = {
+            'sql': statement,
+            'duration_ms': round(duration_ms, 3),
+            'call_site': find_call_site(),
+            'endpoint': request.endpoint if has_request_context() else None,
+            'timestamp': datetime.utcnow().isoformat()
+        }
+        with self._lock:
+            self._records.append(entry)
+
+    def records(self, limit=None):
+        """获取记录，最新的在前"""
+        with self._lock:
+            items = list(reversed(self._records))
+        return items[:limit] if limit else items
+
+    def clear(self):
+        """清空记录和计数"""
+        with self._lock:
+            self._records.clear()
+            self.total_queries = 0
+            self.sampled_queries = 0
+            self.slow_queries = 0
+
+    def to_dict(self):
+        """转换为字典格式（不含记录）"""
+        return {
+            'sample_rate': self.sample_rate,
+            'slow_threshold_ms': self.slow_threshold_ms,
+            'capacity': self._records.maxlen,
+            'total_queries': self.total_queries,
+            'sampled_queries': self.sampled_queries,
+            'slow_queries': self.slow_queries,
+            'recorded': len(self._records)
+        }
+
+
+def init_query_profiler(app):
+    """根据配置为应用启用慢查询采样"""
+    if not app.config.get('QUERY_PROFILER_ENABLED', False):
+        return None
+
+    profiler = QueryProfiler(
+        sample_rate=app.config.get('QUERY_PROFILER_SAMPLE_RATE', 1.0),
+        slow_threshold_ms=app.config.get('QUERY_PROFILER_SLOW_MS', 100),
+        capacity=app.config.get('QUERY_PROFILER_CAPACITY', 200)
+    )
+    with app.app_context():
+        for engine in db.engines.values():
+            profiler.install(engine)
+    app.extensions['query_profiler'] = profiler
+    return profiler
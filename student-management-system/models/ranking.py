@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+专业/年级GPA排名
+Cohort GPA Ranking
+
+在 models/transcript.py 的GPA聚合之上用窗口函数一次算出整个群体的排名：
+- rank: RANK() OVER (ORDER BY gpa DESC)，并列同名次
+- percentile: CUME_DIST() OVER (ORDER BY gpa) × 100，即GPA不高于本人的学生占比
+SQLite 3.25 之前没有窗口函数，此时取回聚合结果后用 NumPy 排序并对整批GPA向量化二分，结果一致。
+
+只修过0学分课程的学生GPA为NULL，不参与排名。
+
+排名按群体（专业, 年级）缓存在进程内；本进程的选课、课程、学生表写入提交时整体失效，
+命中前再比较这三张表的版本号（models/table_versions.py），其他工作进程的写入同样使缓存失效。
+"""
+
+import time
+import sqlite3
+import threading
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import func, select
+
+from . import db
+from .course import Course
+from .student import Student
+from .enrollment import Enrollment
+from .transcript import cohort_gpa_query
+from .table_versions import on_commit, version_key
+
+# 排名依赖的数据表：选课成绩、课程学分、学生的专业/年级
+RANKING_TABLES = (Enrollment.__tablename__, Course.__tablename__, Student.__tablename__)
+
+
+def window_functions_supported(engine):
+    """数据库是否支持窗口函数"""
+    if engine.dialect.name != 'sqlite':
+        return True
+    return sqlite3.sqlite_version_info >= (3, 25, 0)
+
+
+def _entry(row, rank, percentile, size):
+    return {
+        'id': row.id,
+        'student_id': row.student_id,
+        'name': row.name,
+        'gpa': round(float(row.gpa), 2),
+        'credits': row.credits,
+        'rank': rank,
+        'percentile': round(float(percentile) * 100, 1),
+        'cohort_size': size
+    }
+
+
+def ranked_cohort_query(major=None, grade=None):
+    """参与排名的群体GPA聚合查询：排除已完成课程学分合计为0（GPA为NULL）的学生"""
+    return cohort_gpa_query(major, grade).having(func.sum(Course.credits) > 0)
+
+
+def rank_with_window_functions(major=None, grade=None):
+    """一条SQL计算群体内排名和百分位"""
+    cohort = ranked_cohort_query(major, grade).subquery()
+    rank = func.rank().over(order_by=cohort.c.gpa.desc())
+    percentile = func.cume_dist().over(order_by=cohort.c.gpa)
+    size = func.count().over()
+    rows = db.session.execute(
+        select(cohort, rank.label('rank'), percentile.label('percentile'), size.label('cohort_size'))
+        .order_by(cohort.c.gpa.desc(), cohort.c.student_id)
+    ).all()
+    return [_entry(row, row.rank, row.percentile, row.cohort_size) for row in rows]
+
+
+def rank_with_numpy(major=None, grade=None):
+    """不支持窗口函数时的回退：取回群体GPA，排序后一次 searchsorted 算出全部学生的排名和百分位"""
+    rows = ranked_cohort_query(major, grade).all()
+    if not rows:
+        return []
+    gpas = np.fromiter((row.gpa for row in rows), dtype=np.float64, count=len(rows))
+    size = gpas.size
+
+    # GPA不高于本人的人数；名次为GPA更高的人数加一
+    not_higher = np.searchsorted(np.sort(gpas), gpas, side='right')
+    ranks = size - not_higher + 1
+    order = np.lexsort((np.array([row.student_id for row in rows]), ranks))
+    return [_entry(rows[i], int(ranks[i]), not_higher[i] / size, size) for i in order]
+
+
+class RankingService:
+    """按群体缓存的排名服务"""
+
+    def __init__(self, ttl=3600, use_window_functions=None):
+        self.ttl = ttl
+        # None 表示按数据库版本自动判断
+        self.use_window_functions = use_window_functions
+        self.hits = 0
+        self.misses = 0
+        self._cohorts = {}
+        self._generation = 0
+        self._lock = threading.Lock()
+
+    def rank_cohort(self, major=None, grade=None):
+        """群体内全部学生的排名（按名次排序），没有GPA的学生不参与排名"""
+        key = (major or None, grade or None)
+        with self._lock:
+            entry = self._cohorts.get(key)
+        version = version_key(*RANKING_TABLES)
+
+        with self._lock:
+            if entry is not None and entry[1] >= time.monotonic() and entry[2] == version:
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            generation = self._generation
+
+        use_window_functions = self.use_window_functions
+        if use_window_functions is None:
+            use_window_functions = window_functions_supported(db.engine)
+        ranking = (rank_with_window_functions if use_window_functions else rank_with_numpy)(*key)
+
+        with self._lock:
+            # 计算期间发生过失效时不写入，避免缓存旧结果
+            if generation == self._generation:
+                self._cohorts[key] = (ranking, time.monotonic() + self.ttl, version)
+        return ranking
+
+    def student_rank(self, student):
+        """学生在本专业本年级中的排名，没有GPA时返回None"""
+        for entry in self.rank_cohort(student.major, student.grade):
+            if entry['id'] == student.id:
+                return entry
+        return None
+
+    def invalidate(self):
+        """清空全部群体的缓存"""
+        with self._lock:
+            self._cohorts.clear()
+            self._generation += 1
+
+    def __len__(self):
+        return len(self._cohorts)
+
+
+def get_ranking_service():
+    """获取当前应用的排名服务"""
+    return current_app.extensions.get('ranking')
+
+
+def init_ranking(app):
+    """为应用创建排名服务"""
+    service = RankingService(
+        ttl=app.config.get('RANKING_CACHE_TTL', 3600),
+        use_window_functions=app.config.get('RANKING_WINDOW_FUNCTIONS')
+    )
+    app.extensions['ranking'] = service
+    on_commit(app, lambda tables: service.invalidate(), RANKING_TABLES)
+    return service
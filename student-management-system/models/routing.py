@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+读写分离会话路由
+Read Replica Session Routing
+
+配置 SQLALCHEMY_BINDS 中的只读副本（默认键 'replica'）后：
+- GET/HEAD 请求的查询路由到副本，写入（flush、INSERT/UPDATE/DELETE）始终走主库
+- 请求中一旦发生写入，该请求剩余的查询也改走主库
+- POST/PUT/PATCH/DELETE 成功后在会话Cookie中记录写入时间，
+  DB_REPLICA_STICKY_SECONDS 内同一会话的读请求仍走主库（读己之写）
+非请求代码（统计、导出任务）可用 `with read_replica():` 显式使用副本。
+"""
+
+import time
+from contextlib import contextmanager
+
+from flask import current_app, g, has_app_context, request, session
+from flask_sqlalchemy.session import Session
+
+WRITE_METHODS = ('POST', 'PUT', 'PATCH', 'DELETE')
+STICKY_SESSION_KEY = '_db_last_write'
+
+
+class RoutingSession(Session):
+    """按请求类型在主库和只读副本之间选择引擎的会话"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or not has_app_context() or not g.get('db_read_replica'):
+            return engine
+
+        if self._flushing or getattr(clause, 'is_dml', False):
+            # 写入后本请求内的读取都回到主库
+            g.db_read_replica = False
+            return engine
+
+        engines = self._db.engines
+        replica = engines.get(current_app.config.get('DB_REPLICA_BIND', 'replica'))
+        if replica is None or engine is not engines.get(None):
+            return engine
+        return replica
+
+
+def replica_configured(app):
+    """是否配置了只读副本"""
+    return app.config.get('DB_REPLICA_BIND', 'replica') in (app.config.get('SQLALCHEMY_BINDS') or {})
+
+
+@contextmanager
+def read_replica(enabled=True):
+    """在代码块内将查询路由到只读副本（enabled=False 时强制主库）"""
+    previous = g.get('db_read_replica', False)
+    g.db_read_replica = enabled
+    try:
+        yield
+    finally:
+        g.db_read_replica = previous
+
+
+def _route_request():
+    if request.method not in ('GET', 'HEAD'):
+        g.db_read_replica = False
+        return
+    sticky_seconds = current_app.config.get('DB_REPLICA_STICKY_SECONDS', 5)
+    last_write = session.get(STICKY_SESSION_KEY, 0)
+    g.db_read_replica = time.time() - last_write > sticky_seconds
+
+
+def _remember_write(response):
+    if request.method in WRITE_METHODS and response.status_code < 400:
+        session[STICKY_SESSION_KEY] = time.time()
+    return response
+
+
+def init_read_replica(app, blueprints):
+    """为指定蓝图的请求启用副本路由（未配置副本时不生效）"""
+    if not replica_configured(app):
+        return False
+
+    names = {blueprint.name for blueprint in blueprints}
+
+    @app.before_request
+    def route_request():
+        if request.blueprint in names:
+            _route_request()
+
+    @app.after_request
+    def remember_write(response):
+        if request.blueprint in names:
+            return _remember_write(response)
+        return response
+
+    @app.teardown_request
+    def reset_route(exc):
+        g.pop('db_read_replica', None)
+
+    return True
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+课程上课时间模型
+Course Schedule Slot Model
+
+Course.schedule 仍保存原始文本（如 “周一1-2节，周三3-4节(1-8周)”），
+赋值时解析为结构化的上课时段（星期, 起止节次, 起止周, 单双周）存入 course_schedules 表。
+时段可单独记录教室（自动排课时同一课程的不同课次可能在不同教室），为空时沿用课程的教室。
+
+选课冲突检测把每个时段按周展开为时间轴上的半开区间 [开始, 结束)，
+学生已选课程的区间按起点排序并记录前缀最大终点，每个区间的冲突查询为两次二分，O(log n)。
+"""
+
+import re
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import event
+
+from . import db
+from .course import Course
+from .enrollment import Enrollment
+
+# 每天最多节次、每学期最多周数
+MAX_PERIOD = 14
+SEMESTER_WEEKS = 20
+
+WEEKDAYS = {'一': 1, '二': 2, '三': 3, '四': 4, '五': 5, '六': 6, '日': 7, '天': 7}
+WEEKDAY_NAMES = {1: '一', 2: '二', 3: '三', 4: '四', 5: '五', 6: '六', 7: '日'}
+
+# 单双周：0-每周，1-单周，2-双周
+WEEK_PARITY = {'单': 1, '双': 2}
+
+SEGMENT_SEPARATOR = re.compile(r'[，,；;\n]+')
+SLOT_PATTERN = re.compile(
+    r'(?:周|星期|礼拜)\s*([一二三四五六日天1-7])\s*第?\s*(\d{1,2})\s*(?:[-~－—至到]\s*(\d{1,2}))?\s*节'
+)
+WEEKS_PATTERN = re.compile(r'第?\s*(\d{1,2})\s*(?:[-~－—至到]\s*(\d{1,2}))?\s*周')
+PARITY_PATTERN = re.compile(r'([单双])周')
+
+
+class CourseSchedule(db.Model):
+    """课程上课时段模型类"""
+    __tablename__ = 'course_schedules'
+
+    # 主键
+    id = db.Column(db.Integer, primary_key=True)
+
+    # 外键关联
+    course_id = db.Column(db.Integer, db.ForeignKey('courses.id'), nullable=False, index=True, comment='课程ID')
+
+    # 时段信息
+    weekday = db.Column(db.Integer, nullable=False, comment='星期：1-7')
+    start_period = db.Column(db.Integer, nullable=False, comment='开始节次')
+    end_period = db.Column(db.Integer, nullable=False, comment='结束节次（含）')
+    start_week = db.Column(db.Integer, nullable=False, default=1, comment='开始周')
+    end_week = db.Column(db.Integer, nullable=False, default=SEMESTER_WEEKS, comment='结束周（含）')
+    week_parity = db.Column(db.Integer, nullable=False, default=0, comment='单双周：0-每周，1-单周，2-双周')
+    classroom = db.Column(db.String(50), comment='上课教室，为空时沿用课程的教室')
+
+    # 时间戳
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, comment='创建时间')
+
+    # 关系定义
+    course = db.relationship('Course', back_populates='schedule_slots')
+
+    def __repr__(self):
+        return f'<CourseSchedule Course:{self.course_id} {self.describe()}>'
+
+    def to_dict(self):
+        """转换为字典格式"""
+        return {
+            'weekday': self.weekday,
+            'start_period': self.start_period,
+            'end_period': self.end_period,
+            'start_week': self.start_week,
+            'end_week': self.end_week,
+            'week_parity': self.week_parity,
+            'classroom': self.room,
+            'text': self.describe()
+        }
+
+    @property
+    def room(self):
+        """本时段实际使用的教室"""
+        return self.classroom or self.course.classroom
+
+    def describe(self):
+        """时段的文字描述，如 “周一1-2节(1-16周单周)”"""
+        parity = {1: '单周', 2: '双周'}.get(self.week_parity, '')
+        return (f'周{WEEKDAY_NAMES[self.weekday]}{self.start_period}-{self.end_period}节'
+                f'({self.start_week}-{self.end_week}周{parity})')
+
+    def intervals(self):
+        """按周展开为时间轴上的半开区间 [开始, 结束)"""
+        for week in range(self.start_week, self.end_week + 1):
+            if self.week_parity and week % 2 != self.week_parity % 2:
+                continue
+            base = ((week - 1) * 7 + self.weekday - 1) * MAX_PERIOD
+            yield base + self.start_period - 1, base + self.end_period
+
+
+def parse_schedule(text):
+    """
+    解析上课时间文本
+
+    以逗号、分号分段，每段包含一个或多个 “周X a-b节”，以及可选的 “m-n周”、“单周/双周”，
+    周次对本段所有时段生效，未写周次时为整个学期。返回时段字段字典列表；文本为空时返回空列表，
+    无法解析时抛出 ValueError。
+    """
+    slots = []
+    for segment in SEGMENT_SEPARATOR.split(text or ''):
+        segment = segment.strip()
+        if not segment:
+            continue
+
+        matches = list(SLOT_PATTERN.finditer(segment))
+        if not matches:
+            raise ValueError(f'无法解析上课时间: {segment}（示例：周一1-2节，周三3-4节(1-8周)）')
+
+        # 周次只在时段以外的文本中查找，避免把 “周一” 之类误认为周次
+        rest = SLOT_PATTERN.sub(' ', segment)
+        weeks = WEEKS_PATTERN.search(rest)
+        start_week, end_week = 1, SEMESTER_WEEKS
+        if weeks:
+            start_week = int(weeks.group(1))
+            end_week = int(weeks.group(2) or start_week)
+        parity = PARITY_PATTERN.search(rest)
+
+        if not 1 <= start_week <= end_week <= SEMESTER_WEEKS:
+            raise ValueError(f'周次必须在1-{SEMESTER_WEEKS}之间: {segment}')
+
+        for match in matches:
+            day = match.group(1)
+            start_period = int(match.group(2))
+            end_period = int(match.group(3) or start_period)
+            if not 1 <= start_period <= end_period <= MAX_PERIOD:
+                raise ValueError(f'节次必须在1-{MAX_PERIOD}之间: {match.group(0)}')
+            slots.append({
+                'weekday': WEEKDAYS.get(day) or int(day),
+                'start_period': start_period,
+                'end_period': end_period,
+                'start_week': start_week,
+                'end_week': end_week,
+                'week_parity': WEEK_PARITY[parity.group(1)] if parity else 0
+            })
+    return slots
+
+
+@event.listens_for(Course.schedule, 'set')
+def _sync_schedule_slots(course, value, oldvalue, initiator):
+    """课程上课时间文本变更时重建结构化时段"""
+    if value == oldvalue:
+        return
+    course.schedule_slots = [CourseSchedule(**slot) for slot in parse_schedule(value)]
+
+
+@event.listens_for(Course.classroom, 'set')
+def _reset_slot_classrooms(course, value, oldvalue, initiator):
+    """课程教室变更时，各时段改为沿用课程的教室"""
+    if value == oldvalue:
+        return
+    for slot in course.schedule_slots:
+        slot.classroom = None
+
+
+class ScheduleIndex:
+    """
+    上课时间区间索引
+
+    区间按起点排序，max_ends[i] 为前 i+1 个区间终点的最大值（单调不减），
+    因此与 [start, end) 重叠的区间可用两次二分找到。
+    """
+
+    def __init__(self, intervals):
+        """intervals 为 (开始, 结束, 所属对象) 的可迭代对象"""
+        self._intervals = sorted(intervals, key=lambda item: (item[0], item[1]))
+        self._starts = [start for start, _, _ in self._intervals]
+        self._max_ends = []
+        max_end = None
+        for _, end, _ in self._intervals:
+            max_end = end if max_end is None else max(max_end, end)
+            self._max_ends.append(max_end)
+
+    def __len__(self):
+        return len(self._intervals)
+
+    def overlap(self, start, end):
+        """返回一个与 [start, end) 重叠的区间的所属对象，没有时返回 None"""
+        # 起点早于 end 的区间为前 candidates 个
+        candidates = bisect_left(self._starts, end)
+        # 第一个前缀最大终点超过 start 的区间本身即与之重叠
+        position = bisect_right(self._max_ends, start, 0, candidates)
+        if position == candidates:
+            return None
+        return self._intervals[position][2]
+
+
+def student_schedule_index(student_id, semester, exclude_course_id=None):
+    """学生本学期在读课程的上课时间索引，一次查询"""
+    query = db.session.query(CourseSchedule, Course).join(
+        Course, CourseSchedule.course_id == Course.id
+    ).join(
+        Enrollment, Enrollment.course_id == Course.id
+    ).filter(
+        Enrollment.student_id == student_id,
+        Enrollment.status == 'enrolled',
+        Course.semester == semester
+    )
+    if exclude_course_id is not None:
+        query = query.filter(Course.id != exclude_course_id)
+
+    return ScheduleIndex(
+        (start, end, course) for slot, course in query for start, end in slot.intervals()
+    )
+
+
+def find_schedule_conflicts(student_id, course):
+    """返回与课程上课时间冲突的学生本学期在读课程列表（按出现顺序去重）"""
+    if not course.schedule_slots:
+        return []
+    index = student_schedule_index(student_id, course.semester, exclude_course_id=course.id)
+
+    conflicts = []
+    for slot in course.schedule_slots:
+        for start, end in slot.intervals():
+            other = index.overlap(start, end)
+            if other is not None and other not in conflicts:
+                conflicts.append(other)
+    return conflicts
+
+
+def backfill_schedule_slots():
+    """为已有上课时间文本但没有结构化时段的课程补建时段，无法解析的跳过并记录日志"""
+    courses = Course.query.filter(
+        Course.schedule.isnot(None),
+        Course.schedule != '',
+        ~Course.schedule_slots.any()
+    ).all()
+
+    created = 0
+    for course in courses:
+        try:
+            slots = parse_schedule(course.schedule)
+        except ValueError as e:
+            current_app.logger.warning(f'课程 {course.code} 上课时间无法解析，跳过: {e}')
+            continue
+        course.schedule_slots = [CourseSchedule(**slot) for slot in slots]
+        created += len(slots)
+    db.session.commit()
+    return created
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQLite性能配置
+SQLite Performance Tuning
+
+在每个新连接上执行PRAGMA：
+- journal_mode=WAL     读写互不阻塞，多线程服务器下并发读写不再锁库
+- synchronous=NORMAL   WAL模式下仅在检查点时fsync，断电最多丢失最近事务、不会损坏
+- busy_timeout         写锁被占用时等待而不是立即报 database is locked
+- cache_size / mmap_size  加大页缓存并使用内存映射读取
+- foreign_keys=ON      启用外键约束（SQLite默认关闭）
+"""
+
+from sqlalchemy import event
+from . import db
+
+DEFAULT_SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,  # 毫秒
+    'cache_size': -64000,  # 负数表示KB，即64MB
+    'mmap_size': 268435456,  # 256MB
+    'temp_store': 'MEMORY',
+    'foreign_keys': 'ON'
+}
+
+
+def apply_pragmas(dbapi_connection, pragmas):
+    """在DBAPI连接上执行PRAGMA"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+    finally:
+        cursor.close()
+
+
+def install_sqlite_pragmas(engine, pragmas=None):
+    """为引擎的每个新连接注册PRAGMA设置，非SQLite引擎直接忽略"""
+    if engine.dialect.name != 'sqlite':
+        return False
+
+    pragmas = dict(DEFAULT_SQLITE_PRAGMAS if pragmas is None else pragmas)
+    if engine.url.database in (None, '', ':memory:'):
+        # 内存数据库不支持WAL和内存映射
+        pragmas.pop('journal_mode', None)
+        pragmas.pop('mmap_size', None)
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        apply_pragmas(dbapi_connection, pragmas)
+
+    return True
+
+
+def init_sqlite_tuning(app):
+    """根据配置为应用的SQLite引擎启用性能PRAGMA"""
+    if not app.config.get('SQLITE_TUNING_ENABLED', True):
+        return False
+
+    pragmas = dict(DEFAULT_SQLITE_PRAGMAS)
+    pragmas.update(app.config.get('SQLITE_PRAGMAS') or {})
+
+    with app.app_context():
+        installed = [install_sqlite_pragmas(engine, pragmas) for engine in db.engines.values()]
+    return any(installed)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SQL语句计时
+Shared Statement Timing
+
+每个引擎只注册一组 before/after_cursor_execute 事件，请求统计（instrumentation.py）和
+慢查询采样（models/query_profiler.py）作为观察者共用同一次计时，语句不会被重复计时。
+
+观察者为 (wants, observe) 两个函数：
+- wants(): 语句执行前调用，返回是否需要本条语句的耗时（如采样决定、是否在统计的请求中）
+- observe(statement, duration_ms): 语句执行成功后调用
+没有观察者需要时不读取时钟。语句执行出错时 handle_error 弹出计时记录，不会残留在连接上。
+"""
+
+import time
+import weakref
+
+from sqlalchemy import event
+
+# 引擎 -> 观察者列表
+_observers = weakref.WeakKeyDictionary()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    observers = [observe for wants, observe in _observers.get(conn.engine, ()) if wants()]
+    if observers:
+        conn.info.setdefault('statement_timing', []).append((context, observers, time.perf_counter()))
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stack = conn.info.get('statement_timing')
+    if not stack or stack[-1][0] is not context:
+        return
+    _, observers, start = stack.pop()
+    duration_ms = (time.perf_counter() - start) * 1000
+    for observe in observers:
+        observe(statement, duration_ms)
+
+
+def _handle_error(exception_context):
+    """语句执行出错时丢弃其计时记录"""
+    conn = exception_context.connection
+    if conn is None:
+        return
+    stack = conn.info.get('statement_timing')
+    if stack and stack[-1][0] is exception_context.execution_context:
+        stack.pop()
+
+
+def add_statement_observer(engine, wants, observe):
+    """在引擎上注册计时观察者，首次注册时安装语句事件（异步引擎传入其 sync_engine）"""
+    observers = _observers.get(engine)
+    if observers is None:
+        observers = _observers[engine] = []
+        event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+        event.listen(engine, 'handle_error', _handle_error)
+    observers.append((wants, observe))
@@ -8,6 +8,7 @@ Student Model
 from datetime import datetime
 from . import db
 from sqlalchemy import func
+from sqlalchemy.orm.attributes import set_committed_value
 
 class Student(db.Model):
     """学生模型类"""
@@ -98,6 +99,7 @@ class Student(db.Model):
     def enrolled_courses(self):
         """获取已选课程"""
         from .course import Course
+        from .enrollment import Enrollment
         return db.session.query(Course).join(Enrollment).filter(
             Enrollment.student_id == self.id,
             Enrollment.status == 'enrolled'
@@ -107,15 +109,94 @@ class Student(db.Model):
     def borrowed_books(self):
         """获取已借图书"""
         from .book import Book
+        from .borrow_record import BorrowRecord
         return db.session.query(Book).join(BorrowRecord).filter(
             BorrowRecord.student_id == self.id,
             BorrowRecord.status == 'borrowed'
         ).all()
     
     @staticmethod
-    def search(keyword, page=1, per_page=10):
-        """搜索学生"""
-        query = Student.query.filter(
+    def enrolled_courses_by_student(student_ids):
+        """批量获取学生的已选课程，一次查询，返回 {学生ID: [课程]}"""
+        from .course import Course
+        from .enrollment import Enrollment
+        rows = db.session.query(Enrollment.student_id, Course).join(
+            Course, Enrollment.course_id == Course.id
+        ).filter(
+            Enrollment.student_id.in_(student_ids),
+            Enrollment.status == 'enrolled'
+        ).options(Course.with_students_count()).order_by(Enrollment.id).all()
+        
+        result = {student_id: [] for student_id in student_ids}
+        for student_id, course in rows:
+            result[student_id].append(course)
+        return result
+    
+    @staticmethod
+    def borrowed_books_by_student(student_ids):
+        """批量获取学生的已借图书，一次查询，返回 {学生ID: [图书]}"""
+        from .book import Book
+        from .borrow_record import BorrowRecord
+        rows = db.session.query(BorrowRecord.student_id, Book).join(
+            Book, BorrowRecord.book_id == Book.id
+        ).filter(
+            BorrowRecord.student_id.in_(student_ids),
+            BorrowRecord.status == 'borrowed'
+        ).options(Book.with_borrowed_copies()).order_by(BorrowRecord.id).all()
+        
+        result = {student_id: [] for student_id in student_ids}
+        for student_id, book in rows:
+            result[student_id].append(book)
+        return result
+    
+    @staticmethod
+    def load_detail(student_id):
+        """
+        组合加载学生详情，固定三条查询，与选课和借阅数量无关
+
+        返回 {'student', 'enrollments', 'borrow_records'}，学生不存在时返回None。
+        enrollments 为在读选课记录（课程已带选课人数），
+        borrow_records 为未归还借阅记录（图书已带借出册数）；
+        enrollment.course / record.book 已直接赋值，访问时不再查询。
+        """
+        from .course import Course
+        from .book import Book
+        from .enrollment import Enrollment
+        from .borrow_record import BorrowRecord
+        student = db.session.get(Student, student_id)
+        if student is None:
+            return None
+        
+        enrollments = []
+        for enrollment, course in db.session.query(Enrollment, Course).join(
+            Course, Enrollment.course_id == Course.id
+        ).filter(
+            Enrollment.student_id == student_id,
+            Enrollment.status == 'enrolled'
+        ).options(Course.with_students_count()).order_by(Enrollment.id).populate_existing():
+            set_committed_value(enrollment, 'course', course)
+            enrollments.append(enrollment)
+        
+        borrow_records = []
+        for record, book in db.session.query(BorrowRecord, Book).join(
+            Book, BorrowRecord.book_id == Book.id
+        ).filter(
+            BorrowRecord.student_id == student_id,
+            BorrowRecord.status == 'borrowed'
+        ).options(Book.with_borrowed_copies()).order_by(BorrowRecord.id).populate_existing():
+            set_committed_value(record, 'book', book)
+            borrow_records.append(record)
+        
+        return {
+            'student': student,
+            'enrollments': enrollments,
+            'borrow_records': borrow_records
+        }
+    
+    @staticmethod
+    def search_query(keyword):
+        """搜索学生的查询（未分页）"""
+        return Student.query.filter(
             db.or_(
                 Student.student_id.contains(keyword),
                 Student.name.contains(keyword),
@@ -123,7 +204,11 @@ class Student(db.Model):
                 Student.grade.contains(keyword)
             )
         )
-        return query.paginate(
+    
+    @staticmethod
+    def search(keyword, page=1, per_page=10):
+        """搜索学生"""
+        return Student.search_query(keyword).paginate(
             page=page, per_page=per_page, error_out=False
         )
 
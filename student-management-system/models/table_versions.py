@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据表版本号
+Table Version Counters
+
+table_versions 表为每张数据表保存 (版本号, 最后写入时间)。会话提交前，把本事务写入过的数据表
+（flush 的对象所在表、变更过的多对多关联表、批量 INSERT/UPDATE/DELETE 的表）的版本号加一，
+与数据写入在同一事务中提交，所有工作进程读到的版本一致。
+
+读取版本是对 table_versions 的一次主键查询，代替对数据表 count/max(updated_at) 的全表扫描。
+直接执行的文本SQL不经过会话事件，不会推进版本号。
+
+进程内缓存（页面缓存、排名、成绩分布、先修课程图）用 on_commit() 注册回调，
+提交成功后按本次写入的数据表在本进程内立即失效；其他工作进程的写入靠比较版本号感知。
+"""
+
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+
+from . import db
+
+table_versions = db.Table(
+    'table_versions',
+    db.Column('table_name', db.String(64), primary_key=True, comment='数据表名'),
+    db.Column('version', db.Integer, nullable=False, default=0, comment='版本号，每次提交写入时加一'),
+    db.Column('updated_at', db.DateTime, comment='最后写入时间')
+)
+
+
+@event.listens_for(table_versions, 'after_create')
+def _seed_versions(target, connection, **kw):
+    """建表时为已定义的全部数据表写入初始版本"""
+    connection.execute(target.insert(), [
+        {'table_name': name, 'version': 0} for name in sorted(db.metadata.tables) if name != target.name
+    ])
+
+
+def read_versions(*tables):
+    """
+    一次查询取回各表的 (版本号, 最后写入时间)
+
+    返回与 tables 顺序一致的列表；从未写入过的表为 (0, None)。
+    """
+    rows = {name: (version, updated_at) for name, version, updated_at in db.session.execute(
+        select(table_versions.c.table_name, table_versions.c.version, table_versions.c.updated_at)
+        .where(table_versions.c.table_name.in_(tables))
+    )}
+    return [rows.get(table, (0, None)) for table in tables]
+
+
+def version_key(*tables):
+    """各表版本号组成的元组，用于判断缓存是否过期"""
+    return tuple(version for version, _ in read_versions(*tables))
+
+
+def _written_tables(obj):
+    """对象所在的数据表，以及其变更过的多对多关联表"""
+    state = inspect(obj)
+    tables = {table.name for table in state.mapper.tables}
+    for relationship in state.mapper.relationships:
+        if relationship.secondary is None:
+            continue
+        if state.deleted or state.attrs[relationship.key].history.has_changes():
+            tables.add(relationship.secondary.name)
+    return tables
+
+
+def _after_flush(db_session, flush_context):
+    """记录本次flush写入过的数据表"""
+    written = db_session.info.setdefault('written_tables', set())
+    for obj in list(db_session.new) + list(db_session.dirty) + list(db_session.deleted):
+        written |= _written_tables(obj)
+
+
+def _do_orm_execute(orm_execute_state):
+    """记录批量INSERT/UPDATE/DELETE语句涉及的数据表"""
+    state = orm_execute_state
+    if (state.is_insert or state.is_update or state.is_delete) and state.bind_mapper:
+        state.session.info.setdefault('written_tables', set()).add(state.bind_mapper.local_table.name)
+
+
+def _before_commit(db_session):
+    """提交前在同一事务中推进写入过的数据表的版本号"""
+    # 先把未flush的修改写出，使其涉及的数据表一并记录
+    db_session.flush()
+    written = db_session.info.pop('written_tables', None)
+    if not written:
+        return
+    db_session.info['committed_tables'] = written
+
+    now = datetime.utcnow()
+    names = sorted(written)
+    result = db_session.execute(
+        update(table_versions).where(table_versions.c.table_name.in_(names))
+        .values(version=table_versions.c.version + 1, updated_at=now)
+    )
+    if result.rowcount < len(names):
+        # 建表之后新增的数据表还没有版本行
+        existing = set(db_session.execute(
+            select(table_versions.c.table_name).where(table_versions.c.table_name.in_(names))
+        ).scalars())
+        db_session.execute(table_versions.insert(), [
+            {'table_name': name, 'version': 1, 'updated_at': now} for name in names if name not in existing
+        ])
+
+
+def _after_commit(db_session):
+    """提交成功后调用依赖已写入数据表的回调"""
+    written = db_session.info.pop('committed_tables', None)
+    if not written:
+        return
+    try:
+        callbacks = current_app.extensions.get('commit_callbacks', ())
+    except RuntimeError:
+        # 不在应用上下文中
+        return
+    for callback, tables in callbacks:
+        if tables is None or not written.isdisjoint(tables):
+            callback(written)
+
+
+def _after_soft_rollback(db_session, previous_transaction):
+    """回滚后丢弃未提交的写入记录"""
+    db_session.info.pop('written_tables', None)
+    db_session.info.pop('committed_tables', None)
+
+
+def on_commit(app, callback, tables=None):
+    """
+    注册提交回调：本进程提交写入过 tables 中任一数据表（None 表示任意表）时调用 callback(写入的表名集合)
+    """
+    _install_listeners()
+    app.extensions.setdefault('commit_callbacks', []).append(
+        (callback, None if tables is None else frozenset(tables))
+    )
+
+
+_listeners_installed = False
+
+
+def _install_listeners():
+    """注册会话事件（只注册一次）"""
+    global _listeners_installed
+
+    if not _listeners_installed:
+        event.listen(Session, 'after_flush', _after_flush)
+        event.listen(Session, 'do_orm_execute', _do_orm_execute)
+        event.listen(Session, 'before_commit', _before_commit)
+        event.listen(Session, 'after_commit', _after_commit)
+        event.listen(Session, 'after_soft_rollback', _after_soft_rollback)
+        _listeners_installed = True
+
+
+def init_table_versions(app):
+    """为应用启用版本号维护"""
+    _install_listeners()
@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+排课：教室与上课时间分配
+Classroom and Timetable Allocation
+
+把一个学期的课程分配到 (时间段, 教室)：
+- 硬约束：教室容量不小于课程人数上限（max_students），同一时间段内教室和教师都不能重复占用，
+  教师不可用时间（与 Course.schedule 同格式的文本）不排课，同一课程的多次课排在不同的天
+- 软约束：优先容量最接近的教室，同一课程尽量用同一间教室，教师每天的课尽量分散
+
+启发式求解：按约束程度（可用教室越少、教师课时越多、人数越多越优先）排序后贪心放置，
+每个时间段的空闲教室按容量有序保存，二分找最小可用教室；放不下时尝试把占用教室的一次课
+挪到别的时间段（一层弹出链）。几千门课程可在数秒内完成，仍无法放置的课程连同原因返回。
+
+不参与本次排课的课程（已结束的课程、无法放置而保留原排课的课程）的现有教室、教师和时间段
+先行预留，求解结果不会与之重叠。
+
+写回时每次课的教室记录在对应的上课时段上（CourseSchedule.classroom），
+冲突检查按时段实际使用的教室分组，同一课程分在几间教室时也能正确检测。
+
+另提供对现有手工排课数据的冲突检查（同一教室或同一教师时间重叠）。
+"""
+
+import math
+import heapq
+from bisect import bisect_left, insort
+
+from sqlalchemy.orm import selectinload
+
+from . import db
+from .course import Course
+from .schedule import CourseSchedule, WEEKDAY_NAMES, parse_schedule
+
+# 默认每周排课天数和每天的大节（起止节次）
+DEFAULT_WEEKDAYS = 5
+DEFAULT_BLOCKS = ((1, 2), (3, 4), (5, 6), (7, 8), (9, 10))
+
+# 每次放置失败时最多尝试挪动的课次数，保证排满时求解时间仍可控
+MAX_EJECTION_ATTEMPTS = 50
+
+
+def sessions_per_week(course):
+    """每周上课次数：每2学分一次，至少一次"""
+    return max(1, math.ceil((course.credits or 0) / 2))
+
+
+def blocked_slots(slots, text):
+    """教师不可用时间文本覆盖到的时间段下标集合（只比较星期和节次）"""
+    blocked = set()
+    for busy in parse_schedule(text):
+        for index, (weekday, start, end) in enumerate(slots):
+            if weekday == busy['weekday'] and start <= busy['end_period'] and busy['start_period'] <= end:
+                blocked.add(index)
+    return blocked
+
+
+class TimetableSolver:
+    """排课求解器"""
+
+    def __init__(self, classrooms, teacher_unavailable=None, weekdays=DEFAULT_WEEKDAYS, blocks=DEFAULT_BLOCKS):
+        """
+        classrooms 为 [{'name', 'capacity'}]；teacher_unavailable 为 {教师: 不可用时间文本}，
+        文本无法解析时抛出 ValueError
+        """
+        self.rooms = sorted(((room['capacity'], room['name']) for room in classrooms))
+        self.capacities = [capacity for capacity, _ in self.rooms]
+        self.slots = [(weekday, start, end) for weekday in range(1, weekdays + 1) for start, end in blocks]
+        self.teacher_blocked = {
+            teacher: blocked_slots(self.slots, text) for teacher, text in (teacher_unavailable or {}).items()
+        }
+
+    def solve(self, courses, reserved=()):
+        """
+        为课程分配时间段和教室
+
+        courses 为 [{'id', 'code', 'name', 'teacher', 'size', 'sessions'}]；reserved 为已占用的上课时段
+        [{'teacher', 'classroom', 'weekday', 'start_period', 'end_period'}]，与之节次重叠的时间段中
+        该教室和该教师都不再使用。返回
+        {'assignments': {课程ID: [(时间段下标, 教室下标)]}, 'unassigned': [{'id', 'code', 'name', 'reason'}]}，
+        只有全部课次都放下的课程出现在 assignments 中。
+        """
+        # 每个时间段的空闲教室 (容量, 教室下标)，保持有序
+        self._free = [[(capacity, index) for index, capacity in enumerate(self.capacities)] for _ in self.slots]
+        self._occupant = {}          # (时间段, 教室) -> 课程
+        self._placed = {}            # 课程ID -> {时间段: 教室}
+        self._teacher_busy = {}      # 教师 -> 已占用时间段集合
+        self._teacher_day_load = {}  # (教师, 星期) -> 课次数
+        self._reserve(reserved)
+
+        teacher_demand = {}
+        for course in courses:
+            teacher_demand[course['teacher']] = teacher_demand.get(course['teacher'], 0) + course['sessions']
+
+        order = sorted(courses, key=lambda course: (
+            len(self.capacities) - bisect_left(self.capacities, course['size']),
+            -teacher_demand[course['teacher']],
+            -course['size'],
+            course['code']
+        ))
+
+        unassigned = []
+        for course in order:
+            self._placed[course['id']] = {}
+            reason = None
+            for _ in range(course['sessions']):
+                if not self._place(course) and not self._place_by_ejection(course):
+                    reason = self._diagnose(course)
+                    break
+            if reason:
+                for slot in list(self._placed[course['id']]):
+                    self._remove(course, slot)
+                del self._placed[course['id']]
+                unassigned.append({'id': course['id'], 'code': course['code'], 'name': course['name'],
+                                   'reason': reason})
+
+        assignments = {course_id: sorted(placed.items()) for course_id, placed in self._placed.items()}
+        return {'assignments': assignments, 'unassigned': unassigned}
+
+    def _reserve(self, reserved):
+        """预留已占用的教室和教师时间；预留的课次不可挪动"""
+        room_index = {name: index for index, (_, name) in enumerate(self.rooms)}
+        fixed = {'id': None, 'size': math.inf}
+        for busy in reserved:
+            room = room_index.get(busy['classroom'])
+            for slot, (weekday, start, end) in enumerate(self.slots):
+                if weekday != busy['weekday'] or start > busy['end_period'] or busy['start_period'] > end:
+                    continue
+                self._teacher_busy.setdefault(busy['teacher'], set()).add(slot)
+                if room is not None and (slot, room) not in self._occupant:
+                    free = self._free[slot]
+                    free.pop(bisect_left(free, (self.capacities[room], room)))
+                    self._occupant[(slot, room)] = fixed
+
+    def _available_slots(self, course, exclude=()):
+        """教师空闲且可用、且本课程当天还没有课的时间段"""
+        blocked = self.teacher_blocked.get(course['teacher'], ())
+        busy = self._teacher_busy.get(course['teacher'], ())
+        days = {self.slots[slot][0] for slot in self._placed[course['id']]}
+        return [slot for slot, (weekday, _, _) in enumerate(self.slots)
+                if slot not in blocked and slot not in busy and weekday not in days and slot not in exclude]
+
+    def _smallest_room(self, slot, size, preferred=None):
+        """时间段内容量不小于 size 的空闲教室（优先 preferred，其次容量最小），没有时返回 None"""
+        free = self._free[slot]
+        if preferred is not None:
+            position = bisect_left(free, (self.capacities[preferred], preferred))
+            if position < len(free) and free[position][1] == preferred:
+                return free[position]
+        position = bisect_left(free, (size, -1))
+        return free[position] if position < len(free) else None
+
+    def _best_choice(self, course, exclude=()):
+        """按 (换教室, 容量浪费, 教师当天课次, 时间段) 选最优的空闲 (时间段, 教室)"""
+        placed = self._placed[course['id']]
+        preferred = next(iter(placed.values()), None)
+        best = None
+        for slot in self._available_slots(course, exclude):
+            room = self._smallest_room(slot, course['size'], preferred)
+            if room is None:
+                continue
+            capacity, index = room
+            score = (
+                preferred is not None and index != preferred,
+                capacity - course['size'],
+                self._teacher_day_load.get((course['teacher'], self.slots[slot][0]), 0),
+                slot
+            )
+            if best is None or score < best[0]:
+                best = (score, slot, index)
+        return best
+
+    def _assign(self, course, slot, room):
+        free = self._free[slot]
+        free.pop(bisect_left(free, (self.capacities[room], room)))
+        self._occupant[(slot, room)] = course
+        self._placed[course['id']][slot] = room
+        self._teacher_busy.setdefault(course['teacher'], set()).add(slot)
+        key = (course['teacher'], self.slots[slot][0])
+        self._teacher_day_load[key] = self._teacher_day_load.get(key, 0) + 1
+
+    def _remove(self, course, slot):
+        room = self._placed[course['id']].pop(slot)
+        insort(self._free[slot], (self.capacities[room], room))
+        del self._occupant[(slot, room)]
+        self._teacher_busy[course['teacher']].discard(slot)
+        self._teacher_day_load[(course['teacher'], self.slots[slot][0])] -= 1
+
+    def _place(self, course):
+        """贪心放置一次课"""
+        best = self._best_choice(course)
+        if best is None:
+            return False
+        self._assign(course, best[1], best[2])
+        return True
+
+    def _place_by_ejection(self, course):
+        """把占用合适教室的另一门课的一次课挪到别的时间段，腾出位置后放置"""
+        # 被挪走的课次只能去有足够大空闲教室的时间段；全部排满时直接放弃
+        largest_free = max((free[-1][0] for free in self._free if free), default=None)
+        if largest_free is None:
+            return False
+
+        attempts = 0
+        for slot in self._available_slots(course):
+            for room in range(bisect_left(self.capacities, course['size']), len(self.capacities)):
+                other = self._occupant.get((slot, room))
+                if other is None or other['size'] > largest_free:
+                    continue
+                attempts += 1
+                if attempts > MAX_EJECTION_ATTEMPTS:
+                    return False
+                # 挪走的课次不能回到本时间段
+                self._remove(other, slot)
+                moved = self._best_choice(other, exclude=(slot,))
+                if moved is not None:
+                    self._assign(other, moved[1], moved[2])
+                    self._assign(course, slot, room)
+                    return True
+                self._assign(other, slot, room)
+        return False
+
+    def _diagnose(self, course):
+        """无法放置的原因"""
+        if not self.capacities or self.capacities[-1] < course['size']:
+            return f'没有容量不少于 {course["size"]} 人的教室'
+        blocked = self.teacher_blocked.get(course['teacher'], ())
+        days = {weekday for slot, (weekday, _, _) in enumerate(self.slots) if slot not in blocked}
+        if len(days) < course['sessions']:
+            return f'教师 {course["teacher"]} 每周可上课的天数少于 {course["sessions"]} 天'
+        if not self._available_slots(course):
+            return f'教师 {course["teacher"]} 的可用时间段已排满'
+        return '可用时间段内容量足够的教室均已占用'
+
+    def describe(self, placement):
+        """把 [(时间段, 教室)] 转换为 (教室文本, 上课时间文本)"""
+        rooms = []
+        for _, room in placement:
+            name = self.rooms[room][1]
+            if name not in rooms:
+                rooms.append(name)
+        schedule = '，'.join(
+            f'周{WEEKDAY_NAMES[self.slots[slot][0]]}{self.slots[slot][1]}-{self.slots[slot][2]}节'
+            for slot, _ in placement
+        )
+        return '、'.join(rooms), schedule
+
+    def slot_rooms(self, placement):
+        """把 [(时间段, 教室)] 转换为 {(星期, 开始节次, 结束节次): 教室名称}"""
+        return {self.slots[slot]: self.rooms[room][1] for slot, room in placement}
+
+
+def semester_courses(semester):
+    """学期内未结束的课程（预加载上课时段，便于写回时重建）"""
+    return Course.query.options(selectinload(Course.schedule_slots)).filter(
+        Course.semester == semester,
+        Course.status != 'finished'
+    ).order_by(Course.code).all()
+
+
+def existing_placement(courses):
+    """课程现有的上课时段及其教室、教师，用作求解时的预留"""
+    return [{
+        'teacher': course.teacher,
+        'classroom': slot.classroom or course.classroom,
+        'weekday': slot.weekday,
+        'start_period': slot.start_period,
+        'end_period': slot.end_period
+    } for course in courses for slot in course.schedule_slots]
+
+
+def solve_semester(semester, classrooms, teacher_unavailable=None, weekdays=DEFAULT_WEEKDAYS,
+                   blocks=DEFAULT_BLOCKS, apply=False):
+    """
+    为学期内课程排课
+
+    已结束课程的现有排课先行预留。无法放置的课程保留原有教室和上课时间：若它已有排课，
+    预留其排课后对其余课程重新求解，直到没有新的此类课程，写回的方案不会与保留的排课冲突。
+    apply=True 时把全部课次都已放置的课程的教室和上课时间写回（一次提交），
+    每次课的教室写入对应的上课时段。
+    返回 {'assignments': [...], 'unassigned': [...], 'applied': 写回的课程数}。
+    """
+    solver = TimetableSolver(classrooms, teacher_unavailable, weekdays, blocks)
+    courses = semester_courses(semester)
+    finished = Course.query.options(selectinload(Course.schedule_slots)).filter(
+        Course.semester == semester,
+        Course.status == 'finished',
+        Course.schedule_slots.any()
+    ).all()
+    reserved = existing_placement(finished)
+
+    pending = courses
+    kept = []
+    while True:
+        result = solver.solve([{
+            'id': course.id,
+            'code': course.code,
+            'name': course.name,
+            'teacher': course.teacher,
+            'size': course.max_students or 0,
+            'sessions': sessions_per_week(course)
+        } for course in pending], reserved)
+        unassigned_ids = {item['id'] for item in result['unassigned']}
+        stuck = [course for course in pending if course.id in unassigned_ids and course.schedule_slots]
+        if not stuck:
+            break
+        # 保留原排课的课程先预留，其余课程重新求解
+        stuck_ids = {course.id for course in stuck}
+        kept.extend(dict(item, reason=f'{item["reason"]}，保留原有教室和上课时间')
+                    for item in result['unassigned'] if item['id'] in stuck_ids)
+        reserved = reserved + existing_placement(stuck)
+        pending = [course for course in pending if course.id not in stuck_ids]
+
+    assignments = []
+    for course in pending:
+        placement = result['assignments'].get(course.id)
+        if placement is None:
+            continue
+        classroom, schedule = solver.describe(placement)
+        assignments.append({
+            'id': course.id,
+            'code': course.code,
+            'name': course.name,
+            'teacher': course.teacher,
+            'max_students': course.max_students,
+            'classroom': classroom,
+            'schedule': schedule
+        })
+        if apply:
+            course.classroom = classroom
+            course.schedule = schedule
+            rooms = solver.slot_rooms(placement)
+            for slot in course.schedule_slots:
+                slot.classroom = rooms[(slot.weekday, slot.start_period, slot.end_period)]
+    if apply:
+        db.session.commit()
+
+    return {
+        'assignments': assignments,
+        'unassigned': sorted(kept + result['unassigned'], key=lambda item: item['code']),
+        'applied': len(assignments) if apply else 0
+    }
+
+
+def _overlapping_pairs(intervals):
+    """扫描线找出相互重叠的区间对，intervals 为 [(开始, 结束, 课程ID)]，返回 {(课程ID, 课程ID)}"""
+    pairs = set()
+    active = []
+    for start, end, course_id in sorted(intervals):
+        while active and active[0][0] <= start:
+            heapq.heappop(active)
+        for _, other in active:
+            if other != course_id:
+                pairs.add((min(course_id, other), max(course_id, other)))
+        heapq.heappush(active, (end, course_id))
+    return pairs
+
+
+def find_timetable_conflicts(semester=None):
+    """
+    现有排课中的冲突：同一教室或同一教师在同一时间有两门课
+
+    一次查询取回全部上课时段，按时段实际使用的教室、教师分组后扫描线检测。
+    返回 {'classrooms': [{'classroom', 'courses'}], 'teachers': [{'teacher', 'courses'}]}。
+    """
+    query = db.session.query(CourseSchedule, Course).join(Course, CourseSchedule.course_id == Course.id)
+    if semester:
+        query = query.filter(Course.semester == semester)
+
+    courses = {}
+    by_room = {}
+    by_teacher = {}
+    for slot, course in query:
+        courses[course.id] = course
+        intervals = list(slot.intervals())
+        room = slot.classroom or course.classroom
+        if room:
+            by_room.setdefault((course.semester, room), []).extend(
+                (start, end, course.id) for start, end in intervals)
+        by_teacher.setdefault((course.semester, course.teacher), []).extend(
+            (start, end, course.id) for start, end in intervals)
+
+    def report(groups, label):
+        result = []
+        for (course_semester, name), intervals in sorted(groups.items()):
+            for first, second in sorted(_overlapping_pairs(intervals)):
+                result.append({
+                    'semester': course_semester,
+                    label: name,
+                    'courses': [{'id': courses[course_id].id, 'code': courses[course_id].code,
+                                 'schedule': courses[course_id].schedule} for course_id in (first, second)]
+                })
+        return result
+
+    return {'classrooms': report(by_room, 'classroom'), 'teachers': report(by_teacher, 'teacher')}
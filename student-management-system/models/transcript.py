@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+成绩单与学分绩点
+Transcript and Credit-Weighted GPA
+
+GPA = Σ(绩点 × 学分) / Σ学分，只统计已完成（status='completed'）且有绩点的选课。
+加权求和在数据库中按分组一次聚合完成，不把选课记录逐条取回Python。
+"""
+
+from sqlalchemy import case, func
+
+from . import db
+from .student import Student
+from .course import Course
+from .enrollment import Enrollment
+
+
+def gpa_query(*group_by):
+    """按 group_by 分组的学分绩点聚合查询（未执行）"""
+    quality_points = func.sum(Enrollment.gpa_points * Course.credits)
+    credits = func.sum(Course.credits)
+    return db.session.query(
+        *group_by,
+        quality_points.label('quality_points'),
+        credits.label('credits'),
+        func.sum(case((Enrollment.gpa_points > 0, Course.credits), else_=0)).label('earned_credits'),
+        func.count(Enrollment.id).label('courses'),
+        # 学分合计为0时GPA为NULL，而不是除零错误
+        (quality_points / func.nullif(credits, 0)).label('gpa')
+    ).select_from(Enrollment).join(
+        Course, Enrollment.course_id == Course.id
+    ).filter(
+        Enrollment.status == 'completed',
+        Enrollment.gpa_points.isnot(None)
+    ).group_by(*group_by)
+
+
+def gpa_summary(row):
+    """聚合行转换为字典"""
+    return {
+        'gpa': round(row.gpa, 2) if row.gpa is not None else None,
+        'credits': row.credits or 0,
+        'earned_credits': row.earned_credits or 0,
+        'courses': row.courses
+    }
+
+
+def student_gpa(student_id):
+    """
+    学生各学期及总GPA，一次聚合查询
+
+    返回 {'overall': {...}, 'semesters': [{'semester', 'gpa', ...}]}；
+    总GPA由各学期的加权和相加得到，与直接对全部课程聚合结果一致。
+    """
+    rows = gpa_query(Course.semester).filter(
+        Enrollment.student_id == student_id
+    ).order_by(Course.semester).all()
+
+    quality_points = sum(row.quality_points or 0 for row in rows)
+    credits = sum(row.credits or 0 for row in rows)
+    return {
+        'overall': {
+            'gpa': round(quality_points / credits, 2) if credits else None,
+            'credits': credits,
+            'earned_credits': sum(row.earned_credits or 0 for row in rows),
+            'courses': sum(row.courses for row in rows)
+        },
+        'semesters': [dict(semester=row.semester, **gpa_summary(row)) for row in rows]
+    }
+
+
+def transcript_courses(student_id):
+    """学生已完成课程列表（按学期、课程代码排序）"""
+    rows = db.session.query(
+        Course.semester, Course.code, Course.name, Course.credits,
+        Enrollment.grade, Enrollment.grade_letter, Enrollment.gpa_points
+    ).select_from(Enrollment).join(
+        Course, Enrollment.course_id == Course.id
+    ).filter(
+        Enrollment.student_id == student_id,
+        Enrollment.status == 'completed'
+    ).order_by(Course.semester, Course.code).all()
+    return [row._asdict() for row in rows]
+
+
+def cohort_gpa_query(major=None, grade=None, by_semester=False):
+    """某专业/年级学生按学生（及学期）分组的GPA聚合查询（未执行、未排序）"""
+    group_by = [Student.id, Student.student_id, Student.name, Student.major, Student.grade]
+    if by_semester:
+        group_by.append(Course.semester)
+
+    query = gpa_query(*group_by).join(Student, Enrollment.student_id == Student.id)
+    if major:
+        query = query.filter(Student.major == major)
+    if grade:
+        query = query.filter(Student.grade == grade)
+    return query
+
+
+def cohort_gpas(major=None, grade=None, by_semester=False):
+    """
+    批量计算某专业/年级全部学生的GPA，一次聚合查询
+
+    返回按学号排序的列表；by_semester=True 时每个学生附带各学期GPA。
+    没有已完成课程的学生不在结果中。
+    """
+    rows = cohort_gpa_query(major, grade, by_semester).order_by(
+        Student.student_id, *([Course.semester] if by_semester else [])
+    ).all()
+
+    if not by_semester:
+        return [dict(
+            id=row.id, student_id=row.student_id, name=row.name, major=row.major, grade=row.grade,
+            **gpa_summary(row)
+        ) for row in rows]
+
+    # 各学期行按学生合并，总GPA由加权和相加得到
+    students = {}
+    for row in rows:
+        item = students.get(row.id)
+        if item is None:
+            item = students[row.id] = {
+                'id': row.id, 'student_id': row.student_id, 'name': row.name,
+                'major': row.major, 'grade': row.grade,
+                'quality_points': 0, 'credits': 0, 'earned_credits': 0, 'courses': 0,
+                'semesters': []
+            }
+        item['quality_points'] += row.quality_points or 0
+        item['credits'] += row.credits or 0
+        item['earned_credits'] += row.earned_credits or 0
+        item['courses'] += row.courses
+        item['semesters'].append(dict(semester=row.semester, **gpa_summary(row)))
+
+    result = []
+    for item in students.values():
+        quality_points = item.pop('quality_points')
+        item['gpa'] = round(quality_points / item['credits'], 2) if item['credits'] else None
+        result.append(item)
+    return result
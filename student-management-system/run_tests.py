@@ -39,10 +39,26 @@ def run_integration_tests():
 def run_performance_tests():
     """运行性能测试"""
     print("⚡ 运行性能测试...")
-    # 这里可以添加性能测试的具体实现
-    # 例如使用 locust 或 pytest-benchmark
-    print("性能测试功能待实现")
-    return True
+
+    # 创建报告目录
+    report_dir = 'test_reports'
+    if not os.path.exists(report_dir):
+        os.makedirs(report_dir)
+
+    # 在1k规模的合成数据上运行基准，数据库文件复用
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    report_file = f'{report_dir}/benchmark_{timestamp}.json'
+    result = subprocess.run([
+        sys.executable, '-m', 'benchmarks.run_benchmarks',
+        '--scale', '1k',
+        '--database', f'{report_dir}/benchmark_1k.db',
+        '--output', report_file
+    ])
+
+    if result.returncode == 0:
+        print(f"✅ 基准结果已生成: {report_file}")
+
+    return result.returncode == 0
 
 def generate_test_report():
     """生成测试报告"""
@@ -76,7 +76,8 @@ def start_application(port=None, debug=False):
             host='0.0.0.0',
             port=port,
             debug=debug,
-            use_reloader=False
+            use_reloader=False,
+            threaded=True
         )
         
         return True
@@ -85,11 +86,49 @@ def start_application(port=None, debug=False):
         print(f"❌ 应用启动失败: {e}")
         return False
 
+def start_production(port=None, workers=None, threads=None, max_requests=None):
+    """以多进程WSGI服务器启动（生产模式）"""
+    import importlib.util
+    
+    if port is None:
+        port = get_available_port()
+    
+    # 通过环境变量把参数传给 gunicorn.conf.py
+    os.environ['WEB_BIND'] = f'0.0.0.0:{port}'
+    if workers:
+        os.environ['WEB_WORKERS'] = str(workers)
+    if threads:
+        os.environ['WEB_THREADS'] = str(threads)
+    if max_requests is not None:
+        os.environ['WEB_MAX_REQUESTS'] = str(max_requests)
+    os.environ.setdefault('FLASK_CONFIG', 'production')
+    
+    if importlib.util.find_spec('gunicorn') is None:
+        # gunicorn 不支持Windows，退回到多线程开发服务器
+        print("⚠️ 未安装gunicorn（或当前平台不支持），使用多线程服务器启动")
+        return start_application(port=port, debug=False)
+    
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    print(f"🚀 以生产模式启动: http://localhost:{port}")
+    print(f"🔁 平滑重载: kill -HUP <主进程PID>")
+    
+    # 替换当前进程，使gunicorn主进程直接接收信号
+    os.chdir(base_dir)
+    os.execvp(sys.executable, [
+        sys.executable, '-m', 'gunicorn',
+        '-c', os.path.join(base_dir, 'gunicorn.conf.py'),
+        'wsgi:app'
+    ])
+
 def main():
     """主函数"""
     parser = argparse.ArgumentParser(description='学生管理系统启动脚本')
     parser.add_argument('--port', type=int, help='指定服务器端口')
     parser.add_argument('--debug', action='store_true', help='启用调试模式')
+    parser.add_argument('--production', action='store_true', help='使用多进程WSGI服务器启动')
+    parser.add_argument('--workers', type=int, help='工作进程数（生产模式）')
+    parser.add_argument('--threads', type=int, help='每个进程的线程数（生产模式）')
+    parser.add_argument('--max-requests', type=int, help='工作进程处理N个请求后回收（生产模式）')
     
     args = parser.parse_args()
     
@@ -100,6 +139,13 @@ def main():
     print(f"🐍 Python版本: {sys.version.split()[0]}")
     
     # 启动应用
+    if args.production and not args.debug:
+        return start_production(
+            port=args.port,
+            workers=args.workers,
+            threads=args.threads,
+            max_requests=args.max_requests
+        )
     return start_application(port=args.port, debug=args.debug)
 
 if __name__ == '__main__':
@@ -8,8 +8,10 @@ Pytest Configuration
 import pytest
 import tempfile
 import os
+from contextlib import contextmanager
+from sqlalchemy import event
 from app import create_app
-from models import db
+from models import db, Student, Course, Enrollment
 from config import TestingConfig
 
 @pytest.fixture
@@ -27,7 +29,10 @@ def app():
     with app.app_context():
         db.create_all()
         yield app
+        db.session.remove()
         db.drop_all()
+        # 关闭连接，使SQLite WAL文件随之清理
+        db.engine.dispose()
     
     # 清理临时文件
     os.close(db_fd)
@@ -43,6 +48,58 @@ def runner(app):
     """创建测试运行器"""
     return app.test_cli_runner()
 
+@pytest.fixture
+def count_queries(app):
+    """
+    统计执行的SQL语句
+    
+    用法:
+        with count_queries() as statements:
+            client.get('/api/students')
+        assert len(statements) <= 3
+    """
+    engine = db.engine
+    
+    @contextmanager
+    def capture():
+        statements = []
+        
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(engine, 'after_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(engine, 'after_cursor_execute', record)
+    
+    return capture
+
+@pytest.fixture
+def graded_cohort(app):
+    """
+    成绩统计用的同一专业年级学生及期末成绩（各课程3学分）
+
+    课程1（GC01，2024春）: 学生1-4 分别 95、85、72、55；课程2（GC02，2024秋）: 学生1 100、学生2 60；
+    学生5 已选课程1但没有成绩。学号为 G0001-G0005。
+    """
+    students = [Student(student_id=f'G{i:04d}', name=f'学生{i}', id_card=f'{110101200001020000 + i}',
+                        gender='男', age=20, major='计算机科学与技术', grade='2023')
+                for i in range(1, 6)]
+    courses = [Course(code='GC01', name='课程1', credits=3, teacher='教师', semester='2024春'),
+               Course(code='GC02', name='课程2', credits=3, teacher='教师', semester='2024秋')]
+    db.session.add_all(students + courses)
+    db.session.flush()
+    
+    grades = [(1, 0, 95), (2, 0, 85), (3, 0, 72), (4, 0, 55), (5, 0, None), (1, 1, 100), (2, 1, 60)]
+    for student_number, course_index, grade in grades:
+        enrollment = Enrollment(student_id=students[student_number - 1].id, course_id=courses[course_index].id)
+        db.session.add(enrollment)
+        if grade is not None:
+            enrollment.complete_course(grade=grade)
+    db.session.commit()
+    return {'students': [student.id for student in students], 'courses': [course.id for course in courses]}
+
 @pytest.fixture
 def sample_student():
     """创建示例学生数据"""
@@ -187,3 +187,1365 @@ class TestDashboardAPI:
         data = json.loads(response.data)
         assert data['success'] is True
         assert 'overview' in data['data']
+
+class TestConditionalGet:
+    """条件GET测试"""
+    
+    def test_list_returns_etag_and_304(self, client, app, sample_student):
+        """测试列表接口返回ETag并对If-None-Match响应304"""
+        with app.app_context():
+            Student.create(**sample_student)
+        
+        response = client.get('/api/students')
+        assert response.status_code == 200
+        etag = response.headers.get('ETag')
+        assert etag is not None
+        assert response.headers.get('Last-Modified') is not None
+        
+        response = client.get('/api/students', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert response.data == b''
+    
+    def test_etag_changes_after_update(self, client, app, sample_book):
+        """测试数据变化后ETag随之变化"""
+        with app.app_context():
+            book = Book.create(**sample_book)
+            book_id = book.id
+        
+        etag = client.get('/api/books').headers['ETag']
+        
+        client.put(f'/api/books/{book_id}',
+                   data=json.dumps({'title': '新书名'}),
+                   content_type='application/json')
+        
+        response = client.get('/api/books', headers={'If-None-Match': etag})
+        assert response.status_code == 200
+        assert response.headers['ETag'] != etag
+        assert json.loads(response.data)['data']['books'][0]['title'] == '新书名'
+    
+    def test_etag_depends_on_query_args(self, client, app, sample_course):
+        """测试不同查询参数生成不同ETag"""
+        with app.app_context():
+            Course.create(**sample_course)
+        
+        first = client.get('/api/courses?page=1').headers['ETag']
+        second = client.get('/api/courses?page=2').headers['ETag']
+        assert first != second
+
+    def test_304_reads_only_version_table(self, client, app, count_queries, sample_student):
+        """测试304只需一次 table_versions 主键查询，不扫描数据表"""
+        with app.app_context():
+            Student.create(**sample_student)
+        etag = client.get('/api/students/1').headers['ETag']
+        
+        with count_queries() as statements:
+            response = client.get('/api/students/1', headers={'If-None-Match': etag})
+        assert response.status_code == 304
+        assert len(statements) == 1 and 'FROM table_versions' in statements[0], '\n'.join(statements)
+    
+    def test_etag_changes_after_delete(self, client, app, sample_book):
+        """测试删除行后ETag随之变化"""
+        with app.app_context():
+            book_id = Book.create(**sample_book).id
+        etag = client.get('/api/books').headers['ETag']
+        
+        assert client.delete(f'/api/books/{book_id}').status_code == 200
+        assert client.get('/api/books', headers={'If-None-Match': etag}).status_code == 200
+    
+    def test_etag_follows_response_shape(self, client, app, sample_student, sample_book):
+        """测试普通列表的ETag不受未展开的关联表影响，ids 批量获取时才随之变化"""
+        with app.app_context():
+            student = Student.create(**sample_student)
+            book = Book.create(**sample_book)
+            student_id, book_id = student.id, book.id
+
+        list_etag = client.get('/api/students').headers['ETag']
+        batch_etag = client.get(f'/api/students?ids={student_id}').headers['ETag']
+        book_etag = client.get('/api/books').headers['ETag']
+
+        response = client.post('/api/borrows',
+                               data=json.dumps({'student_id': student_id, 'book_id': book_id}),
+                               content_type='application/json')
+        assert response.status_code == 201
+
+        response = client.get('/api/students', headers={'If-None-Match': list_etag})
+        assert response.status_code == 304
+
+        response = client.get(f'/api/students?ids={student_id}', headers={'If-None-Match': batch_etag})
+        assert response.status_code == 200
+        assert len(json.loads(response.data)['data']['students'][0]['borrowed_books']) == 1
+
+        # 图书列表包含已借册数，借书后随之变化
+        response = client.get('/api/books', headers={'If-None-Match': book_etag})
+        assert response.status_code == 200
+
+class TestSystemAPI:
+    """系统状态API测试"""
+    
+    def test_pool_stats(self, client):
+        """测试获取连接池状态"""
+        client.get('/api/students')
+        response = client.get('/api/system/pool')
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        pool = data['data']['pool']
+        assert pool['pool_class'] == 'QueuePool'
+        assert pool['config']['pool_size'] == 5
+        assert pool['events']['checkouts'] >= 1
+    
+    def test_gunicorn_pool_size_reaches_workers(self):
+        """测试 gunicorn.conf.py 按线程数设置的连接池参数在工作进程创建引擎时生效"""
+        import os
+        import subprocess
+        import sys
+        
+        # 与gunicorn相同：先执行配置文件（其中导入了config），再在工作进程中创建应用
+        script = (
+            "import json, runpy\n"
+            "runpy.run_path('gunicorn.conf.py')\n"
+            "from config import ProductionConfig, engine_options\n"
+            "settings = {k: getattr(ProductionConfig, k) for k in dir(ProductionConfig) if k.isupper()}\n"
+            "settings['SQLALCHEMY_DATABASE_URI'] = 'sqlite:////tmp/pool-test.db'\n"
+            "print(json.dumps(engine_options(settings)))\n"
+        )
+        env = {key: value for key, value in os.environ.items() if not key.startswith(('DB_', 'WEB_'))}
+        env.update(WEB_WORKERS='4', WEB_THREADS='8')
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, '-c', script], cwd=root, env=env,
+                                capture_output=True, text=True, check=True).stdout
+        
+        options = json.loads(output.strip().splitlines()[-1])
+        assert (options['pool_size'], options['max_overflow']) == (8, 2)
+    
+    def test_pool_settings_from_environment(self, monkeypatch):
+        """测试连接池参数（含探活开关）可用同名环境变量覆盖"""
+        from config import Config, ProductionConfig, engine_options
+        settings = {key: getattr(Config, key) for key in dir(Config) if key.startswith('DB_POOL')}
+        settings.update(DB_MAX_OVERFLOW=10, SQLALCHEMY_DATABASE_URI='sqlite:////tmp/pool-test.db')
+        
+        monkeypatch.setenv('DB_POOL_PRE_PING', 'true')
+        monkeypatch.setenv('DB_POOL_TIMEOUT', '7')
+        options = engine_options(settings)
+        assert options['pool_pre_ping'] is True and options['pool_timeout'] == 7
+        
+        monkeypatch.setenv('DB_POOL_PRE_PING', '0')
+        settings['DB_POOL_PRE_PING'] = ProductionConfig.DB_POOL_PRE_PING
+        assert engine_options(settings)['pool_pre_ping'] is False
+    
+    def test_health(self, client):
+        """测试数据库健康检查"""
+        response = client.get('/api/system/health')
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert data['data']['database'] == 'ok'
+    
+    def test_slow_query_records(self, client, app):
+        """测试慢查询采样记录"""
+        profiler = app.extensions['query_profiler']
+        profiler.slow_threshold_ms = 0  # 所有语句都视为慢查询
+        
+        client.get('/api/students')
+        response = client.get('/api/system/slow-queries')
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        queries = data['data']['queries']
+        assert len(queries) > 0
+        assert any('students' in q['sql'] for q in queries)
+        assert any(q['call_site'] and q['call_site'].startswith('api/') for q in queries)
+        
+        response = client.delete('/api/system/slow-queries')
+        assert response.status_code == 200
+        assert profiler.records() == []
+
+    def test_unsampled_queries_not_timed(self, client, app):
+        """测试未命中采样的语句不计时、不记录，请求统计仍计数"""
+        profiler = app.extensions['query_profiler']
+        profiler.slow_threshold_ms = 0
+        profiler.sample_rate = 0
+        profiler.clear()
+
+        response = client.get('/api/students')
+        assert 'desc="' in response.headers['Server-Timing']
+        assert profiler.total_queries > 0
+        assert profiler.sampled_queries == profiler.slow_queries == 0
+        assert profiler.records() == []
+
+    def test_failed_statement_timing_discarded(self, app):
+        """测试语句执行出错时计时记录被弹出，不残留在连接上"""
+        from sqlalchemy.exc import OperationalError
+        with app.app_context():
+            with db.engine.connect() as conn:
+                with pytest.raises(OperationalError):
+                    conn.execute(db.text('SELECT * FROM no_such_table'))
+                assert conn.info.get('statement_timing') == []
+                conn.execute(db.text('SELECT 1'))
+                assert conn.info['statement_timing'] == []
+        assert app.extensions['query_profiler'].slow_queries == 0
+
+    def test_server_timing_and_request_stats(self, client, app, sample_student):
+        """测试Server-Timing响应头和端点统计"""
+        with app.app_context():
+            Student.create(**sample_student)
+        
+        response = client.get('/api/students')
+        timing = response.headers['Server-Timing']
+        assert timing.startswith('db;dur=')
+        assert 'queries' in timing
+        
+        response = client.get('/api/system/requests')
+        data = json.loads(response.data)
+        endpoints = {e['resource']: e for e in data['data']['endpoints']}
+        assert endpoints['StudentListAPI']['requests'] == 1
+        assert endpoints['StudentListAPI']['queries']['count'] == 1
+    
+    def test_n_plus_one_warning(self, client, app, sample_course, caplog):
+        """测试语句数超过阈值时记录N+1警告"""
+        app.extensions['request_stats'].n_plus_one_threshold = 1
+        with app.app_context():
+            Course.create(**sample_course)
+        
+        client.get('/api/courses')
+        assert '疑似N+1查询' in caplog.text
+
+def seed_rows(n, start=0):
+    """生成 n 个学生、课程、图书，每个学生选一门课、借一本书"""
+    from models import Enrollment, BorrowRecord
+    from datetime import datetime, timedelta
+    
+    numbers = range(start, start + n)
+    students = [Student(student_id=f'Q{i:05d}', name=f'学生{i}', id_card=f'{110101200001010000 + i}',
+                        gender='男', age=20, major='计算机科学与技术', grade='2023')
+                for i in numbers]
+    courses = [Course(code=f'QC{i:04d}', name=f'课程{i}', credits=3, teacher='教师', semester='2024春')
+               for i in numbers]
+    books = [Book(isbn=f'978730{i:07d}', title=f'图书{i}', author='作者', publisher='出版社', total_copies=3)
+             for i in numbers]
+    db.session.add_all(students + courses + books)
+    db.session.flush()
+    
+    for student, course, book in zip(students, courses, books):
+        db.session.add(Enrollment(student_id=student.id, course_id=course.id))
+        db.session.add(BorrowRecord(student_id=student.id, book_id=book.id,
+                                     due_date=datetime.utcnow() + timedelta(days=30)))
+    db.session.commit()
+
+# (路径, 最大语句数)；语句数包括ETag指纹、分页计数和数据查询
+LIST_ENDPOINTS = [
+    ('/api/students', 3),
+    ('/api/courses', 3),
+    ('/api/books', 3),
+    ('/api/enrollments', 2),
+    ('/api/borrows', 2),
+]
+
+class TestQueryCounts:
+    """查询语句数回归测试"""
+    
+    @pytest.mark.parametrize('path,max_queries', LIST_ENDPOINTS)
+    def test_list_query_count_constant(self, client, app, count_queries, path, max_queries):
+        """测试列表接口语句数不随每页行数增长"""
+        with app.app_context():
+            seed_rows(100)
+        
+        key = path.rsplit('/', 1)[-1]
+        counts = {}
+        for per_page in (1, 100):
+            with count_queries() as statements:
+                response = client.get(f'{path}?per_page={per_page}')
+            assert response.status_code == 200
+            assert len(json.loads(response.data)['data'][key]) == per_page
+            assert len(statements) <= max_queries, '\n'.join(statements)
+            counts[per_page] = len(statements)
+        
+        assert counts[1] == counts[100]
+    
+    def test_dashboard_query_count_constant(self, client, app, count_queries):
+        """测试仪表板语句数不随数据量增长"""
+        counts = []
+        for start, n in ((0, 1), (1, 99)):
+            with app.app_context():
+                seed_rows(n, start=start)
+            with count_queries() as statements:
+                response = client.get('/api/dashboard')
+            assert response.status_code == 200
+            assert len(statements) <= 19, '\n'.join(statements)
+            counts.append(len(statements))
+        
+        assert counts[0] == counts[1]
+    
+    @pytest.mark.parametrize('path,max_queries', [
+        ('/api/students/{}', 4),
+        ('/students/{}', 3),
+    ])
+    def test_student_detail_query_count_constant(self, client, app, count_queries, path, max_queries):
+        """测试学生详情语句数不随选课和借阅数量增长"""
+        from models import Enrollment, BorrowRecord
+        from datetime import datetime, timedelta
+        with app.app_context():
+            seed_rows(10)
+            # 学生1共选8门课、借5本书，学生10各一条
+            db.session.add_all([Enrollment(student_id=1, course_id=i) for i in range(2, 9)])
+            db.session.add_all([BorrowRecord(student_id=1, book_id=i,
+                                             due_date=datetime.utcnow() + timedelta(days=30))
+                                for i in range(2, 6)])
+            db.session.commit()
+        
+        counts = []
+        for student_id in (10, 1):
+            with count_queries() as statements:
+                response = client.get(path.format(student_id))
+            assert response.status_code == 200
+            assert len(statements) <= max_queries, '\n'.join(statements)
+            counts.append(len(statements))
+        
+        assert counts[0] == counts[1]
+        
+        data = json.loads(client.get('/api/students/1').data)['data']['student']
+        assert [c['id'] for c in data['enrolled_courses']] == list(range(1, 9))
+        assert data['enrolled_courses'][1]['current_students'] == 2
+        assert [b['id'] for b in data['borrowed_books']] == list(range(1, 6))
+        assert data['borrowed_books'][1]['available_copies'] == 1
+    
+    @pytest.mark.parametrize('path,max_queries', [
+        ('/api/courses/{}', 3),
+        ('/courses/{}', 2),
+        ('/api/books/{}', 3),
+        ('/books/{}', 2),
+    ])
+    def test_course_and_book_detail_query_count_constant(self, client, app, count_queries, path, max_queries):
+        """测试课程、图书详情语句数不随选课和借阅数量增长"""
+        from models import Enrollment, BorrowRecord
+        from datetime import datetime, timedelta
+        with app.app_context():
+            seed_rows(10)
+            # 课程1共9名学生选课、图书1共借出8次，课程10和图书10各一条
+            db.session.add_all([Enrollment(student_id=i, course_id=1) for i in range(2, 10)])
+            db.session.add_all([BorrowRecord(student_id=i, book_id=1,
+                                             due_date=datetime.utcnow() + timedelta(days=30))
+                                for i in range(2, 9)])
+            db.session.commit()
+        
+        counts = []
+        for item_id in (10, 1):
+            with count_queries() as statements:
+                response = client.get(path.format(item_id))
+            assert response.status_code == 200
+            assert len(statements) <= max_queries, '\n'.join(statements)
+            counts.append(len(statements))
+        
+        assert counts[0] == counts[1]
+    
+    def test_student_detail_not_found(self, client):
+        """测试学生不存在时返回404"""
+        assert client.get('/api/students/999').status_code == 404
+
+class TestReadReplica:
+    """只读副本路由测试"""
+    
+    @pytest.fixture
+    def replica_app(self, tmp_path):
+        """主库和副本为两个独立的SQLite文件，便于区分查询落在哪个库"""
+        from app import create_app
+        from config import TestingConfig
+        
+        class ReplicaConfig(TestingConfig):
+            SQLALCHEMY_DATABASE_URI = f'sqlite:///{tmp_path}/primary.db'
+            SQLALCHEMY_BINDS = {'replica': f'sqlite:///{tmp_path}/replica.db'}
+            PAGE_CACHE_ENABLED = False
+        
+        app = create_app(ReplicaConfig)
+        with app.app_context():
+            db.create_all()
+            db.metadata.create_all(db.engines['replica'])
+            yield app
+            db.session.remove()
+            for engine in db.engines.values():
+                engine.dispose()
+        # init_app 为每个绑定键注册了元数据，移除以免影响其他测试的 create_all
+        db.metadatas.pop('replica', None)
+    
+    def test_reads_use_replica_and_writes_use_primary(self, replica_app, sample_student):
+        """测试读请求走副本，写请求走主库"""
+        response = replica_app.test_client().post('/api/students',
+                                                  data=json.dumps(sample_student),
+                                                  content_type='application/json')
+        assert response.status_code == 201
+        
+        # 新会话读取副本：副本尚未同步，看不到新学生
+        data = json.loads(replica_app.test_client().get('/api/students').data)
+        assert data['data']['students'] == []
+        
+        # 请求之外的查询仍走主库
+        assert Student.query.count() == 1
+    
+    def test_read_your_writes_after_post(self, replica_app, sample_student):
+        """测试写入后同一会话的读请求走主库"""
+        client = replica_app.test_client()
+        client.post('/api/students', data=json.dumps(sample_student), content_type='application/json')
+        
+        data = json.loads(client.get('/api/students').data)
+        assert len(data['data']['students']) == 1
+        
+        replica_app.config['DB_REPLICA_STICKY_SECONDS'] = 0
+        data = json.loads(client.get('/api/students').data)
+        assert data['data']['students'] == []
+
+class TestAsyncAPI:
+    """异步API测试"""
+    
+    def test_async_dashboard_matches_sync(self, client, app):
+        """测试异步仪表板与同步接口返回相同数据"""
+        with app.app_context():
+            seed_rows(5)
+        
+        sync_data = json.loads(client.get('/api/dashboard').data)
+        response = client.get('/api/async/dashboard')
+        assert response.status_code == 200
+        async_data = json.loads(response.data)
+        assert async_data['success'] is True
+        assert async_data['data'] == sync_data['data']
+    
+    @pytest.mark.parametrize('path', [
+        '/students?per_page=3&page=2',
+        '/students?search=Q0000',
+        '/courses?per_page=100',
+        '/books?per_page=4',
+        '/enrollments?per_page=2',
+        '/borrows?status=borrowed',
+    ])
+    def test_async_list_matches_sync(self, client, app, path):
+        """测试异步列表接口与同步接口返回相同数据"""
+        with app.app_context():
+            seed_rows(10)
+        
+        sync_data = json.loads(client.get(f'/api{path}').data)
+        response = client.get(f'/api/async{path}')
+        assert response.status_code == 200
+        assert json.loads(response.data)['data'] == sync_data['data']
+    
+    def test_async_queries_counted(self, client, app):
+        """测试异步接口的语句数计入Server-Timing"""
+        response = client.get('/api/async/dashboard')
+        assert 'desc="19 queries"' in response.headers['Server-Timing']
+
+class TestMultiGet:
+    """按ID批量获取测试"""
+    
+    def test_students_order_and_missing_ids(self, client, app):
+        """测试按请求顺序返回并报告不存在的ID"""
+        with app.app_context():
+            seed_rows(3)
+        
+        response = client.get('/api/students?ids=3,999,1,3')
+        assert response.status_code == 200
+        data = json.loads(response.data)['data']
+        assert [s['id'] for s in data['students']] == [3, 1]
+        assert data['missing_ids'] == [999]
+        assert [c['id'] for c in data['students'][0]['enrolled_courses']] == [3]
+        assert [b['id'] for b in data['students'][0]['borrowed_books']] == [3]
+    
+    @pytest.mark.parametrize('path,key,related', [
+        ('/api/students', 'students', 'enrolled_courses'),
+        ('/api/courses', 'courses', 'enrolled_students'),
+        ('/api/books', 'books', 'current_borrowers'),
+    ])
+    def test_query_count_constant(self, client, app, count_queries, path, key, related):
+        """测试语句数不随ID个数增长"""
+        with app.app_context():
+            seed_rows(50)
+        
+        counts = []
+        for ids in ('1', ','.join(str(i) for i in range(1, 51))):
+            with count_queries() as statements:
+                response = client.get(f'{path}?ids={ids}')
+            items = json.loads(response.data)['data'][key]
+            assert len(items) == len(ids.split(','))
+            assert all(len(item[related]) == 1 for item in items)
+            counts.append(len(statements))
+        
+        assert counts[0] == counts[1] <= 4
+    
+    def test_course_rosters_match_detail(self, client, app):
+        """测试批量获取课程返回与详情一致的花名册第一页，不含敏感字段"""
+        from models import Enrollment
+        with app.app_context():
+            seed_rows(25)
+            db.session.add_all(Enrollment(student_id=i, course_id=1) for i in range(2, 26))
+            db.session.commit()
+
+        response = client.get('/api/courses?ids=2,1')
+        courses = json.loads(response.data)['data']['courses']
+        assert [c['id'] for c in courses] == [2, 1]
+        assert len(courses[1]['enrolled_students']) == 20
+        assert courses[1]['roster_pagination']['total'] == 25
+        assert courses[1]['roster_pagination']['has_next'] is True
+        for course in courses:
+            detail = json.loads(client.get(f"/api/courses/{course['id']}").data)['data']['course']
+            assert course['enrolled_students'] == detail['enrolled_students']
+            assert course['roster_pagination'] == detail['roster_pagination']
+            assert all('id_card' not in s and 'address' not in s for s in course['enrolled_students'])
+
+    def test_invalid_ids(self, client, app):
+        """测试非法ID列表返回400"""
+        assert client.get('/api/books?ids=1,abc').status_code == 400
+        assert client.get('/api/courses?ids=').status_code == 400
+        
+        app.config['MULTI_GET_MAX_IDS'] = 2
+        assert client.get('/api/students?ids=1,2,3').status_code == 400
+
+
+class TestBatchAPI:
+    """批量请求测试"""
+    
+    def batch(self, client, requests):
+        response = client.post('/api/batch', json={'requests': requests})
+        return response.status_code, json.loads(response.data)
+    
+    def test_results_in_order(self, client, app, sample_student):
+        """测试按顺序返回各子请求的状态和响应体"""
+        status, data = self.batch(client, [
+            {'method': 'POST', 'path': '/api/students', 'body': sample_student},
+            {'method': 'GET', 'path': '/api/students'},
+            {'method': 'PUT', 'path': '/api/students/1', 'body': {'name': '更新后的姓名'}},
+            {'method': 'GET', 'path': '/api/dashboard'},
+        ])
+        assert status == 200
+        results = data['data']['results']
+        assert [r['status'] for r in results] == [201, 200, 200, 200]
+        assert results[2]['body']['data']['student']['name'] == '更新后的姓名'
+        assert results[1]['body']['data']['students'][0]['student_id'] == 'TEST001'
+        assert results[3]['body']['data']['overview']['total_students'] == 1
+    
+    def test_rejected_sub_requests(self, client):
+        """测试未知路径、非API路径和嵌套批量请求"""
+        status, data = self.batch(client, [
+            {'method': 'GET', 'path': '/api/unknown'},
+            {'method': 'GET', 'path': '/dashboard'},
+            {'method': 'POST', 'path': '/api/batch', 'body': {'requests': []}},
+            {'method': 'DELETE', 'path': '/api/dashboard'},
+        ])
+        assert status == 200
+        assert [r['status'] for r in data['data']['results']] == [404, 400, 400, 405]
+    
+    def test_invalid_body(self, client, app):
+        """测试请求体校验"""
+        assert client.post('/api/batch', json={}).status_code == 400
+        assert client.post('/api/batch', json={'requests': []}).status_code == 400
+        
+        app.config['BATCH_MAX_REQUESTS'] = 1
+        status, _ = self.batch(client, [{'path': '/api/students'}] * 2)
+        assert status == 400
+    
+    def test_shared_fingerprint(self, client, app, count_queries):
+        """测试同一批次内重复的条件GET共享指纹查询"""
+        with app.app_context():
+            seed_rows(5)
+        
+        with count_queries() as separate:
+            client.get('/api/books')
+            client.get('/api/books?page=2')
+        with count_queries() as batched:
+            status, data = self.batch(client, [
+                {'method': 'GET', 'path': '/api/books'},
+                {'method': 'GET', 'path': '/api/books?page=2'},
+            ])
+        
+        assert [r['status'] for r in data['data']['results']] == [200, 200]
+        assert len(batched) == len(separate) - 1
+
+
+class TestCourseRoster:
+    """课程花名册测试"""
+    
+    def seed_roster(self, n):
+        """生成 n 个学生，全部选课程1（学号倒序插入）"""
+        from models import Enrollment
+        seed_rows(n)
+        db.session.add_all([Enrollment(student_id=i, course_id=1) for i in range(n, 1, -1)])
+        db.session.commit()
+    
+    def test_paginated_and_sorted(self, client, app):
+        """测试按学号排序分页"""
+        with app.app_context():
+            self.seed_roster(25)
+        
+        data = json.loads(client.get('/api/courses/1/students?per_page=10&page=3').data)['data']
+        assert [s['student_id'] for s in data['students']] == [f'Q{i:05d}' for i in range(20, 25)]
+        assert data['pagination']['total'] == 25
+        assert data['pagination']['pages'] == 3
+        
+        data = json.loads(client.get('/api/courses/1/students?per_page=2&order=desc').data)['data']
+        assert [s['student_id'] for s in data['students']] == ['Q00024', 'Q00023']
+    
+    def test_field_projection(self, client, app, count_queries):
+        """测试只返回并只查询指定字段"""
+        with app.app_context():
+            self.seed_roster(3)
+        
+        with count_queries() as statements:
+            response = client.get('/api/courses/1/students?fields=student_id,name,enrollment_date')
+        students = json.loads(response.data)['data']['students']
+        assert set(students[0]) == {'student_id', 'name', 'enrollment_date'}
+        assert not any('id_card' in statement for statement in statements)
+        
+        assert client.get('/api/courses/1/students?fields=id_card').status_code == 400
+        assert client.get('/api/courses/999/students').status_code == 404
+    
+    def test_course_detail_first_page(self, client, app, count_queries):
+        """测试课程详情只返回人数和第一页，语句数不随选课人数增长"""
+        with app.app_context():
+            self.seed_roster(30)
+        
+        counts = []
+        for course_id, expected in ((2, 1), (1, 20)):
+            with count_queries() as statements:
+                response = client.get(f'/api/courses/{course_id}')
+            course = json.loads(response.data)['data']['course']
+            assert len(course['enrolled_students']) == expected
+            assert 'id_card' not in course['enrolled_students'][0]
+            counts.append(len(statements))
+        
+        assert course['current_students'] == 30
+        assert course['roster_pagination']['total'] == 30
+        assert course['roster_pagination']['has_next'] is True
+        assert counts[0] == counts[1] <= 3
+
+
+class TestBookDetail:
+    """图书详情与借阅历史测试"""
+    
+    def seed_history(self, n):
+        """图书1共 n 条借阅记录（早于 seed_rows 的记录），未归还3条且其中一条逾期"""
+        from models import BorrowRecord
+        from datetime import datetime, timedelta
+        seed_rows(n)
+        db.session.get(Book, 1).total_copies = 5
+        start = datetime.utcnow() - timedelta(days=n + 1)
+        for i in range(2, n + 1):
+            returned = i < n - 1
+            db.session.add(BorrowRecord(
+                student_id=i, book_id=1, borrow_date=start + timedelta(days=i),
+                due_date=start + timedelta(days=i + (1 if i == n - 1 else 30)),
+                status='returned' if returned else 'borrowed'
+            ))
+        db.session.commit()
+    
+    def test_detail_counts(self, client, app, count_queries):
+        """测试册数统计一次聚合，语句数不随借阅记录增长"""
+        with app.app_context():
+            self.seed_history(20)
+        
+        counts = []
+        for book_id in (2, 1):
+            with count_queries() as statements:
+                response = client.get(f'/api/books/{book_id}')
+            assert response.status_code == 200
+            counts.append(len(statements))
+        assert counts[0] == counts[1] <= 3
+        
+        book = json.loads(response.data)['data']['book']
+        assert book['borrowed_copies'] == 3
+        assert book['available_copies'] == 2
+        assert book['overdue_copies'] == 1
+        assert book['borrow_count'] == 20
+        assert [b['student_id'] for b in book['current_borrowers']] == ['Q00018', 'Q00019', 'Q00000']
+        assert 'id_card' not in book['current_borrowers'][0]
+        
+        assert client.get('/api/books/999').status_code == 404
+    
+    def test_detail_page(self, client, app, count_queries):
+        """测试详情页面使用同一加载器"""
+        with app.app_context():
+            self.seed_history(20)
+        
+        with count_queries() as statements:
+            response = client.get('/books/1')
+        assert response.status_code == 200
+        assert '1 册逾期' in response.data.decode('utf-8')
+        assert len(statements) <= 2, '\n'.join(statements)
+    
+    def test_borrow_history(self, client, app):
+        """测试借阅历史按借阅时间分页"""
+        with app.app_context():
+            self.seed_history(20)
+        
+        data = json.loads(client.get('/api/books/1/borrows?per_page=5').data)['data']
+        assert [r['student_id'] for r in data['borrow_records']] == [1, 20, 19, 18, 17]
+        assert data['pagination']['total'] == 20
+        
+        data = json.loads(client.get('/api/books/1/borrows?order=asc&status=borrowed').data)['data']
+        assert [r['student_id'] for r in data['borrow_records']] == [19, 20, 1]
+        
+        assert client.get('/api/books/999/borrows').status_code == 404
+    
+    @pytest.mark.parametrize('args', [{}, {'order': 'asc'}, {'status': 'returned'}])
+    def test_history_uses_index(self, app, args):
+        """测试接口构建的借阅历史查询命中 (book_id, borrow_date) 索引且不需要临时排序"""
+        from api.books import BookBorrowHistoryAPI
+        seed_rows(3)
+        statement = BookBorrowHistoryAPI.build_query(1, args).limit(10).statement
+        sql = statement.compile(db.engine, compile_kwargs={'literal_binds': True})
+        plan = db.session.execute(db.text(f'EXPLAIN QUERY PLAN {sql}')).all()
+        detail = ' '.join(row[-1] for row in plan)
+        assert 'ix_borrow_records_book_borrow_date' in detail
+        assert 'TEMP B-TREE' not in detail
+
+
+class TestTranscript:
+    """成绩单与GPA测试"""
+    
+    def seed_grades(self):
+        """学生1: 2024春 3学分95分、2学分75分，2024秋 4学分55分；学生2: 2024春 3学分85分"""
+        from models import Enrollment
+        seed_rows(3)
+        courses = db.session.query(Course).order_by(Course.id).all()
+        for course, credits, semester in zip(courses, (3, 2, 4), ('2024春', '2024春', '2024秋')):
+            course.credits = credits
+            course.semester = semester
+        db.session.get(Student, 2).major = '数学'
+        db.session.add_all([Enrollment(student_id=1, course_id=2), Enrollment(student_id=1, course_id=3)])
+        db.session.commit()
+        
+        for student_id, course_id, grade in ((1, 1, 95), (1, 2, 75), (1, 3, 55), (2, 1, 85)):
+            enrollment = db.session.query(Enrollment).filter_by(student_id=student_id, course_id=course_id).first()
+            if enrollment is None:
+                enrollment = Enrollment.create(student_id=student_id, course_id=course_id)
+            enrollment.complete_course(grade=grade)
+    
+    def test_student_transcript(self, client, app, count_queries):
+        """测试学分加权GPA及各学期GPA"""
+        with app.app_context():
+            self.seed_grades()
+        
+        with count_queries() as statements:
+            response = client.get('/api/students/1/transcript')
+        assert response.status_code == 200
+        assert len(statements) <= 4, '\n'.join(statements)
+        
+        data = json.loads(response.data)['data']
+        assert data['gpa'] == {'gpa': 1.78, 'credits': 9, 'earned_credits': 5, 'courses': 3}
+        assert [(s['semester'], s['gpa'], s['credits']) for s in data['semesters']] == [
+            ('2024春', 3.2, 5), ('2024秋', 0.0, 4)
+        ]
+        assert [c['grade_letter'] for c in data['courses']] == ['A', 'C', 'F']
+        
+        empty = json.loads(client.get('/api/students/3/transcript').data)['data']
+        assert empty['gpa']['gpa'] is None and empty['semesters'] == []
+        assert client.get('/api/students/999/transcript').status_code == 404
+
+    def test_zero_credit_gpa_is_null(self, client, app, count_queries):
+        """测试只修过0学分课程时GPA为NULL，除数用 NULLIF 避免其他数据库除零报错"""
+        from models import Enrollment
+        with app.app_context():
+            seed_rows(1)
+            db.session.get(Course, 1).credits = 0
+            db.session.commit()
+            db.session.query(Enrollment).one().complete_course(grade=90)
+
+        with count_queries() as statements:
+            data = json.loads(client.get('/api/students/1/transcript').data)['data']
+        assert data['semesters'][0]['gpa'] is None and data['gpa']['gpa'] is None
+        assert any('nullif(' in s.lower() for s in statements), '\n'.join(statements)
+
+    def test_cohort_gpas(self, client, app, count_queries):
+        """测试按专业/年级批量计算GPA为一次聚合"""
+        with app.app_context():
+            self.seed_grades()
+        
+        with count_queries() as statements:
+            response = client.get('/api/transcripts?grade=2023')
+        assert len(statements) == 2, '\n'.join(statements)
+        students = json.loads(response.data)['data']['students']
+        assert [(s['student_id'], s['gpa']) for s in students] == [('Q00000', 1.78), ('Q00001', 3.0)]
+        
+        students = json.loads(client.get('/api/transcripts?major=数学&by_semester=1').data)['data']['students']
+        assert [s['student_id'] for s in students] == ['Q00001']
+        assert students[0]['semesters'] == [
+            {'semester': '2024春', 'gpa': 3.0, 'credits': 3, 'earned_credits': 3, 'courses': 1}
+        ]
+        
+        students = json.loads(client.get('/api/transcripts?grade=2023&by_semester=1').data)['data']['students']
+        assert students[0]['gpa'] == 1.78
+        
+        assert client.get('/api/transcripts').status_code == 400
+
+
+class TestRanking:
+    """GPA排名测试"""
+    
+    @pytest.mark.parametrize('use_window_functions', [True, False])
+    def test_rank_and_percentile(self, client, app, graded_cohort, use_window_functions):
+        """测试窗口函数与 NumPy 回退结果一致"""
+        app.extensions['ranking'].use_window_functions = use_window_functions
+        
+        # GPA: 学生1 4.0，学生2、3 并列 2.0，学生4 0.0
+        data = json.loads(client.get('/api/rankings?major=计算机科学与技术&grade=2023').data)['data']
+        assert [(s['student_id'], s['rank'], s['percentile']) for s in data['students']] == [
+            ('G0001', 1, 100.0), ('G0002', 2, 75.0), ('G0003', 2, 75.0), ('G0004', 4, 25.0)
+        ]
+        assert data['students'][0]['cohort_size'] == 4
+        
+        student_ids = graded_cohort['students']
+        ranking = json.loads(client.get(f'/api/students/{student_ids[2]}/ranking').data)['data']['ranking']
+        assert ranking['rank'] == 2 and ranking['gpa'] == 2.0
+        assert json.loads(client.get(f'/api/students/{student_ids[4]}/ranking').data)['data']['ranking'] is None
+        assert client.get('/api/rankings').status_code == 400
+    
+    def test_cache_sees_writes_from_other_workers(self, client, app, graded_cohort):
+        """测试其他工作进程的写入（不经过本进程的会话事件）同样使排名缓存失效"""
+        path = '/api/rankings?grade=2023'
+        assert json.loads(client.get(path).data)['data']['students'][0]['student_id'] == 'G0001'
+        
+        # 文本SQL不触发会话事件，相当于另一个进程直接写库并推进版本号
+        db.session.execute(db.text(
+            f"UPDATE enrollments SET gpa_points = 0 WHERE student_id = {graded_cohort['students'][0]}"
+        ))
+        db.session.execute(db.text(
+            "UPDATE table_versions SET version = version + 1 WHERE table_name = 'enrollments'"
+        ))
+        db.session.commit()
+        assert len(app.extensions['ranking']) == 1
+        
+        students = json.loads(client.get(path).data)['data']['students']
+        assert [(s['student_id'], s['rank']) for s in students] == [
+            ('G0002', 1), ('G0003', 1), ('G0001', 3), ('G0004', 3)
+        ]
+
+    @pytest.mark.parametrize('use_window_functions', [True, False])
+    def test_zero_credit_courses_not_ranked(self, client, app, graded_cohort, use_window_functions):
+        """测试只修过0学分课程（GPA为NULL）的学生不参与排名"""
+        from models import Enrollment
+        app.extensions['ranking'].use_window_functions = use_window_functions
+        course = Course(code='GC00', name='课程0', credits=0, teacher='教师', semester='2024春')
+        db.session.add(course)
+        db.session.flush()
+        enrollment = Enrollment(student_id=graded_cohort['students'][4], course_id=course.id)
+        db.session.add(enrollment)
+        enrollment.complete_course(grade=90)
+        
+        response = client.get('/api/rankings?grade=2023')
+        assert response.status_code == 200
+        students = json.loads(response.data)['data']['students']
+        assert [s['student_id'] for s in students] == ['G0001', 'G0002', 'G0003', 'G0004']
+        
+        ranking = client.get(f"/api/students/{graded_cohort['students'][4]}/ranking")
+        assert json.loads(ranking.data)['data']['ranking'] is None
+
+class TestGradeUpload:
+    """成绩批量录入测试"""
+    
+    def test_json_upload_single_transaction(self, client, app, count_queries):
+        """测试JSON批量录入按原阈值换算，且一次提交"""
+        from models import Enrollment
+        with app.app_context():
+            seed_rows(5)
+            db.session.add_all([Enrollment(student_id=i, course_id=1) for i in range(2, 6)])
+            db.session.commit()
+        
+        grades = [{'student_id': f'Q{i:05d}', 'grade': grade}
+                  for i, grade in enumerate((95, 90, 80, 60, 59.5))]
+        with count_queries() as statements:
+            response = client.post('/api/courses/1/grades', json={'grades': grades})
+        assert response.status_code == 200
+        data = json.loads(response.data)['data']
+        assert data['updated'] == 5
+        assert data['distribution'] == {'A': 2, 'B': 1, 'D': 1, 'F': 1}
+        assert sum(s.startswith('UPDATE enrollments') for s in statements) == 1
+        
+        with app.app_context():
+            rows = db.session.query(Enrollment.student_id, Enrollment.status, Enrollment.grade_letter,
+                                    Enrollment.gpa_points).filter_by(course_id=1).order_by(Enrollment.student_id).all()
+        assert [tuple(row) for row in rows] == [
+            (1, 'completed', 'A', 4.0), (2, 'completed', 'A', 4.0), (3, 'completed', 'B', 3.0),
+            (4, 'completed', 'D', 1.0), (5, 'completed', 'F', 0.0)
+        ]
+    
+    def test_batch_scale_matches_single_grade(self):
+        """测试批量换算与单个成绩换算在阈值边界上一致"""
+        from models import Enrollment
+        grades = [0, 59.99, 60, 69.5, 70, 79.99, 80, 89.5, 90, 100]
+        assert Enrollment.grade_points(grades) == [Enrollment.grade_point(grade) for grade in grades]
+        assert [letter for letter, _ in Enrollment.grade_points(grades)] == list('FFDDCCBBAA')
+    
+    def test_invalid_rows_reported(self, client, app):
+        """测试无效行默认整批不写入，partial=1 时只写入有效行"""
+        from models import Enrollment
+        with app.app_context():
+            seed_rows(3)
+        
+        csv_body = 'student_id,grade\nQ00000,88\nQ00001,91\nQ00000,70\n,80\nQ00009,75\nQ00000,abc\n'
+        response = client.post('/api/courses/1/grades', data=csv_body, content_type='text/csv')
+        assert response.status_code == 400
+        errors = json.loads(response.data)['data']['errors']
+        assert [(e['row'], e['message']) for e in errors] == [
+            (2, '该学生未选修本课程'), (3, '学号重复'), (4, '缺少学号'), (5, '该学生未选修本课程'), (6, '学号重复')
+        ]
+        with app.app_context():
+            assert db.session.query(Enrollment).filter_by(course_id=1).one().grade is None
+        
+        response = client.post('/api/courses/1/grades?partial=1', data=csv_body, content_type='text/csv')
+        data = json.loads(response.data)['data']
+        assert data['updated'] == 1 and len(data['errors']) == 5
+        with app.app_context():
+            assert db.session.query(Enrollment).filter_by(course_id=1).one().grade_letter == 'B'
+    
+    def test_csv_file_upload(self, client, app):
+        """测试上传CSV文件（中文表头、带BOM）"""
+        import io
+        with app.app_context():
+            seed_rows(1)
+        
+        upload = io.BytesIO('﻿学号,成绩\nQ00000,101\n'.encode('utf-8'))
+        response = client.post('/api/courses/1/grades', data={'file': (upload, 'grades.csv')},
+                               content_type='multipart/form-data')
+        assert response.status_code == 400
+        assert json.loads(response.data)['data']['errors'][0]['message'] == '成绩必须在0-100之间'
+        
+        assert client.post('/api/courses/1/grades', data='a,b\n1,2\n', content_type='text/csv').status_code == 400
+        assert client.post('/api/courses/999/grades', json={'grades': []}).status_code == 404
+
+
+class TestGradeDistribution:
+    """成绩分布统计测试"""
+    
+    @pytest.mark.parametrize('use_numpy', [True, False])
+    def test_statistics(self, client, app, count_queries, graded_cohort, use_numpy):
+        """测试NumPy与纯Python计算结果一致，成绩一次查询取回"""
+        app.extensions['grade_stats'].use_numpy = use_numpy
+        
+        # 版本查询 + 成绩查询
+        with count_queries() as statements:
+            response = client.get('/api/analytics/grades')
+        assert len(statements) == 2, '\n'.join(statements)
+        data = json.loads(response.data)['data']
+        
+        course = data['courses'][0]
+        assert (course['code'], course['count'], course['mean'], course['median'], course['stddev']) == \
+            ('GC01', 4, 76.75, 78.5, 14.97)
+        assert (course['min'], course['max'], course['pass_rate']) == (55.0, 95.0, 0.75)
+        assert course['histogram'] == [0, 0, 0, 0, 0, 1, 0, 1, 1, 1]
+        assert data['courses'][1]['histogram'][-1] == 1
+        
+        assert [(s['semester'], s['count'], s['median']) for s in data['semesters']] == [
+            ('2024春', 4, 78.5), ('2024秋', 2, 80.0)
+        ]
+        assert data['overall']['count'] == 6 and data['overall']['pass_rate'] == 0.8333
+        
+        course_id = graded_cohort['courses'][1]
+        data = json.loads(client.get(f'/api/analytics/grades?semester=2024秋&course_id={course_id}').data)['data']
+        assert [c['course_id'] for c in data['courses']] == [course_id]
+        assert data['overall']['mean'] == 80.0
+    
+    def test_empty(self, client):
+        """测试没有成绩时统计为空"""
+        data = json.loads(client.get('/api/analytics/grades').data)['data']
+        assert data['overall'] is None and data['courses'] == []
+
+
+class TestGradeCacheInvalidation:
+    """成绩相关缓存（排名、成绩分布）失效测试，两者共用 models/table_versions.py 的提交回调"""
+    
+    RANKING_PATH = '/api/rankings?grade=2023'
+    STATS_PATH = '/api/analytics/grades'
+    
+    def fetch(self, client):
+        """返回 (学号 -> 名次, 课程GC01的及格率)"""
+        students = json.loads(client.get(self.RANKING_PATH).data)['data']['students']
+        courses = json.loads(client.get(self.STATS_PATH).data)['data']['courses']
+        return {s['student_id']: s['rank'] for s in students}, courses[0]['pass_rate']
+    
+    def cached(self, app):
+        """两个缓存中的条目数"""
+        return len(app.extensions['ranking']), len(app.extensions['grade_stats'])
+    
+    def test_cache_hit_only_checks_version(self, client, count_queries, graded_cohort):
+        """测试缓存命中时只查询一次 table_versions，不扫描成绩相关表"""
+        self.fetch(client)
+        for path in (self.RANKING_PATH, self.STATS_PATH):
+            with count_queries() as statements:
+                client.get(path)
+            assert len(statements) == 1 and 'FROM table_versions' in statements[0], '\n'.join(statements)
+    
+    def test_invalidated_by_complete_course(self, client, app, graded_cohort):
+        """测试逐条完成课程（ORM flush）提交后两个缓存都被清空"""
+        from models import Enrollment
+        assert self.fetch(client) == ({'G0001': 1, 'G0002': 2, 'G0003': 2, 'G0004': 4}, 0.75)
+        assert self.cached(app) == (1, 1)
+        
+        db.session.query(Enrollment).filter_by(
+            student_id=graded_cohort['students'][3], course_id=graded_cohort['courses'][0]
+        ).one().complete_course(grade=95)
+        assert self.cached(app) == (0, 0)
+        assert self.fetch(client) == ({'G0001': 1, 'G0004': 1, 'G0002': 3, 'G0003': 3}, 1.0)
+    
+    def test_invalidated_by_bulk_grade_upload(self, client, app, count_queries, graded_cohort):
+        """测试批量录入成绩（executemany 的 update(Enrollment)）提交后两个缓存都被清空"""
+        self.fetch(client)
+        assert self.cached(app) == (1, 1)
+        
+        course_id = graded_cohort['courses'][0]
+        grades = [{'student_id': 'G0004', 'grade': 95}, {'student_id': 'G0005', 'grade': 40}]
+        with count_queries() as statements:
+            response = client.post(f'/api/courses/{course_id}/grades', json={'grades': grades})
+        assert response.status_code == 200
+        assert sum(s.startswith('UPDATE enrollments') for s in statements) == 1
+        assert self.cached(app) == (0, 0)
+        
+        ranks, pass_rate = self.fetch(client)
+        assert ranks == {'G0001': 1, 'G0004': 1, 'G0002': 3, 'G0003': 3, 'G0005': 5}
+        assert pass_rate == 0.8
+
+class TestScheduleConflicts:
+    """上课时间解析与选课冲突检测测试"""
+    
+    def test_parse_schedule(self):
+        """测试上课时间文本解析"""
+        from models.schedule import parse_schedule, SEMESTER_WEEKS
+        
+        slots = parse_schedule('周一1-2节，星期三第3节(1-8周 单周)')
+        assert [(s['weekday'], s['start_period'], s['end_period']) for s in slots] == [(1, 1, 2), (3, 3, 3)]
+        assert (slots[0]['start_week'], slots[0]['end_week'], slots[0]['week_parity']) == (1, SEMESTER_WEEKS, 0)
+        assert (slots[1]['start_week'], slots[1]['end_week'], slots[1]['week_parity']) == (1, 8, 1)
+        assert parse_schedule('') == []
+        
+        for text in ('每周一上午', '周一1-20节', '周二1-2节 3-30周'):
+            with pytest.raises(ValueError):
+                parse_schedule(text)
+    
+    def test_invalid_schedule_rejected(self, client):
+        """测试无法解析的上课时间返回400"""
+        response = client.post('/api/courses', json={
+            'code': 'SCH001', 'name': '排课测试', 'credits': 2, 'teacher': '教师',
+            'semester': '2024春', 'schedule': '看情况'
+        })
+        assert response.status_code == 400
+        
+        response = client.post('/api/courses', json={
+            'code': 'SCH001', 'name': '排课测试', 'credits': 2, 'teacher': '教师',
+            'semester': '2024春', 'schedule': '周二3-4节'
+        })
+        assert response.status_code == 201
+        course_id = json.loads(response.data)['data']['course']['id']
+        
+        assert client.put(f'/api/courses/{course_id}', json={'schedule': '周八'}).status_code == 400
+        client.put(f'/api/courses/{course_id}', json={'schedule': '周五1-2节，周五5节'})
+        from models import CourseSchedule
+        slots = CourseSchedule.query.filter_by(course_id=course_id).all()
+        assert sorted((slot.weekday, slot.start_period) for slot in slots) == [(5, 1), (5, 5)]
+    
+    @pytest.mark.parametrize('schedule,semester,clash', [
+        ('周一2-3节', '2024春', True),
+        ('周三1-2节，周一2节(5周)', '2024春', True),
+        ('周一3-4节', '2024春', False),
+        ('周一1-2节 9-16周', '2024春', False),
+        ('周一1-2节 双周', '2024春', True),
+        ('周一1-2节', '2024秋', False),
+    ])
+    def test_enrollment_conflicts(self, client, app, schedule, semester, clash):
+        """测试选课时检测与在读课程的时间冲突（课程0：周一1-2节，1-8周）"""
+        with app.app_context():
+            seed_rows(2)
+            db.session.get(Course, 1).schedule = '周一1-2节(1-8周)'
+            course = db.session.get(Course, 2)
+            course.schedule = schedule
+            course.semester = semester
+            db.session.commit()
+        
+        response = client.post('/api/enrollments', json={'student_id': 1, 'course_id': 2})
+        if clash:
+            assert response.status_code == 400
+            conflicts = json.loads(response.data)['data']['conflicts']
+            assert [c['code'] for c in conflicts] == ['QC0000']
+        else:
+            assert response.status_code == 201
+    
+    def test_dropped_course_does_not_clash(self, client, app):
+        """测试已退选课程不参与冲突检测"""
+        from models import Enrollment
+        with app.app_context():
+            seed_rows(2)
+            db.session.get(Course, 1).schedule = '周一1-2节'
+            db.session.get(Course, 2).schedule = '周一1-2节'
+            Enrollment.get_by_student_and_course(1, 1).drop_course()
+        
+        assert client.post('/api/enrollments', json={'student_id': 1, 'course_id': 2}).status_code == 201
+    
+    def test_schedule_index(self):
+        """测试区间索引在区间相互重叠时仍能找到冲突"""
+        from models.schedule import ScheduleIndex
+        index = ScheduleIndex([(0, 10, 'a'), (2, 3, 'b'), (20, 22, 'c')])
+        assert index.overlap(5, 6) == 'a'
+        assert index.overlap(10, 20) is None
+        assert index.overlap(21, 30) == 'c'
+        assert index.overlap(30, 40) is None
+
+
+class TestPrerequisites:
+    """先修课程图测试"""
+    
+    def seed_chain(self, client, app):
+        """课程0 <- 课程1 <- 课程2（课程2以课程1为先修，课程1以课程0为先修）"""
+        with app.app_context():
+            seed_rows(3)
+        assert client.put('/api/courses/2', json={'prerequisites': 'QC0000'}).status_code == 200
+        assert client.put('/api/courses/3', json={'prerequisites': '课程1'}).status_code == 200
+    
+    def test_enrollment_requires_completed_prerequisites(self, client, app):
+        """测试选课前须完成全部直接和间接先修课程"""
+        from models import Enrollment
+        self.seed_chain(client, app)
+        
+        response = client.post('/api/enrollments', json={'student_id': 1, 'course_id': 3})
+        assert response.status_code == 400
+        missing = json.loads(response.data)['data']['missing_prerequisites']
+        assert [course['code'] for course in missing] == ['QC0000', 'QC0001']
+        
+        with app.app_context():
+            Enrollment.get_by_student_and_course(1, 1).complete_course(grade=80)
+            Enrollment.create(student_id=1, course_id=2).complete_course(grade=75)
+        assert client.post('/api/enrollments', json={'student_id': 1, 'course_id': 3}).status_code == 201
+    
+    @pytest.mark.parametrize('course_id,prerequisites,message', [
+        (1, 'QC0002', 'QC0000 → QC0002 → QC0001 → QC0000'),
+        (1, 'QC0000', '自身'),
+        (1, 'QC0001, 不存在的课', '不存在的课'),
+    ])
+    def test_invalid_prerequisites_rejected(self, client, app, course_id, prerequisites, message):
+        """测试循环依赖、自身先修和不存在的先修课程被拒绝"""
+        self.seed_chain(client, app)
+        
+        response = client.put(f'/api/courses/{course_id}', json={'prerequisites': prerequisites})
+        assert response.status_code == 400
+        assert message in json.loads(response.data)['message']
+        
+        data = json.loads(client.get('/api/courses/3/prerequisites').data)['data']
+        assert [course['code'] for course in data['direct']] == ['QC0001']
+        assert [course['code'] for course in data['all']] == ['QC0000', 'QC0001']
+        data = json.loads(client.get('/api/courses/1/prerequisites').data)['data']
+        assert data['all'] == [] and [course['code'] for course in data['required_by']] == ['QC0001']
+    
+    def test_closure_cached_until_courses_change(self, client, app, count_queries):
+        """测试传递闭包缓存，先修关系变更后重新计算"""
+        from models.prerequisite import get_prerequisite_graph
+        self.seed_chain(client, app)
+        
+        with app.app_context():
+            graph = get_prerequisite_graph()
+            assert graph.closure(3) == {1, 2}
+            # 命中缓存时只查询版本
+            with count_queries() as statements:
+                assert graph.closure(3) == {1, 2}
+            assert len(statements) == 1, '\n'.join(statements)
+        
+        client.put('/api/courses/2', json={'prerequisites': ''})
+        with app.app_context():
+            assert graph.closure(3) == {2}
+    
+    def test_sees_writes_from_other_workers(self, client, app):
+        """测试其他工作进程写入的先修关系（不经过本进程的会话事件）用于闭包和循环检查"""
+        from models.prerequisite import get_prerequisite_graph
+        self.seed_chain(client, app)
+        
+        with app.app_context():
+            graph = get_prerequisite_graph()
+            assert graph.closure(3) == {1, 2}
+            # 文本SQL不触发会话事件，相当于另一个进程直接写库并推进版本号：课程3不再以课程2为先修，课程1改为以课程3为先修。
+            # 删除的是 rowid 最大的边，SQLite 会把该 rowid 复用给新插入的边，行数也不变
+            db.session.execute(db.text('DELETE FROM course_prerequisites WHERE course_id = 3'))
+            db.session.execute(db.text('INSERT INTO course_prerequisites (course_id, prerequisite_id) VALUES (1, 3)'))
+            db.session.execute(db.text(
+                "UPDATE table_versions SET version = version + 1 WHERE table_name = 'course_prerequisites'"
+            ))
+            db.session.commit()
+            assert graph.closure(3) == frozenset()
+            assert graph.closure(2) == {1, 3}
+        
+        response = client.put('/api/courses/3', json={'prerequisites': 'QC0001'})
+        assert response.status_code == 400
+        assert 'QC0002 → QC0001 → QC0000 → QC0002' in json.loads(response.data)['message']
+    
+    def test_parse_prerequisites(self):
+        """测试只按标点拆分，名称中的空格保留，空文本和 “无” 表示没有先修课程"""
+        from models.prerequisite import parse_prerequisites
+        assert parse_prerequisites('Data Structures, CS101；高等数学、CS101') == ['Data Structures', 'CS101', '高等数学']
+        assert parse_prerequisites('') == parse_prerequisites(None) == parse_prerequisites(' 无 ') == []
+    
+    def test_course_name_with_spaces(self, client, app):
+        """测试以含空格的课程名称作为先修课程，“无” 清空先修关系"""
+        with app.app_context():
+            seed_rows(2)
+            db.session.get(Course, 1).name = 'Data Structures'
+            db.session.commit()
+        
+        assert client.put('/api/courses/2', json={'prerequisites': 'Data Structures'}).status_code == 200
+        data = json.loads(client.get('/api/courses/2/prerequisites').data)['data']
+        assert [course['code'] for course in data['direct']] == ['QC0000']
+        
+        assert client.put('/api/courses/2', json={'prerequisites': '无'}).status_code == 200
+        assert json.loads(client.get('/api/courses/2/prerequisites').data)['data']['direct'] == []
+    
+    def test_transitive_closure_tolerates_cycles(self):
+        """测试已有数据中的环不会导致死循环"""
+        from models.prerequisite import transitive_closure
+        closure = transitive_closure({1: {2}, 2: {3}, 3: {1}, 4: {1}})
+        assert closure[4] == {1, 2, 3}
+        assert 2 in closure[1] and 3 in closure[1]
+
+
+class TestTimetable:
+    """自动排课与排课冲突测试"""
+    
+    def test_solver_respects_constraints(self):
+        """测试教室容量、教室与教师不重复占用、教师不可用时间和每天最多一次课"""
+        from models.timetable import TimetableSolver
+        solver = TimetableSolver(
+            [{'name': 'A101', 'capacity': 40}, {'name': 'B201', 'capacity': 120}],
+            {'王教授': '周一1-10节'}, weekdays=3, blocks=((1, 2), (3, 4))
+        )
+        courses = [
+            {'id': i, 'code': f'C{i}', 'name': f'课程{i}', 'teacher': teacher, 'size': size, 'sessions': sessions}
+            for i, (teacher, size, sessions) in enumerate([
+                ('王教授', 100, 2), ('王教授', 30, 2), ('李教授', 100, 3), ('李教授', 30, 1), ('张教授', 200, 1)
+            ])
+        ]
+        result = solver.solve(courses)
+        
+        assert [(item['id'], item['reason']) for item in result['unassigned']] == [(4, '没有容量不少于 200 人的教室')]
+        used = set()
+        for course_id, placement in result['assignments'].items():
+            course = courses[course_id]
+            assert len(placement) == course['sessions']
+            assert len({solver.slots[slot][0] for slot, _ in placement}) == course['sessions']
+            for slot, room in placement:
+                assert solver.capacities[room] >= course['size']
+                assert (slot, room) not in used and (slot, course['teacher']) not in used
+                used.update({(slot, room), (slot, course['teacher'])})
+                if course['teacher'] == '王教授':
+                    assert solver.slots[slot][0] != 1
+    
+    def test_solve_and_apply(self, client, app):
+        """测试为学期排课并写回教室和上课时间"""
+        from models import CourseSchedule
+        with app.app_context():
+            seed_rows(4)
+        
+        body = {
+            'semester': '2024春',
+            'classrooms': [{'name': 'A101', 'capacity': 60}],
+            'teacher_unavailable': {'教师': '周一1-10节'}
+        }
+        response = client.post('/api/timetable/solve', json=body)
+        data = json.loads(response.data)['data']
+        assert response.status_code == 200
+        assert len(data['assignments']) == 4 and data['unassigned'] == [] and data['applied'] == 0
+        assert all('周一' not in item['schedule'] for item in data['assignments'])
+        
+        data = json.loads(client.post('/api/timetable/solve', json=dict(body, apply=True)).data)['data']
+        assert data['applied'] == 4
+        with app.app_context():
+            course = db.session.get(Course, 1)
+            assert course.classroom == 'A101'
+            assert course.schedule == data['assignments'][0]['schedule']
+            assert CourseSchedule.query.count() == 8
+        
+        conflicts = json.loads(client.get('/api/timetable/conflicts?semester=2024春').data)['data']
+        assert conflicts == {'classrooms': [], 'teachers': []}
+    
+    def test_split_rooms_recorded_per_slot(self, client, app):
+        """测试同一课程的课次被分到不同教室时，按时段记录教室并按实际教室检测冲突"""
+        from models.timetable import solve_semester
+        with app.app_context():
+            # 课程Z只能用A101且只能排周三；课程P人数更多先排，占用M201的周一、周二；
+            # 课程X周二不可用，只能周一用A101、周三用M201
+            for code, teacher, size, credits in (('Z', '赵', 80, 2), ('P', '钱', 50, 4), ('X', '孙', 30, 4)):
+                db.session.add(Course(code=code, name=f'课程{code}', credits=credits, teacher=teacher,
+                                      semester='2024春', max_students=size))
+            db.session.commit()
+            
+            result = solve_semester(
+                '2024春', [{'name': 'A101', 'capacity': 100}, {'name': 'M201', 'capacity': 60}],
+                {'赵': '周一1-2节，周二1-2节', '钱': '周三1-2节', '孙': '周二1-2节'},
+                weekdays=3, blocks=((1, 2),), apply=True
+            )
+            assert result['unassigned'] == [] and result['applied'] == 3
+            
+            course = Course.query.filter_by(code='X').one()
+            assert course.classroom == 'A101、M201'
+            assert sorted((slot.weekday, slot.classroom) for slot in course.schedule_slots) == [
+                (1, 'A101'), (3, 'M201')
+            ]
+        
+        assert json.loads(client.get('/api/timetable/conflicts').data)['data']['classrooms'] == []
+        
+        # 手工排进 M201 周三的课程与课程X的周三课次冲突
+        with app.app_context():
+            db.session.add(Course(code='Y', name='课程Y', credits=2, teacher='李', semester='2024春',
+                                  classroom='M201', schedule='周三1-2节'))
+            db.session.commit()
+        data = json.loads(client.get('/api/timetable/conflicts').data)['data']
+        assert [(item['classroom'], [c['code'] for c in item['courses']]) for item in data['classrooms']] == [
+            ('M201', ['X', 'Y'])
+        ]
+        
+        # 手工修改课程教室后各时段沿用课程教室
+        with app.app_context():
+            course = Course.query.filter_by(code='X').one()
+            course.classroom = 'B301'
+            db.session.commit()
+            assert {slot.room for slot in course.schedule_slots} == {'B301'}
+    
+    def test_unplaced_and_finished_courses_keep_their_rooms(self, client, app):
+        """测试无法放置的课程和已结束课程的现有排课被预留，写回后不产生冲突"""
+        with app.app_context():
+            db.session.add_all([
+                Course(code='BIG', name='大课', credits=2, teacher='赵', semester='2024春', max_students=500,
+                       classroom='R1', schedule='周一1-2节'),
+                Course(code='OLD', name='已结课', credits=2, teacher='钱', semester='2024春', max_students=30,
+                       classroom='R1', schedule='周一3-4节', status='finished'),
+                Course(code='SMALL', name='小课', credits=2, teacher='孙', semester='2024春', max_students=30)
+            ])
+            db.session.commit()
+        
+        body = {'semester': '2024春', 'classrooms': [{'name': 'R1', 'capacity': 60}], 'apply': True}
+        data = json.loads(client.post('/api/timetable/solve', json=body).data)['data']
+        assert [(item['code'], item['reason']) for item in data['unassigned']] == [
+            ('BIG', '没有容量不少于 500 人的教室，保留原有教室和上课时间')
+        ]
+        assert [(item['code'], item['classroom']) for item in data['assignments']] == [('SMALL', 'R1')]
+        assert data['assignments'][0]['schedule'] not in ('周一1-2节', '周一3-4节')
+        
+        conflicts = json.loads(client.get('/api/timetable/conflicts?semester=2024春').data)['data']
+        assert conflicts == {'classrooms': [], 'teachers': []}
+    
+    def test_invalid_input(self, client):
+        """测试缺少教室或不可用时间无法解析时返回400"""
+        assert client.post('/api/timetable/solve', json={'semester': '2024春'}).status_code == 400
+        assert client.post('/api/timetable/solve', json={
+            'semester': '2024春', 'classrooms': [{'name': 'A101', 'capacity': 0}]
+        }).status_code == 400
+        assert client.post('/api/timetable/solve', json={
+            'semester': '2024春', 'classrooms': [{'name': 'A101', 'capacity': 60}],
+            'teacher_unavailable': {'教师': '下午'}
+        }).status_code == 400
+    
+    def test_existing_conflicts(self, client, app):
+        """测试检查手工排课中的教室和教师冲突"""
+        with app.app_context():
+            seed_rows(3)
+            for course_id, classroom, schedule in ((1, 'A101', '周一1-2节'), (2, 'A101', '周一2-3节'),
+                                                   (3, 'B201', '周一3-4节')):
+                course = db.session.get(Course, course_id)
+                course.classroom = classroom
+                course.schedule = schedule
+            db.session.commit()
+        
+        data = json.loads(client.get('/api/timetable/conflicts').data)['data']
+        assert [(item['classroom'], [c['code'] for c in item['courses']]) for item in data['classrooms']] == [
+            ('A101', ['QC0000', 'QC0001'])
+        ]
+        assert [[c['code'] for c in item['courses']] for item in data['teachers']] == [
+            ['QC0000', 'QC0001'], ['QC0001', 'QC0002']
+        ]
@@ -218,3 +218,22 @@ class TestBorrowRecordModel:
             
             expected_date = original_due_date + timedelta(days=7)
             assert borrow_record.due_date.date() == expected_date.date()
+
+class TestSqliteTuning:
+    """SQLite性能配置测试"""
+    
+    def test_pragmas_applied_on_connect(self, app):
+        """测试新连接上已设置PRAGMA"""
+        with app.app_context():
+            assert db.session.execute(db.text('PRAGMA journal_mode')).scalar() == 'wal'
+            assert db.session.execute(db.text('PRAGMA foreign_keys')).scalar() == 1
+            assert db.session.execute(db.text('PRAGMA busy_timeout')).scalar() == 5000
+            assert db.session.execute(db.text('PRAGMA synchronous')).scalar() == 1  # NORMAL
+    
+    def test_foreign_key_enforced(self, app):
+        """测试外键约束生效"""
+        with app.app_context():
+            db.session.add(Enrollment(student_id=99999, course_id=99999))
+            with pytest.raises(IntegrityError):
+                db.session.commit()
+            db.session.rollback()
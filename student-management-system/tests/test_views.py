@@ -143,3 +143,106 @@ class TestDashboardViews:
         with app.app_context():
             response = client.get('/nonexistent-page')
             assert response.status_code == 404
+
+class TestPageCache:
+    """页面缓存测试"""
+    
+    def test_list_page_cached_by_args(self, app, client):
+        """测试列表页按查询参数缓存"""
+        with app.app_context():
+            cache = app.extensions['page_cache']
+            
+            client.get('/students?page=1')
+            client.get('/students?page=1')
+            assert cache.hits == 1
+            
+            client.get('/students?page=2')
+            assert cache.hits == 1
+            assert len(cache) == 2
+    
+    def test_cache_invalidated_on_write(self, app, client):
+        """测试写入数据后缓存失效"""
+        with app.app_context():
+            client.get('/students')
+            
+            Student.create(
+                student_id='CACHE001',
+                name='缓存测试学生',
+                id_card='110101200001019901',
+                gender='男',
+                age=20,
+                major='计算机科学',
+                grade='2024'
+            )
+            
+            response = client.get('/students')
+            assert '缓存测试学生' in response.get_data(as_text=True)
+    
+    def test_unrelated_write_keeps_cache(self, app, client):
+        """测试无关数据表的写入不影响缓存"""
+        with app.app_context():
+            client.get('/students')
+            Book.create(isbn='9787302999999', title='无关图书', author='作者', publisher='出版社')
+            
+            assert len(app.extensions['page_cache']) == 1
+    
+    def test_static_cache_control(self, app, client):
+        """测试静态文件缓存头"""
+        response = client.get('/static/css/style.css')
+        assert response.status_code == 200
+        assert 'max-age=3600' in response.headers['Cache-Control']
+        response.close()
+
+def parse_metrics(text):
+    """简易Prometheus文本解析器：返回 {(指标名, 标签串): 数值}"""
+    samples = {}
+    for line in text.splitlines():
+        if not line or line.startswith('#'):
+            continue
+        name_and_labels, value = line.rsplit(' ', 1)
+        if '{' in name_and_labels:
+            name, labels = name_and_labels.split('{', 1)
+            labels = labels.rstrip('}')
+        else:
+            name, labels = name_and_labels, ''
+        samples[(name, labels)] = float(value)
+    return samples
+
+class TestMetricsView:
+    """Prometheus指标测试"""
+    
+    def test_metrics_exposition(self, app, client):
+        """测试指标输出格式和内容"""
+        with app.app_context():
+            BorrowRecord.update_overdue_status()
+        
+        client.get('/api/students')
+        client.get('/students')
+        client.get('/students')
+        
+        response = client.get('/metrics')
+        assert response.status_code == 200
+        assert response.content_type.startswith('text/plain; version=0.0.4')
+        
+        samples = parse_metrics(response.get_data(as_text=True))
+        assert samples[('sms_http_requests_total', 'resource="StudentListAPI",status="200"')] == 1
+        assert samples[('sms_http_request_duration_seconds_count', 'resource="StudentListAPI"')] == 1
+        assert samples[('sms_http_request_duration_seconds_bucket', 'resource="StudentListAPI",le="+Inf"')] == 1
+        assert samples[('sms_page_cache_hits_total', '')] == 1
+        assert samples[('sms_page_cache_hit_ratio', '')] == 0.5
+        assert ('sms_db_pool_utilization', 'pool="QueuePool"') in samples
+        assert samples[('sms_job_duration_seconds_count', 'job="update_overdue_status"')] == 1
+    
+    def test_metrics_read_snapshots(self, app):
+        """测试读取的统计是锁内复制的快照，不随之后的请求变化"""
+        stats = app.extensions['request_stats']
+        stats.observe('api.students', 'StudentListAPI', 200, 12.0, 3.0, 2)
+        app.extensions['job_stats'].observe('update_overdue_status', 50.0)
+        
+        (_, snapshot), = stats.items()
+        (_, job_histogram, _), = app.extensions['job_stats'].items()
+        stats.observe('api.students', 'StudentListAPI', 200, 12.0, 3.0, 2)
+        app.extensions['job_stats'].observe('update_overdue_status', 50.0)
+        
+        assert snapshot.requests == 1 and snapshot.latency_ms.count == 1
+        assert job_histogram.count == 1
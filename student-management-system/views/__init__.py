@@ -11,6 +11,6 @@ from flask import Blueprint
 main_bp = Blueprint('main', __name__)
 
 # 导入所有视图
-from . import dashboard, students, courses, books, enrollments, borrows
+from . import dashboard, students, courses, books, enrollments, borrows, metrics
 
 __all__ = ['main_bp']
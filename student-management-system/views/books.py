@@ -5,11 +5,13 @@
 Book Management Views
 """
 
-from flask import render_template, request
+from flask import render_template, request, abort
 from . import main_bp
 from models import db, Book
+from .cache import cached_page
 
 @main_bp.route('/books')
+@cached_page('books', 'borrow_records')
 def book_list():
     """图书列表页面"""
     page = request.args.get('page', 1, type=int)
@@ -41,8 +43,10 @@ def book_add():
 @main_bp.route('/books/<int:book_id>')
 def book_detail(book_id):
     """图书详情页面"""
-    book = Book.query.get_or_404(book_id)
-    return render_template('books/detail.html', book=book)
+    detail = Book.load_detail(book_id)
+    if detail is None:
+        abort(404)
+    return render_template('books/detail.html', **detail)
 
 @main_bp.route('/books/<int:book_id>/edit')
 def book_edit(book_id):
@@ -9,8 +9,10 @@ from flask import render_template, request
 from . import main_bp
 from models import db, BorrowRecord, Student, Book
 from datetime import datetime
+from .cache import cached_page
 
 @main_bp.route('/borrows')
+@cached_page('borrow_records', 'students', 'books')
 def borrow_list():
     """借书列表页面"""
     page = request.args.get('page', 1, type=int)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+页面响应缓存
+Rendered Page Cache
+
+按 路由+查询参数 缓存渲染好的HTML列表页，条目按数据表打标签；
+会话提交时根据本次写入涉及的数据表失效对应条目（见 models/table_versions.py 的 on_commit）。
+缓存位于进程内，多进程部署时其他进程依靠TTL过期。
+"""
+
+import time
+import threading
+from functools import wraps
+from urllib.parse import urlencode
+
+from flask import current_app, request, session
+
+from models.table_versions import on_commit
+
+
+class PageCache:
+    """带TTL和标签失效的进程内页面缓存"""
+
+    def __init__(self, default_ttl=60, max_entries=1000):
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """获取缓存内容，过期或不存在时返回None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[1] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[0]
+
+    def set(self, key, value, tags=(), ttl=None):
+        """写入缓存"""
+        expires_at = time.monotonic() + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                # 容量已满时淘汰最早过期的条目
+                oldest = min(self._entries, key=lambda k: self._entries[k][1])
+                del self._entries[oldest]
+            self._entries[key] = (value, expires_at, frozenset(tags))
+
+    def invalidate(self, *tags):
+        """失效带有任一标签的条目，返回失效数量"""
+        tags = set(tags)
+        with self._lock:
+            stale = [key for key, entry in self._entries.items() if entry[2] & tags]
+            for key in stale:
+                del self._entries[key]
+        return len(stale)
+
+    def clear(self):
+        """清空缓存"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def get_page_cache():
+    """获取当前应用的页面缓存，未启用时返回None"""
+    return current_app.extensions.get('page_cache')
+
+
+def cache_key():
+    """根据路径和排序后的查询参数生成缓存键"""
+    args = sorted(request.args.items(multi=True))
+    return f'{request.path}?{urlencode(args)}'
+
+
+def cached_page(*tags, ttl=None):
+    """
+    页面缓存装饰器
+
+    tags 为页面依赖的数据表名，任一表被写入时缓存失效。
+    存在待显示的flash消息时不读写缓存。
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            cache = get_page_cache()
+            if cache is None or request.method != 'GET' or '_flashes' in session:
+                return f(*args, **kwargs)
+
+            key = cache_key()
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+
+            rv = f(*args, **kwargs)
+            if isinstance(rv, str):
+                cache.set(key, rv, tags=tags, ttl=ttl)
+            return rv
+
+        return decorated_function
+    return decorator
+
+
+def init_page_cache(app):
+    """根据配置为应用启用页面缓存"""
+    if not app.config.get('PAGE_CACHE_ENABLED', False):
+        return None
+
+    cache = PageCache(
+        default_ttl=app.config.get('PAGE_CACHE_TTL', 60),
+        max_entries=app.config.get('PAGE_CACHE_MAX_ENTRIES', 1000)
+    )
+    app.extensions['page_cache'] = cache
+    on_commit(app, lambda tables: cache.invalidate(*tables))
+    return cache
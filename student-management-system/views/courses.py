@@ -8,8 +8,10 @@ Course Management Views
 from flask import render_template, request
 from . import main_bp
 from models import db, Course
+from .cache import cached_page
 
 @main_bp.route('/courses')
+@cached_page('courses', 'enrollments')
 def course_list():
     """课程列表页面"""
     page = request.args.get('page', 1, type=int)
@@ -8,8 +8,10 @@ Enrollment Management Views
 from flask import render_template, request
 from . import main_bp
 from models import db, Enrollment, Student, Course
+from .cache import cached_page
 
 @main_bp.route('/enrollments')
+@cached_page('enrollments', 'students', 'courses')
 def enrollment_list():
     """选课列表页面"""
     page = request.args.get('page', 1, type=int)
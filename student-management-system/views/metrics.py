@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Prometheus指标视图
+Prometheus Metrics View
+
+以Prometheus文本格式(0.0.4)输出请求、数据库连接池、缓存和后台任务指标，
+无需额外依赖，可被Prometheus或任何能解析该格式的采集器抓取。
+指标为进程内数据，多进程部署时每个工作进程分别统计。
+"""
+
+from flask import current_app, Response, abort
+from . import main_bp
+from models import db
+from models.pool import pool_stats
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class MetricsWriter:
+    """Prometheus文本格式输出"""
+
+    def __init__(self, prefix='sms_'):
+        self.prefix = prefix
+        self.lines = []
+
+    @staticmethod
+    def _labels(labels):
+        if not labels:
+            return ''
+        pairs = []
+        for key, value in labels.items():
+            value = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+            pairs.append(f'{key}="{value}"')
+        return '{' + ','.join(pairs) + '}'
+
+    def header(self, name, metric_type, help_text):
+        """写入 HELP 和 TYPE 行"""
+        self.lines.append(f'# HELP {self.prefix}{name} {help_text}')
+        self.lines.append(f'# TYPE {self.prefix}{name} {metric_type}')
+
+    def sample(self, name, value, labels=None):
+        """写入一个样本"""
+        self.lines.append(f'{self.prefix}{name}{self._labels(labels)} {value}')
+
+    def histogram(self, name, histogram, labels=None, scale=1.0):
+        """写入直方图的 _bucket/_sum/_count，scale 用于单位换算（如毫秒→秒）"""
+        labels = dict(labels or {})
+        for upper, count in histogram.cumulative():
+            le = upper if upper == '+Inf' else f'{upper * scale:g}'
+            self.sample(f'{name}_bucket', count, {**labels, 'le': le})
+        self.sample(f'{name}_sum', f'{histogram.sum * scale:g}', labels)
+        self.sample(f'{name}_count', histogram.count, labels)
+
+    def render(self):
+        return '\n'.join(self.lines) + '\n'
+
+
+def write_request_metrics(writer, request_stats):
+    """请求数、耗时和每请求SQL语句数"""
+    items = [stats for _, stats in request_stats.items()]
+
+    writer.header('http_requests_total', 'counter', '按资源和状态码统计的请求总数')
+    for stats in items:
+        for status, count in sorted(stats.statuses.items()):
+            writer.sample('http_requests_total', count,
+                          {'resource': stats.resource, 'status': status})
+
+    writer.header('http_request_duration_seconds', 'histogram', '请求处理耗时')
+    for stats in items:
+        writer.histogram('http_request_duration_seconds', stats.latency_ms,
+                         {'resource': stats.resource}, scale=0.001)
+
+    writer.header('db_time_per_request_seconds', 'histogram', '单个请求内数据库耗时')
+    for stats in items:
+        writer.histogram('db_time_per_request_seconds', stats.db_time_ms,
+                         {'resource': stats.resource}, scale=0.001)
+
+    writer.header('db_queries_per_request', 'histogram', '单个请求执行的SQL语句数')
+    for stats in items:
+        writer.histogram('db_queries_per_request', stats.queries, {'resource': stats.resource})
+
+    writer.header('n_plus_one_warnings_total', 'counter', '语句数超过阈值的请求数')
+    for stats in items:
+        writer.sample('n_plus_one_warnings_total', stats.n_plus_one_warnings,
+                      {'resource': stats.resource})
+
+
+def write_pool_metrics(writer, engine, monitor):
+    """数据库连接池使用情况"""
+    stats = pool_stats(engine)
+    labels = {'pool': stats['pool_class']}
+
+    if 'size' in stats:
+        capacity = stats['size'] + max(getattr(engine.pool, '_max_overflow', 0), 0)
+        writer.header('db_pool_size', 'gauge', '连接池常驻连接数')
+        writer.sample('db_pool_size', stats['size'], labels)
+        writer.header('db_pool_checked_out', 'gauge', '当前被占用的连接数')
+        writer.sample('db_pool_checked_out', stats['checkedout'], labels)
+        writer.header('db_pool_overflow', 'gauge', '当前溢出连接数')
+        writer.sample('db_pool_overflow', stats['overflow'], labels)
+        writer.header('db_pool_utilization', 'gauge', '占用连接数/连接上限')
+        writer.sample('db_pool_utilization', f"{stats['checkedout'] / capacity:g}" if capacity else 0, labels)
+
+    if monitor is not None:
+        for event_name, count in monitor.to_dict().items():
+            writer.header(f'db_pool_{event_name}_total', 'counter', f'连接池 {event_name} 事件数')
+            writer.sample(f'db_pool_{event_name}_total', count, labels)
+
+
+def write_cache_metrics(writer, page_cache):
+    """页面缓存命中率"""
+    lookups = page_cache.hits + page_cache.misses
+    writer.header('page_cache_hits_total', 'counter', '页面缓存命中次数')
+    writer.sample('page_cache_hits_total', page_cache.hits)
+    writer.header('page_cache_misses_total', 'counter', '页面缓存未命中次数')
+    writer.sample('page_cache_misses_total', page_cache.misses)
+    writer.header('page_cache_hit_ratio', 'gauge', '页面缓存命中率')
+    writer.sample('page_cache_hit_ratio', f'{page_cache.hits / lookups:g}' if lookups else 0)
+    writer.header('page_cache_entries', 'gauge', '页面缓存条目数')
+    writer.sample('page_cache_entries', len(page_cache))
+
+
+def write_query_profiler_metrics(writer, profiler):
+    """慢查询计数"""
+    writer.header('db_queries_total', 'counter', '执行的SQL语句总数')
+    writer.sample('db_queries_total', profiler.total_queries)
+    writer.header('db_sampled_queries_total', 'counter', '慢查询采样计时的语句数')
+    writer.sample('db_sampled_queries_total', profiler.sampled_queries)
+    writer.header('db_slow_queries_total', 'counter', '采样语句中超过慢查询阈值的语句数')
+    writer.sample('db_slow_queries_total', profiler.slow_queries)
+
+
+def write_job_metrics(writer, job_stats):
+    """后台任务耗时"""
+    items = job_stats.items()
+    writer.header('job_duration_seconds', 'histogram', '后台任务耗时')
+    for name, histogram, _ in items:
+        writer.histogram('job_duration_seconds', histogram, {'job': name}, scale=0.001)
+    writer.header('job_failures_total', 'counter', '后台任务失败次数')
+    for name, _, failures in items:
+        writer.sample('job_failures_total', failures, {'job': name})
+
+
+def render_metrics(app):
+    """生成当前进程的全部指标"""
+    writer = MetricsWriter(prefix=app.config.get('METRICS_PREFIX', 'sms_'))
+    extensions = app.extensions
+
+    if 'request_stats' in extensions:
+        write_request_metrics(writer, extensions['request_stats'])
+    write_pool_metrics(writer, db.engine, extensions.get('pool_monitor'))
+    if 'page_cache' in extensions:
+        write_cache_metrics(writer, extensions['page_cache'])
+    if 'query_profiler' in extensions:
+        write_query_profiler_metrics(writer, extensions['query_profiler'])
+    if 'job_stats' in extensions:
+        write_job_metrics(writer, extensions['job_stats'])
+
+    return writer.render()
+
+
+@main_bp.route('/metrics')
+def metrics():
+    """Prometheus指标"""
+    if not current_app.config.get('METRICS_ENABLED', True):
+        abort(404)
+    return Response(render_metrics(current_app), content_type=CONTENT_TYPE)
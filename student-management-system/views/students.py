@@ -5,11 +5,13 @@
 Student Management Views
 """
 
-from flask import render_template, request, redirect, url_for, flash, jsonify
+from flask import render_template, request, redirect, url_for, flash, jsonify, abort
 from . import main_bp
 from models import db, Student
+from .cache import cached_page
 
 @main_bp.route('/students')
+@cached_page('students')
 def student_list():
     """学生列表页面"""
     page = request.args.get('page', 1, type=int)
@@ -34,8 +36,10 @@ def student_add():
 @main_bp.route('/students/<int:student_id>')
 def student_detail(student_id):
     """学生详情页面"""
-    student = Student.query.get_or_404(student_id)
-    return render_template('students/detail.html', student=student)
+    detail = Student.load_detail(student_id)
+    if detail is None:
+        abort(404)
+    return render_template('students/detail.html', **detail)
 
 @main_bp.route('/students/<int:student_id>/edit')
 def student_edit(student_id):
@@ -0,0 +1,15 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WSGI入口
+WSGI Entry Point
+
+供 gunicorn 等WSGI服务器加载: gunicorn -c gunicorn.conf.py wsgi:app
+通过环境变量 FLASK_CONFIG 选择配置（默认 production）。
+"""
+
+import os
+from app import create_app
+from config import config
+
+app = create_app(config[os.environ.get('FLASK_CONFIG', 'production')])